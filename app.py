@@ -3,125 +3,329 @@ import streamlit as st
 import os
 import json
 import glob
-from yt_dlp import YoutubeDL
-import subprocess
-import sys
+import unicodedata
+
+from collection_job import (
+    start_collection_job, cancel_collection_job, running_job_pid, read_status, tail_job_log,
+    STATE_STARTING, STATE_RUNNING, STATE_CANCELLING, STATE_FINISHED, STATE_FAILED, STATE_CANCELLED
+)
+from term_trends import list_weeks, top_rising_terms, term_weekly_series
+from channel_meta_cache import load_channel_cache, CHANNEL_CACHE_PATH
+from report_store import load_report_index, load_report_state, report_index_path
 
 # === Configuration ===
 REPORT_DIR = "relatorios"
+MANIFEST_PATH = os.path.join(REPORT_DIR, "manifesto.json") # Gerado por noingles.py a cada coleta
 TRANS_DIR = "trans"
 WORDCLOUDS_SUBDIR_NAME = "nuvens_palavras"
 WORDCLOUDS_BASE_DIR = os.path.join(TRANS_DIR, WORDCLOUDS_SUBDIR_NAME)
+METRICS_SUMMARY_PATH = os.path.join("metricas", "ultima_coleta.json") # Preenchido por noingles.py
+TRANSCRIPT_DB_PATH = os.path.join(TRANS_DIR, "transcricoes.db") # Banco com a série semanal de termos
 SCRIPT_TO_RUN = "noingles.py"
 
 # === Helper Functions ===
 
-def run_collection_script():
+def start_collection():
     script_path = os.path.abspath(SCRIPT_TO_RUN)
     if not os.path.exists(script_path):
         st.error(f"Script '{SCRIPT_TO_RUN}' não encontrado em '{script_path}'. Verifique o caminho.")
-        return False, "Script não encontrado."
-
-    # Mensagem de início visível fora do expander
-    st.info(f"Iniciando a execução de '{SCRIPT_TO_RUN}'... Este processo pode ser demorado.")
-    
-    log_output_for_return = [] # Para retornar o log completo no final
-    
+        return
     try:
-        python_executable = sys.executable
-        process = subprocess.Popen(
-            [python_executable, script_path],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            encoding='utf-8',
-            bufsize=1,
-            cwd=os.path.dirname(script_path)
-        )
+        pid = start_collection_job(script_path)
+    except Exception as e:
+        st.error(f"Erro ao iniciar o script '{SCRIPT_TO_RUN}': {e}")
+        return
+    if pid is None:
+        st.sidebar.warning("Já existe uma coleta em andamento.")
+    else:
+        st.sidebar.info(f"Coleta iniciada em segundo plano (PID {pid}).")
+
+@st.fragment(run_every=2)
+def collection_status_panel():
+    # Chamado dentro de `with st.sidebar` (fragmentos não podem usar st.sidebar diretamente).
+    # Reexecutado a cada 2s sem recarregar a página inteira. Como o estado fica em disco,
+    # recarregar a página (ou abrir em outra aba) reencontra a coleta em andamento.
+    status = read_status()
+    running_pid = running_job_pid()
+    state = status.get('estado')
+
+    if running_pid:
+        total = status.get('total') or 0
+        done = status.get('concluidos') or 0
+        st.progress(min(done / total, 1.0) if total else 0.0,
+                    text=f"Coleta em andamento: {done}/{total or '?'} canais")
+        if status.get('canal_atual'):
+            st.caption(f"Último canal concluído: {status['canal_atual']}")
+        if status.get('mensagem'):
+            st.caption(status['mensagem'])
+        if state == STATE_CANCELLING:
+            st.caption("Cancelando... aguardando os canais em andamento.")
+        elif st.button("⛔ Cancelar coleta", key="cancelar_coleta"):
+            cancel_collection_job()
+        with st.expander("Log da execução", expanded=False):
+            st.code("\n".join(tail_job_log()), language="log")
+        st.session_state['coleta_em_andamento'] = True
+    else:
+        if st.session_state.pop('coleta_em_andamento', False):
+            st.rerun(scope="app") # Coleta terminou: recarrega a página com o novo manifesto
+        if state == STATE_FINISHED:
+            st.success(f"Última coleta finalizada em {status.get('finalizado_em')}.")
+        elif state == STATE_CANCELLED:
+            st.warning("Última coleta cancelada.")
+        elif state in (STATE_FAILED, STATE_STARTING, STATE_RUNNING, STATE_CANCELLING):
+            # Estados não finais sem processo vivo indicam que o coletor foi interrompido
+            st.error("Última coleta finalizada com erros. Veja o log abaixo.")
+            with st.expander("Log da última execução", expanded=False):
+                st.code("\n".join(tail_job_log()), language="log")
+
+def get_manifest_mtime():
+    try:
+        return os.path.getmtime(MANIFEST_PATH)
+    except OSError:
+        return None
 
-        # Coloca o log detalhado em tempo real dentro de um expander
-        with st.expander("Clique para acompanhar o log detalhado da execução", expanded=False):
-            log_display_area = st.empty()
-            live_log_lines = []
-
-            for line in iter(process.stdout.readline, ''):
-                line_cleaned = line.strip()
-                log_output_for_return.append(line_cleaned)
-                
-                live_log_lines.append(line_cleaned)
-                # Mantém apenas as últimas N linhas para exibição em tempo real para não sobrecarregar o expander
-                if len(live_log_lines) > 50: 
-                    live_log_lines.pop(0)
-                log_display_area.code("\n".join(live_log_lines), language="log")
-            
-            # Ao final do loop, mostra o log completo dentro do expander se o usuário o abrir depois
-            # ou se ele já estava aberto.
-            log_display_area.code("\n".join(log_output_for_return), language="log")
-
-        process.stdout.close()
-        return_code = process.wait()
-
-        if return_code == 0:
-            st.success(f"Script '{SCRIPT_TO_RUN}' executado com sucesso!") # Mensagem de sucesso visível
-            return True, "\n".join(log_output_for_return)
-        else:
-            st.error(f"Script '{SCRIPT_TO_RUN}' finalizado com erro (código: {return_code}). Verifique o log detalhado acima se necessário.") # Mensagem de erro visível
-            return False, "\n".join(log_output_for_return)
-
-    except FileNotFoundError:
-        err_msg = f"Erro: O Python executable '{sys.executable}' ou o script '{script_path}' não foi encontrado."
-        st.error(err_msg)
-        log_output_for_return.append(err_msg)
-        return False, "\n".join(log_output_for_return)
+@st.cache_data
+def load_manifest(manifest_mtime):
+    # `manifest_mtime` só participa da chave do cache: uma nova coleta gera um novo mtime
+    # e o manifesto é relido automaticamente, sem precisar limpar o cache.
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return manifest.get('canais', []), manifest.get('relatorio')
     except Exception as e:
-        err_msg = f"Erro ao executar o script '{SCRIPT_TO_RUN}': {e}"
-        st.error(err_msg)
-        log_output_for_return.append(err_msg)
-        return False, "\n".join(log_output_for_return)
+        st.error(f"Erro ao carregar o manifesto: {e}")
+        return None, None
+
+def _report_display_channels(data):
+    channels = []
+    for channel_data in data:
+        videos = channel_data.get('videos_processados') or []
+        channels.append({
+            'nome_canal': channel_data.get('nome_canal'),
+            'url': channel_data.get('url'),
+            'caminho_nuvem_palavras': channel_data.get('caminho_nuvem_palavras'),
+            'ultimo_video': {key: videos[0].get(key) for key in ('id', 'titulo', 'url')} if videos else None,
+        })
+    return channels
 
 @st.cache_data
-def get_latest_report_data():
+def load_indexed_report(index_mtime):
+    # Sem manifesto: remonta o último relatório a partir do índice (snapshot + deltas da cadeia atual)
     try:
-        list_of_files = glob.glob(os.path.join(REPORT_DIR, 'transcricoes_coletadas_*.json'))
-        if not list_of_files:
+        index = load_report_index(REPORT_DIR)
+        if index is None:
             return None, None
-        latest_file = max(list_of_files, key=os.path.getctime)
-        with open(latest_file, 'r', encoding='utf-8') as f:
+        return _report_display_channels(load_report_state(index, REPORT_DIR)), index['ultimo']
+    except Exception as e:
+        st.error(f"Erro ao carregar o relatório: {e}")
+        return None, None
+
+@st.cache_data
+def load_legacy_report(report_path, report_mtime):
+    # Relatórios antigos (anteriores ao manifesto): carrega o JSON completo uma vez e
+    # mantém em cache apenas os campos exibidos.
+    try:
+        with open(report_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-        return data, os.path.basename(latest_file)
     except Exception as e:
         st.error(f"Erro ao carregar o arquivo de relatório: {e}")
         return None, None
+    return _report_display_channels(data), os.path.basename(report_path)
+
+def get_latest_report_data():
+    manifest_mtime = get_manifest_mtime()
+    if manifest_mtime is not None:
+        return load_manifest(manifest_mtime)
+    try:
+        return load_indexed_report(os.path.getmtime(report_index_path(REPORT_DIR)))
+    except OSError:
+        pass # Sem índice: relatórios completos gravados antes dos deltas
+    list_of_files = glob.glob(os.path.join(REPORT_DIR, 'transcricoes_coletadas_*.json'))
+    if not list_of_files:
+        return None, None
+    latest_file = max(list_of_files, key=os.path.getctime)
+    return load_legacy_report(latest_file, os.path.getmtime(latest_file))
 
 @st.cache_data
-def get_channel_banner_url(channel_youtube_url):
-    ydl_opts = {
-        'quiet': True,
-        'extract_flat': 'in_playlist',
-        'dump_single_json': True,
-        'playlist_items': '0',
-        'nocheckcertificate': True,
-        'geo_bypass_country': 'BR', # Adicione esta linha
-    }
+def load_channel_meta_cache(cache_mtime):
+    # Banners resolvidos pelo coletor (trans/cache_canais.db); `cache_mtime` só participa da chave do cache
+    return load_channel_cache(CHANNEL_CACHE_PATH)
+
+def _pick_banner(meta):
+    banner_file = meta.get('banner_arquivo')
+    if banner_file and os.path.exists(banner_file):
+        return banner_file
+    return meta.get('banner_url')
+
+def get_channel_banner(channel_data):
+    """Banner do canal (arquivo local ou URL) sem nenhuma chamada de rede."""
+    banner = _pick_banner(channel_data)
+    if banner:
+        return banner
+    # Manifestos antigos não trazem o banner: consulta o cache gravado pelo coletor
     try:
-        with YoutubeDL(ydl_opts) as ydl:
-            if channel_youtube_url.endswith("/videos"):
-                 channel_youtube_url = channel_youtube_url.replace("/videos", "")
-            elif "/c/" in channel_youtube_url and channel_youtube_url.endswith("/videos"):
-                 channel_youtube_url = channel_youtube_url.rsplit("/videos", 1)[0]
-
-            info = ydl.extract_info(channel_youtube_url, download=False)
-            thumbnails = info.get('thumbnails')
-            if thumbnails:
-                banner_thumbnail = thumbnails[-1]
-                for thumb in reversed(thumbnails):
-                    if thumb.get('width', 0) > 1000 and thumb.get('url'):
-                        banner_thumbnail = thumb
-                        break
-                return banner_thumbnail.get('url')
+        cache_mtime = os.path.getmtime(CHANNEL_CACHE_PATH)
+    except OSError:
+        return None
+    return _pick_banner(load_channel_meta_cache(cache_mtime).get(channel_data.get('url')) or {})
+
+@st.cache_data
+def load_metrics_summary(summary_mtime):
+    try:
+        with open(METRICS_SUMMARY_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def show_metrics_summary():
+    try:
+        summary = load_metrics_summary(os.path.getmtime(METRICS_SUMMARY_PATH))
+    except OSError:
+        return
+    if not summary or not summary.get('etapas'):
+        return
+    with st.expander(f"⏱️ Tempo por etapa da última coleta ({summary.get('duracao_total_segundos', 0):.0f}s no total)"):
+        stage_rows = [
+            {'Etapa': name, 'Execuções': stats['execucoes'], 'Falhas': stats['falhas'],
+             'Total (s)': stats['total_segundos'], 'Média (s)': stats['media_segundos'], 'Máx. (s)': stats['max_segundos']}
+            for name, stats in sorted(summary['etapas'].items(), key=lambda item: -item[1]['total_segundos'])
+        ]
+        st.dataframe(stage_rows, hide_index=True, use_container_width=True)
+        channel_rows = [
+            {'Canal': channel, 'Total (s)': stages.get('canal', {}).get('total_segundos', 0.0),
+             'Falhas': sum(stats['falhas'] for stats in stages.values())}
+            for channel, stages in summary.get('canais', {}).items()
+        ]
+        if channel_rows:
+            st.markdown("**Por canal:**")
+            st.dataframe(sorted(channel_rows, key=lambda row: -row['Total (s)']), hide_index=True, use_container_width=True)
+
+def get_store_mtime():
+    # Em modo WAL as escritas vão primeiro para o arquivo -wal
+    mtimes = [os.path.getmtime(path) for path in (TRANSCRIPT_DB_PATH, TRANSCRIPT_DB_PATH + "-wal") if os.path.exists(path)]
+    return max(mtimes) if mtimes else None
+
+@st.cache_data
+def load_trend_weeks(store_mtime):
+    return list_weeks(db_path=TRANSCRIPT_DB_PATH)
+
+@st.cache_data
+def load_rising_terms(week, channel_url, store_mtime):
+    return top_rising_terms(week=week, channel_url=channel_url, db_path=TRANSCRIPT_DB_PATH)
+
+@st.cache_data
+def load_term_series(term, channel_url, store_mtime):
+    return term_weekly_series(term, channel_url=channel_url, db_path=TRANSCRIPT_DB_PATH)
+
+def show_term_trends(all_channel_data):
+    # Lê apenas os agregados semanais gravados pelo coletor (nenhum relatório antigo é relido)
+    store_mtime = get_store_mtime()
+    if store_mtime is None:
+        return
+    try:
+        weeks = load_trend_weeks(store_mtime)
     except Exception as e:
-        print(f"Banner fetch error for {channel_youtube_url}: {e}")
-    return None
+        st.caption(f"Tendências de termos indisponíveis: {e}")
+        return
+    if not weeks:
+        return
+    with st.expander("📈 Termos em alta por semana"):
+        col_week, col_channel = st.columns(2)
+        week = col_week.selectbox("Semana (a partir de segunda-feira)", weeks, key="tendencia_semana")
+        channel_options = {"Todos os canais": None}
+        for channel_data in all_channel_data or []:
+            if channel_data.get('url'):
+                channel_options[channel_data.get('nome_canal') or channel_data['url']] = channel_data['url']
+        channel_label = col_channel.selectbox("Canal", list(channel_options), key="tendencia_canal")
+        channel_url = channel_options[channel_label]
+
+        risers = load_rising_terms(week, channel_url, store_mtime)
+        if not risers:
+            st.caption("Nenhum termo com contagem suficiente nesta semana.")
+            return
+        st.dataframe(
+            [{'Termo': row['termo'], 'Contagem na semana': row['contagem'],
+              'Média das semanas anteriores': row['media_anterior'], 'Crescimento': row['razao']} for row in risers],
+            hide_index=True, use_container_width=True
+        )
+        term = st.selectbox("Evolução semanal do termo", [row['termo'] for row in risers], key="tendencia_termo")
+        series = load_term_series(term, channel_url, store_mtime)
+        if series:
+            st.line_chart({'Semana': [week_start for week_start, _ in series], 'Contagem': [count for _, count in series]},
+                          x='Semana', y='Contagem')
+
+CHANNELS_PER_PAGE_OPTIONS = [5, 10, 20, 50]
+CHANNELS_PER_PAGE = 10
+
+def _fold_search_text(text):
+    # Busca sem diferenciar maiúsculas/minúsculas nem acentos
+    normalized = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in normalized if not unicodedata.combining(char)).casefold()
+
+def filter_channels(channels, query):
+    """Canais cujo nome ou URL contém todos os termos da busca."""
+    terms = _fold_search_text(query).split()
+    if not terms:
+        return channels
+    return [
+        channel_data for channel_data in channels
+        if all(term in _fold_search_text(f"{channel_data.get('nome_canal') or ''} {channel_data.get('url') or ''}") for term in terms)
+    ]
+
+def reset_channel_page():
+    st.session_state['pagina_canais'] = 1
+
+@st.fragment
+def render_channel_card(channel_data):
+    # Os caminhos e banners são verificados apenas para os canais da página atual
+    full_wordcloud_path = os.path.join(TRANS_DIR, channel_data['caminho_nuvem_palavras'])
+    st.markdown("---")
+    channel_name = channel_data.get('nome_canal', 'Nome do Canal Indisponível')
+    if not os.path.exists(full_wordcloud_path):
+        st.caption(f"Nuvem de palavras de {channel_name} não encontrada.")
+        return
+
+    channel_url_from_report = channel_data.get('url', '#')
+
+    st.subheader(f"📺 {channel_name}")
+
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        main_channel_page_url = channel_url_from_report.replace('/videos', '') if channel_url_from_report != '#' else '#'
+        st.markdown(f"**Canal:** [{channel_name}]({main_channel_page_url})")
+        
+        banner_url = get_channel_banner(channel_data)
+        if banner_url:
+            st.image(banner_url, caption="Banner do Canal", use_container_width=True)
+        else:
+            st.caption("Banner do canal não disponível.")
+
+        latest_video = channel_data.get('ultimo_video')
+        if latest_video:
+            video_title = latest_video.get('titulo', 'Título Indisponível')
+            video_url_yt = latest_video.get('url', '#')
+            video_id = latest_video.get('id')
+
+            st.markdown(f"**Último Vídeo Analisado:** [{video_title}]({video_url_yt})")
+            if video_id:
+                thumbnail_url = latest_video.get('thumbnail_url') or f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+                st.image(thumbnail_url, caption="Thumbnail do Vídeo", use_container_width=True)
+        else:
+            st.write("Nenhuma informação de vídeo encontrada neste relatório.")
+
+    with col2:
+        st.markdown("**Nuvem de Palavras Gerada:**")
+        # Prévia na página; a versão completa só é carregada ao ampliar
+        relative_preview_path = channel_data.get('caminho_nuvem_preview')
+        preview_path = os.path.join(TRANS_DIR, relative_preview_path) if relative_preview_path else None
+        if not preview_path or not os.path.exists(preview_path):
+            preview_path = full_wordcloud_path # Relatórios antigos, sem prévia
+        st.image(preview_path, caption=f"Nuvem de palavras para {channel_name}", use_container_width=True)
+        # A imagem completa só é lida (e enviada ao navegador) quando o toggle está ligado:
+        # o conteúdo de um popover fechado é processado a cada rerun
+        if preview_path != full_wordcloud_path and st.toggle("🔎 Ampliar Nuvem", key=f"ampliar_{channel_url_from_report}"):
+            st.image(full_wordcloud_path, use_container_width=True)
 
 # === Streamlit App ===
 st.set_page_config(layout="wide", page_title="Análise de Canais do YouTube")
@@ -134,20 +338,10 @@ Você pode atualizar os dados executando o script de coleta diretamente pela int
 """)
 
 st.sidebar.header("Controles")
-if st.sidebar.button("🚀 Executar Coleta de Dados e Gerar Nuvens"):
-    st.cache_data.clear()
-    st.cache_resource.clear()
-
-    # O spinner agora é mais genérico, já que o log detalhado está no expander
-    with st.spinner(f"Executando '{SCRIPT_TO_RUN}'... Aguarde a finalização."):
-        success, script_log_output = run_collection_script() # A função run_collection_script agora lida com o display do log
-        
-    # As mensagens de sucesso/erro da execução do script são mostradas dentro de run_collection_script
-    # A mensagem da sidebar pode ser mais concisa ou removida se as mensagens na área principal forem suficientes.
-    if success:
-        st.sidebar.success("Processo de coleta finalizado.")
-    else:
-        st.sidebar.error("Processo de coleta finalizado com erros.")
+if st.sidebar.button("🚀 Executar Coleta de Dados e Gerar Nuvens", disabled=running_job_pid() is not None):
+    start_collection()
+with st.sidebar:
+    collection_status_panel()
 
 st.sidebar.markdown("---")
 
@@ -163,57 +357,42 @@ if latest_report_name:
 else:
     st.sidebar.info("Nenhum relatório encontrado. Execute a coleta de dados.")
 
-if all_channel_data:
-    processed_channels_count = 0
-    for channel_data in all_channel_data:
-        relative_wordcloud_path = channel_data.get('caminho_nuvem_palavras')
+show_metrics_summary()
+show_term_trends(all_channel_data)
 
-        if relative_wordcloud_path:
-            full_wordcloud_path = os.path.join(TRANS_DIR, relative_wordcloud_path)
-
-            if os.path.exists(full_wordcloud_path):
-                processed_channels_count +=1
+if all_channel_data:
+    channels_with_cloud = [channel_data for channel_data in all_channel_data if channel_data.get('caminho_nuvem_palavras')]
+    if not channels_with_cloud:
+        st.info("Nenhuma nuvem de palavras foi encontrada para exibição nos dados do relatório atual. "
+                "Tente executar a coleta de dados se ainda não o fez, ou verifique os logs do script de coleta.")
+    else:
+        col_search, col_page_size = st.columns([3, 1])
+        search_query = col_search.text_input("🔍 Buscar canal", key="busca_canal", on_change=reset_channel_page,
+                                             placeholder="Nome ou URL do canal")
+        page_size = col_page_size.selectbox("Canais por página", CHANNELS_PER_PAGE_OPTIONS,
+                                            index=CHANNELS_PER_PAGE_OPTIONS.index(CHANNELS_PER_PAGE),
+                                            key="canais_por_pagina", on_change=reset_channel_page)
+
+        matching_channels = filter_channels(channels_with_cloud, search_query)
+        total_pages = max(1, -(-len(matching_channels) // page_size))
+        # Ajustado antes de criar o widget da página (a busca pode ter reduzido o número de páginas)
+        current_page = min(max(int(st.session_state.get('pagina_canais', 1)), 1), total_pages)
+        st.session_state['pagina_canais'] = current_page
+
+        if not matching_channels:
+            st.info(f"Nenhum canal encontrado para \"{search_query}\".")
+        else:
+            start_index = (current_page - 1) * page_size
+            page_channels = matching_channels[start_index:start_index + page_size]
+            st.caption(f"Exibindo {start_index + 1}–{start_index + len(page_channels)} de {len(matching_channels)} canais")
+            # Cada canal é um fragmento: interagir com ele (ex.: ampliar a nuvem) não redesenha os demais
+            for channel_data in page_channels:
+                render_channel_card(channel_data)
+
+            if total_pages > 1:
                 st.markdown("---")
-                
-                channel_name = channel_data.get('nome_canal', 'Nome do Canal Indisponível')
-                channel_url_from_report = channel_data.get('url', '#')
-
-                st.subheader(f"📺 {channel_name}")
-
-                col1, col2 = st.columns([1, 2])
-
-                with col1:
-                    main_channel_page_url = channel_url_from_report.replace('/videos', '') if channel_url_from_report != '#' else '#'
-                    st.markdown(f"**Canal:** [{channel_name}]({main_channel_page_url})")
-                    
-                    banner_url = get_channel_banner_url(channel_url_from_report)
-                    if banner_url:
-                        st.image(banner_url, caption="Banner do Canal", use_container_width=True)
-                    else:
-                        st.caption("Banner do canal não disponível.")
-
-                    if channel_data.get('videos_processados'):
-                        latest_video = channel_data['videos_processados'][0]
-                        video_title = latest_video.get('titulo', 'Título Indisponível')
-                        video_url_yt = latest_video.get('url', '#')
-                        video_id = latest_video.get('id')
-
-                        st.markdown(f"**Último Vídeo Analisado:** [{video_title}]({video_url_yt})")
-                        if video_id:
-                            thumbnail_url = f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
-                            st.image(thumbnail_url, caption="Thumbnail do Vídeo", use_container_width=True)
-                    else:
-                        st.write("Nenhuma informação de vídeo encontrada neste relatório.")
-
-                with col2:
-                    st.markdown("**Nuvem de Palavras Gerada:**")
-                    st.image(full_wordcloud_path, caption=f"Nuvem de palavras para {channel_name}", use_container_width=True)
-                    with st.popover("🔎 Ampliar Nuvem"):
-                        st.image(full_wordcloud_path, use_container_width=True)
-        
-    if processed_channels_count == 0:
-         st.info("Nenhuma nuvem de palavras foi encontrada para exibição nos dados do relatório atual. "
-                 "Tente executar a coleta de dados se ainda não o fez, ou verifique os logs do script de coleta.")
+                st.number_input(f"Página (de {total_pages})", min_value=1, max_value=total_pages,
+                                step=1, key="pagina_canais")
 
 elif latest_report_name is None and not any(st.session_state.get(widget_id, {}).get('value', False) for widget_id in st.session_state if isinstance(st.session_state[widget_id], dict) and 'value' in st.session_state[widget_id]):
     st.info("Nenhum dado de relatório encontrado. Clique em 'Executar Coleta de Dados' na barra lateral para gerar os dados.")
@@ -0,0 +1,240 @@
+import re
+import time
+import random
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# === Configuração padrão do coletor ===
+DEFAULT_MAX_CONCURRENCY = 16 # Teto de workers simultâneos (também é o tamanho do executor)
+DEFAULT_INITIAL_CONCURRENCY = 3 # Ponto de partida; o limite se ajusta sozinho a partir daqui
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_RATE_PER_SECOND = 1.0 # Novos canais iniciados por segundo (token bucket)
+DEFAULT_BURST = 3
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BASE_DELAY = 2.0 # Segundos; dobra a cada tentativa (com jitter)
+DEFAULT_MAX_DELAY = 120.0
+DEFAULT_LATENCY_TARGET = 60.0 # Segundos por canal acima dos quais o coletor reduz a concorrência
+
+_EXHAUSTED = object()
+
+# Mensagens de rate limit (ex.: DownloadError do yt-dlp "HTTP Error 429: Too Many Requests").
+# Um '429' solto não basta: ele pode fazer parte de uma URL ou do ID de um vídeo.
+RATE_LIMIT_MESSAGE_RE = re.compile(
+    r'\bHTTP Error 429\b|\bstatus(?: code)?[ :=]+429\b|too many requests|\brate[ -]?limit', re.IGNORECASE
+)
+
+
+class RateLimitError(Exception):
+    """Erro de limite de requisições (HTTP 429) que deve ser propagado para o coletor fazer backoff."""
+
+
+def _status_code(exc):
+    for attribute in ('status', 'code', 'status_code'):
+        value = getattr(exc, attribute, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_rate_limit_error(exc):
+    """Identifica erros de rate limiting, inclusive os DownloadError do yt-dlp com 'HTTP Error 429'."""
+    if isinstance(exc, RateLimitError):
+        return True
+    # O DownloadError do yt-dlp guarda o erro HTTP original em exc_info
+    original = (getattr(exc, 'exc_info', None) or (None, None))[1]
+    for candidate in (exc, original, exc.__cause__):
+        if candidate is not None and _status_code(candidate) == 429:
+            return True
+    return bool(RATE_LIMIT_MESSAGE_RE.search(str(exc)))
+
+
+class TokenBucket:
+    """Limitador de taxa: no máximo `rate` aquisições por segundo, com rajadas de até `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def acquire(self):
+        while True:
+            async with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate
+            await asyncio.sleep(wait_seconds)
+
+    async def drain(self):
+        """Zera os tokens disponíveis (usado ao receber um 429 para frear novas requisições)."""
+        async with self._lock:
+            self._refill()
+            self._tokens = 0.0
+
+
+class AdaptiveConcurrency:
+    """
+    Limite de concorrência ajustado por AIMD: sobe 1 a cada `limit` sucessos rápidos,
+    cai pela metade a cada rate limit e cai 1 quando a latência média passa do alvo.
+    """
+
+    def __init__(self, initial, minimum, maximum, latency_target):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self.latency_target = latency_target
+        self._in_flight = 0
+        self._fast_successes = 0
+        self._latency_ewma = None
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def release(self, latency=None, rate_limited=False):
+        async with self._condition:
+            self._in_flight -= 1
+            if rate_limited:
+                self._on_rate_limit()
+            elif latency is not None:
+                self._on_success(latency)
+            self._condition.notify_all()
+
+    def _on_success(self, latency):
+        if self._latency_ewma is None:
+            self._latency_ewma = latency
+        else:
+            self._latency_ewma = 0.8 * self._latency_ewma + 0.2 * latency
+
+        if self._latency_ewma > self.latency_target:
+            self._fast_successes = 0
+            if self.limit > self.minimum:
+                self.limit -= 1
+                logger.info(f"Latência média alta ({self._latency_ewma:.1f}s). Concorrência reduzida para {self.limit}.")
+            return
+
+        self._fast_successes += 1
+        if self._fast_successes >= self.limit and self.limit < self.maximum:
+            self._fast_successes = 0
+            self.limit += 1
+            logger.info(f"Concorrência aumentada para {self.limit}.")
+
+    def _on_rate_limit(self):
+        self._fast_successes = 0
+        new_limit = max(self.minimum, self.limit // 2)
+        if new_limit != self.limit:
+            self.limit = new_limit
+            logger.warning(f"Rate limit detectado. Concorrência reduzida para {self.limit}.")
+
+
+def backoff_delay(attempt, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+    """Backoff exponencial com 'full jitter': aleatório entre 0 e base * 2^tentativa (limitado a max_delay)."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+async def collect_channels_async(
+    urls,
+    process_fn,
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    initial_concurrency=DEFAULT_INITIAL_CONCURRENCY,
+    min_concurrency=DEFAULT_MIN_CONCURRENCY,
+    rate_per_second=DEFAULT_RATE_PER_SECOND,
+    burst=DEFAULT_BURST,
+    max_retries=DEFAULT_MAX_RETRIES,
+    base_delay=DEFAULT_BASE_DELAY,
+    max_delay=DEFAULT_MAX_DELAY,
+    latency_target=DEFAULT_LATENCY_TARGET,
+    on_result=None,
+):
+    """
+    Processa canais com asyncio, executando `process_fn` (bloqueante) em um executor limitado.
+
+    Args:
+        urls (iterable): URLs dos canais. Pode ser um gerador; os itens são consumidos sob demanda.
+        process_fn (callable): Função (url) -> resultado. Deve propagar erros de rate limit
+            (ver is_rate_limit_error) para que o coletor faça backoff e nova tentativa.
+        on_result (callable, optional): Chamado como on_result(url, resultado, erro) ao final de cada canal.
+
+    Returns:
+        list: Resultados não vazios de `process_fn`, na ordem em que foram concluídos.
+    """
+    loop = asyncio.get_running_loop()
+    bucket = TokenBucket(rate_per_second, burst)
+    limiter = AdaptiveConcurrency(initial_concurrency, min_concurrency, max_concurrency, latency_target)
+    url_iterator = iter(urls)
+    source_lock = asyncio.Lock()
+    results = []
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+
+        async def next_url():
+            async with source_lock: # O iterador pode ser um gerador bloqueante (ex.: fila compartilhada)
+                return await loop.run_in_executor(executor, next, url_iterator, _EXHAUSTED)
+
+        async def run_one(url):
+            # Chamado com a vaga de concorrência já obtida pelo worker
+            attempt = 0
+            while True:
+                await bucket.acquire()
+                started = time.monotonic()
+                try:
+                    result = await loop.run_in_executor(executor, process_fn, url)
+                except Exception as e:
+                    rate_limited = is_rate_limit_error(e)
+                    await limiter.release(rate_limited=rate_limited)
+                    if rate_limited:
+                        await bucket.drain()
+                    if attempt >= max_retries:
+                        logger.error(f"Desistindo do canal {url} após {attempt + 1} tentativa(s): {e}")
+                        return None, e
+                    delay = backoff_delay(attempt, base_delay, max_delay)
+                    logger.warning(f"Falha ao processar {url} (tentativa {attempt + 1}): {e}. Nova tentativa em {delay:.1f}s.")
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                    await limiter.acquire()
+                    continue
+                await limiter.release(latency=time.monotonic() - started)
+                return result, None
+
+        async def worker():
+            while True:
+                # O canal só é retirado da fonte depois de obtida a vaga: com uma fila compartilhada,
+                # o coletor não segura leases de canais que ainda não pode processar
+                await limiter.acquire()
+                url = await next_url()
+                if url is _EXHAUSTED:
+                    await limiter.release()
+                    return
+                result, error = await run_one(url)
+                if result:
+                    results.append(result)
+                elif error is None:
+                    logger.warning(f"Nenhum resultado retornado para o canal: {url}")
+                if on_result:
+                    try:
+                        on_result(url, result, error)
+                    except Exception as e:
+                        logger.error(f"Erro no callback de resultado para {url}: {e}")
+
+        await asyncio.gather(*(worker() for _ in range(max_concurrency)))
+
+    logger.info(f"Coleta assíncrona concluída: {len(results)} canal(is) com resultado. Concorrência final: {limiter.limit}.")
+    return results
+
+
+def collect_channels(urls, process_fn, **kwargs):
+    """Versão síncrona de collect_channels_async (cria e encerra o event loop)."""
+    return asyncio.run(collect_channels_async(urls, process_fn, **kwargs))
@@ -0,0 +1,88 @@
+"""
+Benchmark da renderização das nuvens de palavras: caminho antigo (matplotlib imshow/savefig)
+contra os renderizadores diretos de wordcloud_processor (png, webp e svg).
+O matplotlib não é importado diretamente pelo projeto (é instalado como dependência do wordcloud);
+se não estiver disponível, o caminho antigo é omitido.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/bench_render.py [--repeticoes 5]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import importlib.util
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wordcloud import WordCloud
+from wordcloud_processor import get_portuguese_stopwords, save_wordcloud_image, WORDCLOUD_RENDERERS
+
+VOCABULARIO = (
+    "dinheiro investimento economia juros selic inflação renda fixa tesouro direto ações "
+    "dividendos bolsa mercado dólar real imposto carteira reserva emergência aposentadoria "
+    "previdência fundos imobiliários cripto bitcoin poupança crédito dívida cartão orçamento"
+).split()
+
+
+def synthetic_text(num_words, seed=42):
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(VOCABULARIO))] # Distribuição tipo Zipf
+    return " ".join(rng.choices(VOCABULARIO, weights=weights, k=num_words))
+
+
+def save_with_matplotlib(wordcloud, output_filepath):
+    # Caminho antigo de generate_wordcloud_from_text, reproduzido aqui apenas para comparação
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(10, 5))
+    plt.imshow(wordcloud, interpolation='bilinear')
+    plt.axis("off")
+    plt.savefig(output_filepath, bbox_inches='tight')
+    plt.close()
+
+
+def time_it(func, repetitions):
+    best = float('inf')
+    for _ in range(repetitions):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--palavras', type=int, default=50000)
+    args = parser.parse_args()
+
+    wordcloud = WordCloud(
+        width=800, height=400, background_color='white',
+        stopwords=set(get_portuguese_stopwords()), min_font_size=10,
+        collocations=False, normalize_plurals=False
+    ).generate(synthetic_text(args.palavras))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cases = []
+        if importlib.util.find_spec('matplotlib'):
+            cases.append(('matplotlib (antigo)', 'png', lambda path: save_with_matplotlib(wordcloud, path)))
+        else:
+            print("matplotlib não instalado: comparação com o caminho antigo omitida.")
+        for image_format in sorted(WORDCLOUD_RENDERERS):
+            cases.append((f'direto {image_format}', image_format,
+                          lambda path, fmt=image_format: save_wordcloud_image(wordcloud, path, image_format=fmt)))
+
+        print(f"{'Renderizador':<22}{'Melhor tempo (ms)':>20}{'Tamanho (KB)':>16}")
+        for name, extension, render in cases:
+            output_path = os.path.join(tmp_dir, f"{name.split()[0]}.{extension}")
+            seconds = time_it(lambda: render(output_path), args.repeticoes)
+            size_kb = os.path.getsize(output_path) / 1024
+            print(f"{name:<22}{seconds * 1000:>20.1f}{size_kb:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Verifica o custo de importar os módulos do coletor e da interface: tempo de importação dentro do
+orçamento, nenhuma dependência pesada (nltk, wordcloud, yt_dlp, numpy...) carregada e nenhum
+arquivo criado no diretório atual.
+
+Cada módulo é importado em um interpretador novo (sem cache de módulos), em um diretório
+temporário vazio; vale o menor tempo entre as repetições. O app.py é medido com um streamlit
+substituto, que aceita qualquer chamada e não renderiza nada: o orçamento cobre o código do
+app executado a cada rerun, não a importação do próprio streamlit (já carregado nos reruns).
+Os mesmos limites são conferidos por tests/test_import_time.py.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/check_import_time.py [--repeticoes 5] [--fator 1.0]
+
+Sai com código 1 se algum módulo estourar o orçamento ou carregar uma dependência pesada.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+# Orçamento de importação (segundos) de cada módulo, sem contar a inicialização do interpretador
+IMPORT_BUDGETS = {
+    'app': 0.15,
+    'noingles': 0.30,
+    'wordcloud_processor': 0.05,
+    'subtitle_parser': 0.05,
+    'collection_job': 0.05,
+    'report_store': 0.05,
+    'refresh_schedule': 0.05,
+    'term_trends': 0.05,
+    'work_queue': 0.05,
+}
+# Dependências que só podem ser importadas no primeiro uso
+HEAVY_MODULES = ('nltk', 'wordcloud', 'matplotlib', 'yt_dlp', 'numpy', 'scipy', 'sklearn', 'PIL')
+
+# Módulos que são importados com o streamlit substituto
+STREAMLIT_MODULES = ('app',)
+
+STREAMLIT_STUB_CODE = """
+import sys, types
+
+class _StreamlitStub:
+    # Qualquer atributo é outro stub; decoradores (cache_data, fragment) devolvem a função;
+    # widgets retornam um valor falso (botões não clicados).
+    def __getattr__(self, name):
+        return _StreamlitStub()
+    def __call__(self, *args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return _StreamlitStub()
+    def __bool__(self):
+        return False
+    def __iter__(self):
+        return iter(())
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc_info):
+        return False
+
+streamlit = types.ModuleType('streamlit')
+streamlit.__getattr__ = lambda name: _StreamlitStub()
+streamlit.session_state = {}
+sys.modules['streamlit'] = streamlit
+"""
+
+CHILD_CODE = """
+import sys, json, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{'segundos': elapsed, 'pesados': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure_import(module, work_dir):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT_DIR, env.get('PYTHONPATH')]))
+    env.pop('PYTHONSTARTUP', None)
+    code = CHILD_CODE.format(module=module, heavy=HEAVY_MODULES)
+    if module in STREAMLIT_MODULES:
+        code = STREAMLIT_STUB_CODE + code
+    completed = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=work_dir, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}:\n{completed.stderr.strip()}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def check_module(module, repetitions=5, factor=1.0):
+    """
+    Importa `module` `repetitions` vezes e confere orçamento, dependências pesadas e arquivos criados.
+
+    Returns:
+        tuple: (segundos, orçamento, lista de problemas — vazia se estiver tudo certo).
+    """
+    budget = IMPORT_BUDGETS[module] * factor
+    with tempfile.TemporaryDirectory(prefix="import_noingles_") as work_dir:
+        runs = [measure_import(module, work_dir) for _ in range(repetitions)]
+        created = sorted(os.listdir(work_dir))
+    seconds = min(run['segundos'] for run in runs)
+    heavy = sorted({name for run in runs for name in run['pesados']})
+    problems = []
+    if seconds > budget:
+        problems.append("acima do orçamento")
+    if heavy:
+        problems.append(f"carregou {', '.join(heavy)}")
+    if created:
+        problems.append(f"criou {', '.join(created)}")
+    return seconds, budget, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--fator', type=float, default=1.0,
+                        help="Multiplica os orçamentos (ex.: 2 em máquinas lentas ou de CI)")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'módulo':<24}{'ms':>9}{'orçamento':>12}  situação")
+    for module in IMPORT_BUDGETS:
+        try:
+            seconds, budget, problems = check_module(module, args.repeticoes, args.fator)
+        except RuntimeError as e:
+            print(e)
+            failures.append(module)
+            continue
+        if problems:
+            failures.append(module)
+        print(f"{module:<24}{seconds * 1000:>9.1f}{budget * 1000:>12.0f}  {'; '.join(problems) or 'ok'}")
+
+    if failures:
+        print(f"\n{len(failures)} módulo(s) fora do orçamento de importação: {', '.join(failures)}")
+        return 1
+    print("\nTodos os módulos dentro do orçamento de importação.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Substituto offline do yt_dlp.YoutubeDL para os benchmarks.
+
+Responde às mesmas chamadas que noingles.py faz (extract_info de canal, de vídeo e da página
+do canal, e urlopen para baixar a legenda) com dados sintéticos gerados por fixtures.py.
+A fixture e o formato da legenda vêm da própria URL do canal:
+
+    https://www.youtube.com/@bench_<fixture>_<formato>/videos   (ex.: @bench_1h_vtt_auto)
+
+O formato 'nenhuma' simula um canal cujos vídeos não têm legenda.
+"""
+import io
+import re
+import threading
+from functools import lru_cache
+
+from fixtures import FIXTURE_DURATIONS, make_manual_vtt, make_auto_vtt, make_srv3, make_json3
+
+SUBTITLE_BUILDERS = {
+    'vtt': ('vtt', make_manual_vtt),
+    'vtt_auto': ('vtt', make_auto_vtt),
+    'srv3': ('srv3', make_srv3),
+    'json3': ('json3', make_json3),
+}
+
+NO_SUBTITLES = 'nenhuma'
+
+CHANNEL_URL_RE = re.compile(r'@bench_(?P<fixture>[^_/]+(?:_live)?)_(?P<formato>vtt_auto|vtt|srv3|json3|nenhuma)')
+VIDEO_ID_RE = re.compile(r'v=(?P<fixture>.+?)__(?P<formato>vtt_auto|vtt|srv3|json3|nenhuma)__(?P<numero>\d+)')
+
+_stats_lock = threading.Lock()
+# 'extract_info' conta todas as extrações; 'extract_info_video', apenas as de vídeos
+CALL_COUNTS = {'extract_info': 0, 'extract_info_video': 0, 'urlopen': 0}
+
+
+def bench_channel_url(fixture, subtitle_format):
+    return f"https://www.youtube.com/@bench_{fixture}_{subtitle_format}/videos"
+
+
+@lru_cache(maxsize=None)
+def subtitle_bytes(fixture, subtitle_format):
+    """Conteúdo da legenda sintética (gerado uma vez por processo)."""
+    _, builder = SUBTITLE_BUILDERS[subtitle_format]
+    return builder(FIXTURE_DURATIONS[fixture]).encode('utf-8')
+
+
+def reset_call_counts():
+    with _stats_lock:
+        for key in CALL_COUNTS:
+            CALL_COUNTS[key] = 0
+
+
+def _count(name):
+    with _stats_lock:
+        CALL_COUNTS[name] += 1
+
+
+class FakeYoutubeDL:
+    """Mesma interface usada de yt_dlp.YoutubeDL: gerenciador de contexto, extract_info e urlopen."""
+
+    def __init__(self, params=None):
+        self.params = params or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def extract_info(self, url, download=False):
+        _count('extract_info')
+        video_match = VIDEO_ID_RE.search(url)
+        if video_match:
+            _count('extract_info_video')
+            return self._video_info(**video_match.groupdict())
+        channel_match = CHANNEL_URL_RE.search(url)
+        if not channel_match:
+            raise ValueError(f"URL fora das fixtures do benchmark: {url}")
+        fixture, subtitle_format = channel_match.group('fixture'), channel_match.group('formato')
+        if not url.endswith('/videos'): # Página do canal (banner)
+            return {'thumbnails': [{'url': f"https://example.invalid/banner_{fixture}.jpg", 'width': 2560}]}
+        num_videos = self.params.get('playlistend') or 1
+        return {
+            'uploader': f"Canal Benchmark {fixture} {subtitle_format}",
+            'entries': [
+                {'id': f"{fixture}__{subtitle_format}__{n}", 'title': f"Vídeo {n} ({fixture}, {subtitle_format})"}
+                for n in range(num_videos)
+            ],
+        }
+
+    def _video_info(self, fixture, formato, numero):
+        info = {
+            'id': f"{fixture}__{formato}__{numero}",
+            'upload_date': '20240101',
+            'view_count': 1000,
+            'uploader': f"Canal Benchmark {fixture} {formato}",
+            'requested_subtitles': {},
+        }
+        if formato != NO_SUBTITLES:
+            ext, _ = SUBTITLE_BUILDERS[formato]
+            info['requested_subtitles']['pt'] = {
+                'ext': ext, 'url': f"https://example.invalid/legenda?fixture={fixture}&formato={formato}"
+            }
+        return info
+
+    def urlopen(self, url):
+        _count('urlopen')
+        match = re.search(r'fixture=(?P<fixture>[^&]+)&formato=(?P<formato>\w+)', url)
+        if not match:
+            raise ValueError(f"URL de legenda fora das fixtures do benchmark: {url}")
+        return io.BytesIO(subtitle_bytes(match.group('fixture'), match.group('formato')))
+
+
+class FakeDownloadError(Exception):
+    """Mesma mensagem do DownloadError do yt-dlp ao receber um 429."""
+
+
+class RateLimitedYoutubeDL(FakeYoutubeDL):
+    """
+    FakeYoutubeDL que responde com 'HTTP Error 429' às primeiras `failures` chamadas a extract_info
+    (contadas entre todas as instâncias; ver reset_rate_limit).
+    """
+
+    failures = 0
+    _failed = 0
+
+    @classmethod
+    def reset_rate_limit(cls, failures):
+        with _stats_lock:
+            cls.failures = failures
+            cls._failed = 0
+
+    def extract_info(self, url, download=False):
+        with _stats_lock:
+            inject = RateLimitedYoutubeDL._failed < RateLimitedYoutubeDL.failures
+            if inject:
+                RateLimitedYoutubeDL._failed += 1
+        if inject:
+            _count('extract_info')
+            raise FakeDownloadError(f"ERROR: [youtube] {url}: Unable to download webpage: HTTP Error 429: Too Many Requests")
+        return super().extract_info(url, download)
@@ -0,0 +1,102 @@
+"""
+Geradores de legendas sintéticas (WebVTT manual, WebVTT automática do YouTube, srv3 e json3)
+com tamanho realista, para benchmarks sem acesso à rede.
+"""
+import json
+import random
+from xml.sax.saxutils import escape
+
+# Durações usadas pelos benchmarks (em segundos): de um clipe curto a uma live longa
+FIXTURE_DURATIONS = {
+    '5min': 5 * 60,
+    '30min': 30 * 60,
+    '1h': 60 * 60,
+    '8h_live': 8 * 60 * 60,
+}
+
+WORDS_PER_SECOND = 2.5 # Ritmo típico de fala em português
+CUE_SECONDS = 3.0
+
+VOCABULARY = (
+    "então pessoal hoje a gente vai falar sobre investimento dinheiro reserva de emergência "
+    "tesouro direto selic inflação juros compostos renda fixa ações dividendos bolsa de valores "
+    "fundos imobiliários carteira diversificação risco retorno liquidez prazo imposto de renda "
+    "previdência aposentadoria orçamento dívida cartão de crédito poupança meta planejamento "
+    "mercado dólar economia banco central copom taxa cenário curto longo médio"
+).split()
+
+
+def _timestamp(seconds, separator='.'):
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}".replace('.', separator)
+
+
+def _cue_lines(duration_seconds, seed):
+    rng = random.Random(seed)
+    words_per_cue = max(1, int(WORDS_PER_SECOND * CUE_SECONDS))
+    start = 0.0
+    while start < duration_seconds:
+        yield start, rng.choices(VOCABULARY, k=words_per_cue)
+        start += CUE_SECONDS
+
+
+def make_manual_vtt(duration_seconds, seed=1):
+    """Legenda manual: uma cue por trecho, numerada, sem repetições."""
+    parts = ["WEBVTT", "Kind: captions", "Language: pt", ""]
+    for index, (start, words) in enumerate(_cue_lines(duration_seconds, seed), start=1):
+        parts += [str(index), f"{_timestamp(start)} --> {_timestamp(start + CUE_SECONDS)}", " ".join(words), ""]
+    return "\n".join(parts)
+
+
+def make_auto_vtt(duration_seconds, seed=1):
+    """
+    Legenda automática no formato do YouTube: cada cue repete a linha anterior e traz a nova
+    linha com timestamps inline e tags <c>, seguida de uma cue de 10ms só com o texto.
+    """
+    parts = ["WEBVTT", "Kind: captions", "Language: pt", ""]
+    previous_line = ""
+    for start, words in _cue_lines(duration_seconds, seed):
+        end = start + CUE_SECONDS
+        step = CUE_SECONDS / len(words)
+        tagged = words[0] + "".join(
+            f"<{_timestamp(start + i * step)}><c> {word}</c>" for i, word in enumerate(words[1:], start=1)
+        )
+        plain = " ".join(words)
+        parts += [f"{_timestamp(start)} --> {_timestamp(end - 0.01)} align:start position:0%", previous_line or " ", tagged, ""]
+        parts += [f"{_timestamp(end - 0.01)} --> {_timestamp(end)} align:start position:0%", plain, " ", ""]
+        previous_line = plain
+    return "\n".join(parts)
+
+
+def make_srv3(duration_seconds, seed=1):
+    """Legenda srv3 (timedtext formato 3) com palavras em elementos <s>, como nas legendas automáticas."""
+    parts = ['<?xml version="1.0" encoding="utf-8" ?><timedtext format="3"><body>']
+    for start, words in _cue_lines(duration_seconds, seed):
+        start_ms = int(start * 1000)
+        segments = "".join(
+            f'<s t="{i * 300}" ac="0">{escape((" " if i else "") + word)}</s>' for i, word in enumerate(words)
+        )
+        parts.append(f'<p t="{start_ms}" d="{int(CUE_SECONDS * 1000)}" w="1">{segments}</p>')
+    parts.append('</body></timedtext>')
+    return "\n".join(parts)
+
+
+def make_json3(duration_seconds, seed=1):
+    """Legenda json3 no formato das legendas automáticas: eventos com segs e eventos 'aAppend' de quebra de linha."""
+    events = [{'tStartMs': 0, 'dDurationMs': int(duration_seconds * 1000), 'id': 1, 'wpWinPosId': 1, 'wsWinStyleId': 1}]
+    for start, words in _cue_lines(duration_seconds, seed):
+        start_ms = int(start * 1000)
+        events.append({
+            'tStartMs': start_ms, 'dDurationMs': int(CUE_SECONDS * 1000), 'wWinId': 1,
+            'segs': [{'utf8': word if i == 0 else f" {word}", 'tOffsetMs': i * 300, 'acAsrConf': 0} for i, word in enumerate(words)],
+        })
+        events.append({'tStartMs': start_ms + int(CUE_SECONDS * 1000) - 10, 'dDurationMs': 10, 'wWinId': 1, 'aAppend': 1,
+                       'segs': [{'utf8': "\n"}]})
+    return json.dumps({'wireMagic': 'pb3', 'pens': [{}], 'wsWinStyles': [{}], 'wpWinPositions': [{}], 'events': events},
+                      ensure_ascii=False, separators=(',', ':'))
+
+
+def make_transcript_text(duration_seconds, seed=1):
+    """Texto corrido equivalente a uma transcrição já parseada."""
+    return "\n".join(" ".join(words) for _, words in _cue_lines(duration_seconds, seed))
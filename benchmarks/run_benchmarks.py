@@ -0,0 +1,212 @@
+"""
+Suíte de benchmarks offline: parsers de legenda (vtt, srv3 e json3), geração da nuvem de palavras e process_channel
+de ponta a ponta, com legendas sintéticas (fixtures.py) e um YoutubeDL falso (fake_youtube.py).
+Nenhuma chamada de rede é feita; tudo é gravado em um diretório temporário.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/run_benchmarks.py --salvar-baseline   # grava a referência desta máquina
+    python benchmarks/run_benchmarks.py                     # compara com a referência
+
+Sai com código 1 se algum caso ficar mais lento que `--limite` vezes a referência.
+"""
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fixtures import FIXTURE_DURATIONS, make_transcript_text
+from fake_youtube import FakeYoutubeDL, bench_channel_url, subtitle_bytes, reset_call_counts, CALL_COUNTS
+
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+# Um caso é regressão quando fica mais lento que LIMITE x o tempo da referência
+DEFAULT_REGRESSION_LIMIT = 1.25
+# Casos abaixo deste tempo (em segundos) oscilam demais para serem comparados
+MIN_COMPARABLE_SECONDS = 0.005
+QUICK_FIXTURES = ('5min', '1h')
+
+
+def time_it(func, repetitions, setup=None, warmup=0):
+    """Melhor tempo (em segundos) entre as repetições; `setup` roda antes de cada uma, fora da medição."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+    best = float('inf')
+    for _ in range(repetitions):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _result(seconds, size_bytes=None):
+    result = {'segundos': round(seconds, 6)}
+    if size_bytes:
+        result['mb_por_segundo'] = round(size_bytes / 1e6 / seconds, 3) if seconds else None
+    return result
+
+
+def bench_parsers(fixtures, repetitions):
+    from subtitle_parser import parse_vtt_content, parse_srv3_content, parse_json3_content
+
+    cases = (('vtt', parse_vtt_content), ('vtt_auto', parse_vtt_content),
+             ('srv3', parse_srv3_content), ('json3', parse_json3_content))
+    results = {}
+    for fixture in fixtures:
+        for subtitle_format, parser in cases:
+            content = subtitle_bytes(fixture, subtitle_format).decode('utf-8')
+            seconds = time_it(lambda: parser(content), repetitions)
+            results[f"parse_{subtitle_format}[{fixture}]"] = _result(seconds, len(content.encode('utf-8')))
+    return results
+
+
+def bench_wordcloud(fixtures, repetitions, output_dir):
+    from wordcloud_processor import generate_wordcloud_from_text
+
+    results = {}
+    for fixture in fixtures:
+        text = make_transcript_text(FIXTURE_DURATIONS[fixture])
+        output_path = os.path.join(output_dir, f"wc_bench_{fixture}.png")
+        seconds = time_it(lambda: generate_wordcloud_from_text(text, output_path), repetitions)
+        results[f"generate_wordcloud_from_text[{fixture}]"] = _result(seconds, len(text.encode('utf-8')))
+    return results
+
+
+def bench_process_channel(fixtures, repetitions):
+    import noingles
+    from transcript_cache import CACHE_DIR
+    from channel_window import WINDOW_DIR, VIDEO_WINDOW_SIZE
+    from refresh_schedule import SCHEDULE_PATH
+
+    def clear_schedule():
+        # Sem a agenda, o canal não é reaproveitado pela verificação do último vídeo visto
+        if os.path.exists(SCHEDULE_PATH):
+            os.remove(SCHEDULE_PATH)
+
+    def clear_window():
+        shutil.rmtree(WINDOW_DIR, ignore_errors=True)
+        clear_schedule()
+
+    def clear_transcript_cache_and_window():
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        clear_window()
+
+    results = {}
+    for fixture in fixtures:
+        for subtitle_format in ('vtt_auto', 'srv3', 'json3'):
+            channel_url = bench_channel_url(fixture, subtitle_format)
+            size_bytes = len(subtitle_bytes(fixture, subtitle_format))
+
+            def run():
+                if noingles.process_channel(channel_url) is None:
+                    raise RuntimeError(f"process_channel falhou para {channel_url}")
+
+            # Sem cache: extração, download e parse das legendas, frequências, nuvem, JSON e SQLite
+            seconds = time_it(run, repetitions, setup=clear_transcript_cache_and_window, warmup=1)
+            results[f"process_channel_frio[{fixture}_{subtitle_format}]"] = _result(seconds, size_bytes * VIDEO_WINDOW_SIZE)
+            # Transcrições no cache, mas janela vazia: recontagem das palavras de todos os vídeos
+            seconds = time_it(run, repetitions, setup=clear_window)
+            results[f"process_channel_cache[{fixture}_{subtitle_format}]"] = _result(seconds)
+            # Janela completa e nenhum vídeo novo, mas sem a agenda: percorre o pipeline reaproveitando a janela
+            seconds = time_it(run, repetitions, setup=clear_schedule)
+            results[f"process_channel_janela[{fixture}_{subtitle_format}]"] = _result(seconds)
+            # Mesmo vídeo mais recente da última verificação (caso comum das coletas seguintes): só a listagem
+            seconds = time_it(run, repetitions)
+            results[f"process_channel_sem_novidade[{fixture}_{subtitle_format}]"] = _result(seconds)
+    return results
+
+
+def compare_with_baseline(results, baseline, limit):
+    """Imprime a comparação e retorna a lista de casos que regrediram."""
+    regressions = []
+    print(f"\n{'Caso':<50}{'Atual (ms)':>14}{'Referência (ms)':>18}{'Razão':>9}")
+    for name, result in results.items():
+        reference = (baseline.get('resultados') or {}).get(name)
+        current_ms = result['segundos'] * 1000
+        if not reference:
+            print(f"{name:<50}{current_ms:>14.1f}{'-':>18}{'-':>9}")
+            continue
+        ratio = result['segundos'] / reference['segundos'] if reference['segundos'] else 1.0
+        status = ""
+        if ratio > limit and reference['segundos'] >= MIN_COMPARABLE_SECONDS:
+            status = "  REGRESSÃO"
+            regressions.append(name)
+        print(f"{name:<50}{current_ms:>14.1f}{reference['segundos'] * 1000:>18.1f}{ratio:>9.2f}{status}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--fixtures', nargs='+', choices=sorted(FIXTURE_DURATIONS), default=list(FIXTURE_DURATIONS))
+    parser.add_argument('--rapido', action='store_true', help=f"Usa apenas as fixtures {', '.join(QUICK_FIXTURES)}")
+    parser.add_argument('--salvar-baseline', action='store_true', help="Grava os resultados como nova referência")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--limite', type=float, default=DEFAULT_REGRESSION_LIMIT,
+                        help="Razão atual/referência a partir da qual o caso é considerado regressão")
+    args = parser.parse_args()
+    fixtures = list(QUICK_FIXTURES) if args.rapido else args.fixtures
+    baseline_path = os.path.abspath(args.baseline)
+
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_noingles_") as work_dir:
+        # noingles grava em logs/, trans/ e relatorios/ relativos ao diretório atual
+        os.chdir(work_dir)
+        try:
+            import noingles
+            noingles.create_directories()
+            from wordcloud_processor import shutdown_render_pool
+            from file_utils import atomic_write_json, read_json
+
+            noingles.YoutubeDL = FakeYoutubeDL
+            logging.getLogger().setLevel(logging.ERROR)
+            reset_call_counts()
+
+            results = {}
+            try:
+                results.update(bench_parsers(fixtures, args.repeticoes))
+                results.update(bench_wordcloud(fixtures, args.repeticoes, work_dir))
+                results.update(bench_process_channel(fixtures, args.repeticoes))
+            finally:
+                shutdown_render_pool()
+        finally:
+            os.chdir(original_cwd)
+
+    print(f"Chamadas ao YoutubeDL falso: {CALL_COUNTS}")
+    baseline = read_json(baseline_path, default=None)
+    regressions = compare_with_baseline(results, baseline or {}, args.limite)
+
+    if args.salvar_baseline:
+        atomic_write_json(baseline_path, {
+            'gerado_em': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'repeticoes': args.repeticoes,
+            'resultados': dict((baseline or {}).get('resultados') or {}, **results),
+        })
+        print(f"\nReferência salva em: {baseline_path}")
+        return 0
+    if baseline is None:
+        print(f"\nNenhuma referência em {baseline_path}. Rode com --salvar-baseline para criá-la.")
+        return 0
+    if regressions:
+        print(f"\n{len(regressions)} caso(s) acima de {args.limite:.2f}x a referência.")
+        return 1
+    print("\nNenhuma regressão encontrada.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+
+logger = logging.getLogger(__name__)
+
+# === Cache em disco de banners/thumbnails dos canais ===
+# Preenchido pelo coletor (noingles.py) e lido pela interface sem nenhuma chamada de rede.
+# Gravado em SQLite, uma linha por canal (como a agenda de refresh_schedule.py): coletores
+# paralelos (modo --fila) atualizam canais diferentes sem sobrescrever as entradas uns dos outros.
+CHANNEL_CACHE_PATH = os.path.join("trans", "cache_canais.db")
+CHANNEL_CACHE_TTL_DAYS = 7
+# Se True, o coletor também baixa a imagem do banner para CHANNEL_IMAGES_DIR
+DOWNLOAD_CHANNEL_IMAGES = False
+CHANNEL_IMAGES_DIR = os.path.join("trans", "imagens_canais")
+
+CHANNEL_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS canais_meta (
+    url TEXT PRIMARY KEY,
+    entrada TEXT NOT NULL
+);
+"""
+
+_schema_ready = set()
+
+
+def _connect(cache_path):
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    new_file = not os.path.exists(cache_path)
+    # Mesmas escolhas da fila e da agenda: sem WAL (funciona em NFS/SMB)
+    conn = sqlite3.connect(cache_path, timeout=60, isolation_level=None)
+    if new_file or cache_path not in _schema_ready:
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.executescript(CHANNEL_CACHE_SCHEMA)
+        _schema_ready.add(cache_path)
+    return conn
+
+
+def load_channel_cache(cache_path=CHANNEL_CACHE_PATH):
+    """Retorna o dict completo url_do_canal -> metadados (vazio se o banco não existir)."""
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        conn = _connect(cache_path)
+        try:
+            return {url: json.loads(entry) for url, entry in conn.execute("SELECT url, entrada FROM canais_meta")}
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Não foi possível ler o cache de canais {cache_path}: {e}")
+        return {}
+
+
+def get_cached_channel_meta(channel_url, max_age_days=CHANNEL_CACHE_TTL_DAYS, cache_path=CHANNEL_CACHE_PATH):
+    """Metadados do canal em cache, ou None se não existirem ou tiverem passado do TTL."""
+    if not os.path.exists(cache_path):
+        return None
+    conn = _connect(cache_path)
+    try:
+        row = conn.execute("SELECT entrada FROM canais_meta WHERE url = ?", (channel_url,)).fetchone()
+    finally:
+        conn.close()
+    if not row:
+        return None
+    entry = json.loads(row[0])
+    if time.time() - entry.get('atualizado_em', 0) > max_age_days * 86400:
+        return None
+    return entry
+
+
+def update_channel_meta(channel_url, meta, cache_path=CHANNEL_CACHE_PATH):
+    """Grava/atualiza os metadados de um canal (UPSERT de uma única linha; os outros canais não são tocados)."""
+    entry = dict(meta, atualizado_em=time.time())
+    conn = _connect(cache_path)
+    try:
+        conn.execute(
+            "INSERT INTO canais_meta (url, entrada) VALUES (?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET entrada = excluded.entrada",
+            (channel_url, json.dumps(entry, ensure_ascii=False))
+        )
+    finally:
+        conn.close()
+    return entry
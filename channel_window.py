@@ -0,0 +1,120 @@
+import os
+import re
+import time
+import logging
+from collections import Counter
+from datetime import datetime
+
+from file_utils import atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+# === Janela deslizante dos últimos vídeos de cada canal ===
+# Cada vídeo tem suas contagens de palavras calculadas uma única vez e guardadas no estado da
+# janela; a tabela agregada do canal é atualizada somando os vídeos novos e subtraindo os que saíram.
+VIDEO_WINDOW_SIZE = 20
+WINDOW_DIR = os.path.join("trans", "janelas")
+
+# Metadados do vídeo guardados na janela (além das contagens)
+WINDOW_VIDEO_FIELDS = ('id', 'titulo', 'url', 'data_publicacao', 'visualizacoes', 'idioma_transcricao_original')
+# Vídeos sem transcrição também entram na janela (sem contagens), para não serem extraídos de
+# novo a cada coleta; depois deste prazo são tentados outra vez (a legenda automática pode
+# ficar pronta horas depois da publicação).
+MISSING_TRANSCRIPT_RETRY_SECONDS = 24 * 60 * 60
+
+
+def window_state_path(channel_url, window_dir=WINDOW_DIR):
+    # Chave derivada da URL (o nome do canal pode mudar entre coletas)
+    key = channel_url.split('youtube.com/', 1)[-1].rstrip('/')
+    key = re.sub(r'[^a-zA-Z0-9_.-]', '_', key)[:100]
+    return os.path.join(window_dir, f"{key}.json")
+
+
+def load_window_state(channel_url, window_dir=WINDOW_DIR):
+    """
+    Estado da janela do canal: {'url', 'nome_canal', 'videos': [...], 'agregado': {...}}.
+
+    `videos` fica do mais recente para o mais antigo e cada item traz os metadados do vídeo
+    e suas 'frequencias'. Retorna um estado vazio se o arquivo não existir.
+    """
+    state = read_json(window_state_path(channel_url, window_dir))
+    if not state or 'videos' not in state:
+        return {'url': channel_url, 'nome_canal': None, 'videos': [], 'agregado': {}}
+    return state
+
+
+def make_window_entry(video_entry, frequencies):
+    """Entrada da janela para um vídeo processado (metadados + contagem de palavras)."""
+    entry = {field: video_entry.get(field) for field in WINDOW_VIDEO_FIELDS}
+    entry['frequencias'] = dict(frequencies)
+    return entry
+
+
+def make_missing_transcript_entry(video_entry):
+    """Entrada da janela para um vídeo sem transcrição (ver MISSING_TRANSCRIPT_RETRY_SECONDS)."""
+    entry = make_window_entry(video_entry, {})
+    entry['sem_transcricao'] = True
+    entry['verificado_em'] = time.time()
+    return entry
+
+
+def should_retry_transcript(entry, now=None, retry_seconds=None):
+    """True se a entrada é de um vídeo sem transcrição verificado há mais de `retry_seconds` (padrão: MISSING_TRANSCRIPT_RETRY_SECONDS)."""
+    if not entry.get('sem_transcricao'):
+        return False
+    if retry_seconds is None:
+        retry_seconds = MISSING_TRANSCRIPT_RETRY_SECONDS
+    return (now or time.time()) - entry.get('verificado_em', 0) >= retry_seconds
+
+
+def update_window(state, latest_video_ids, new_entries, window_size=VIDEO_WINDOW_SIZE):
+    """
+    Move a janela para os vídeos de `latest_video_ids` (do mais recente para o mais antigo).
+
+    Args:
+        state (dict): Estado retornado por load_window_state.
+        latest_video_ids (list): IDs dos vídeos mais recentes do canal.
+        new_entries (dict): video_id -> entrada (make_window_entry) dos vídeos processados agora.
+
+    Returns:
+        tuple: (novo_estado, ids_adicionados, ids_removidos). O agregado é ajustado apenas
+        com as contagens dos vídeos que entraram e saíram da janela. Um vídeo que já estava na
+        janela e foi processado de novo (ex.: transcrição obtida depois de uma tentativa sem
+        sucesso) aparece nas duas listas: sua contagem antiga sai e a nova entra.
+    """
+    previous = {entry['id']: entry for entry in state.get('videos', [])}
+    available = dict(previous)
+    available.update(new_entries)
+
+    window = []
+    window_ids = set()
+    for video_id in latest_video_ids:
+        if len(window) >= window_size:
+            break
+        if video_id in available and video_id not in window_ids:
+            window.append(available[video_id])
+            window_ids.add(video_id)
+
+    recounted = {
+        video_id for video_id, entry in new_entries.items()
+        if video_id in previous and previous[video_id].get('frequencias') != entry.get('frequencias')
+    }
+    added = [video_id for video_id in window_ids if video_id not in previous or video_id in recounted]
+    removed = [video_id for video_id in previous if video_id not in window_ids or video_id in recounted]
+
+    aggregate = Counter(state.get('agregado') or {})
+    for video_id in added:
+        aggregate.update(available[video_id].get('frequencias') or {})
+    for video_id in removed:
+        aggregate.subtract(previous[video_id].get('frequencias') or {})
+    aggregate = +aggregate # Remove termos que zeraram
+
+    new_state = dict(state, videos=window, agregado=dict(aggregate.most_common()))
+    return new_state, added, removed
+
+
+def save_window_state(state, window_dir=WINDOW_DIR):
+    path = window_state_path(state['url'], window_dir)
+    state = dict(state, atualizado_em=datetime.now().isoformat(timespec='seconds'))
+    atomic_write_json(path, state, compact=True)
+    return path
@@ -0,0 +1,215 @@
+import os
+import sys
+import signal
+import logging
+import subprocess
+from datetime import datetime
+
+from file_utils import atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+# === Execução da coleta em segundo plano ===
+# Um único coletor por vez (lock com o PID) e um arquivo de status que a interface consulta.
+JOB_DIR = "execucao"
+LOCK_PATH = os.path.join(JOB_DIR, "coleta.lock")
+STATUS_PATH = os.path.join(JOB_DIR, "status_coleta.json")
+JOB_LOG_PATH = os.path.join(JOB_DIR, "coleta_saida.log")
+
+# Estados gravados em STATUS_PATH
+STATE_STARTING = "iniciando"
+STATE_RUNNING = "executando"
+STATE_CANCELLING = "cancelando"
+STATE_FINISHED = "concluido"
+STATE_FAILED = "erro"
+STATE_CANCELLED = "cancelado"
+FINAL_STATES = (STATE_FINISHED, STATE_FAILED, STATE_CANCELLED)
+
+# PID de quem reservou o lock ao disparar a coleta; o processo filho assume o lock no lugar dele
+INHERITED_LOCK_ENV = "COLETA_LOCK_PID_PAI"
+
+_spawned_processes = []
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError: # Existe, mas pertence a outro usuário
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def read_lock_pid(lock_path=LOCK_PATH):
+    try:
+        with open(lock_path, 'r', encoding='utf-8') as f:
+            return int(f.read().strip() or 0) or None
+    except (OSError, ValueError):
+        return None
+
+
+def acquire_run_lock(lock_path=LOCK_PATH):
+    """
+    Tenta obter o lock exclusivo da coleta para o processo atual.
+
+    Locks de processos que já terminaram (ex.: após um crash) são removidos automaticamente.
+
+    Returns:
+        bool: True se o lock foi obtido, False se outra coleta está em andamento.
+    """
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            pid = read_lock_pid(lock_path)
+            if pid == os.getpid(): # Já gravado em nosso nome por quem nos iniciou
+                return True
+            if pid and pid == _inherited_lock_pid():
+                # Lock reservado pela interface ao iniciar este processo: assume a posse
+                _write_lock_pid(lock_path, os.getpid())
+                return True
+            if pid and _pid_alive(pid):
+                return False
+            logger.warning(f"Removendo lock órfão da coleta (PID {pid}).")
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+            continue
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def _inherited_lock_pid():
+    try:
+        return int(os.environ.get(INHERITED_LOCK_ENV, '0')) or None
+    except ValueError:
+        return None
+
+
+def _write_lock_pid(lock_path, pid):
+    with open(lock_path, 'w', encoding='utf-8') as f:
+        f.write(str(pid))
+
+
+def release_run_lock(lock_path=LOCK_PATH):
+    """Libera o lock, se ele pertencer ao processo atual."""
+    if read_lock_pid(lock_path) == os.getpid():
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+
+def _reap_children():
+    # Coleta o status de saída dos processos iniciados aqui, para que não virem zumbis
+    # (um zumbi ainda "existe" para os.kill e pareceria uma coleta em andamento).
+    for process in list(_spawned_processes):
+        if process.poll() is not None:
+            _spawned_processes.remove(process)
+
+
+def running_job_pid(lock_path=LOCK_PATH):
+    """PID da coleta em andamento, ou None."""
+    _reap_children()
+    pid = read_lock_pid(lock_path)
+    return pid if pid and _pid_alive(pid) else None
+
+
+def read_status(status_path=STATUS_PATH):
+    return read_json(status_path, default={}) or {}
+
+
+def write_status(status_path=STATUS_PATH, **fields):
+    """Atualiza (mesclando) o arquivo de status da coleta."""
+    status = read_status(status_path)
+    status.update(fields)
+    status['atualizado_em'] = datetime.now().isoformat(timespec='seconds')
+    try:
+        atomic_write_json(status_path, status)
+    except Exception as e:
+        logger.warning(f"Não foi possível atualizar o status da coleta: {e}")
+    return status
+
+
+def start_collection_job(script_path, log_path=JOB_LOG_PATH):
+    """
+    Inicia o script de coleta como processo independente (sobrevive ao rerun/fechamento da página).
+
+    Returns:
+        int | None: PID do processo iniciado, ou None se já houver uma coleta em andamento.
+    """
+    # Reserva o lock antes de iniciar o processo: dois cliques simultâneos não geram duas coletas
+    if not acquire_run_lock():
+        return None
+    os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+    popen_kwargs = {}
+    if os.name == 'posix':
+        popen_kwargs['start_new_session'] = True # Grupo de processos próprio (permite cancelar tudo de uma vez)
+    else:
+        popen_kwargs['creationflags'] = getattr(subprocess, 'CREATE_NEW_PROCESS_GROUP', 0)
+    env = dict(os.environ, **{INHERITED_LOCK_ENV: str(os.getpid())})
+    try:
+        with open(log_path, 'w', encoding='utf-8') as log_file:
+            process = subprocess.Popen(
+                [sys.executable, script_path],
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                cwd=os.path.dirname(script_path) or None,
+                env=env,
+                **popen_kwargs
+            )
+    except Exception:
+        release_run_lock()
+        raise
+    _write_lock_pid(LOCK_PATH, process.pid) # O filho também assume o lock sozinho, via INHERITED_LOCK_ENV
+    _spawned_processes.append(process)
+    write_status(
+        estado=STATE_STARTING, pid=process.pid, iniciado_em=datetime.now().isoformat(timespec='seconds'),
+        finalizado_em=None, total=None, concluidos=0, falhas=0, canal_atual=None, mensagem=None
+    )
+    return process.pid
+
+
+def cancel_collection_job():
+    """Envia SIGTERM para a coleta em andamento. Retorna True se havia uma coleta para cancelar."""
+    pid = running_job_pid()
+    if not pid:
+        return False
+    write_status(estado=STATE_CANCELLING)
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(os.getpgid(pid), signal.SIGTERM)
+        else:
+            os.kill(pid, signal.SIGTERM)
+    except OSError as e:
+        logger.error(f"Erro ao cancelar a coleta (PID {pid}): {e}")
+        return False
+    return True
+
+
+def tail_job_log(max_lines=50, log_path=JOB_LOG_PATH):
+    """Últimas linhas da saída da coleta em segundo plano."""
+    try:
+        with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - max_lines * 300)) # Lê apenas o final do arquivo
+            return f.read().splitlines()[-max_lines:]
+    except OSError:
+        return []
+
+
+def install_cancel_handler():
+    """Converte SIGTERM em KeyboardInterrupt para que o coletor libere o lock e grave o status ao ser cancelado."""
+    def _handle_sigterm(signum, frame):
+        raise KeyboardInterrupt("Coleta cancelada (SIGTERM)")
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+
@@ -0,0 +1,115 @@
+import os
+import logging
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction import DictVectorizer
+from sklearn.feature_extraction.text import TfidfTransformer
+
+from file_utils import atomic_write_json
+from wordcloud_processor import load_frequency_table, submit_wordcloud_render
+
+logger = logging.getLogger(__name__)
+
+# Nuvens de "termos distintivos" (TF-IDF entre canais), salvas dentro de TRANS_DIR
+DISTINCTIVE_SUBDIR_NAME = "nuvens_distintivas"
+# Matriz documento-termo (contagens brutas) reaproveitável por outras análises
+TERM_MATRIX_FILENAME = "matriz_termos.npz"
+TERM_MATRIX_INDEX_FILENAME = "matriz_termos_indice.json"
+# Quantidade de termos distintivos por canal usados na nuvem
+DISTINCTIVE_TOP_TERMS = 100
+
+
+def build_term_matrix(frequency_tables):
+    """
+    Monta a matriz esparsa documento-termo (um canal por linha) a partir das tabelas de frequência.
+
+    Returns:
+        tuple: (scipy.sparse.csr_matrix de contagens, lista de termos na ordem das colunas)
+    """
+    vectorizer = DictVectorizer(dtype=np.float32, sparse=True, sort=True)
+    matrix = vectorizer.fit_transform(frequency_tables).tocsr()
+    return matrix, list(vectorizer.get_feature_names_out())
+
+
+def compute_tfidf(count_matrix):
+    """TF-IDF vetorizado sobre a matriz de contagens (tf sublinear, idf suavizado, normalização L2)."""
+    transformer = TfidfTransformer(sublinear_tf=True, smooth_idf=True, norm='l2')
+    return transformer.fit_transform(count_matrix).tocsr()
+
+
+def top_terms_per_row(weights, vocabulary, top_n=DISTINCTIVE_TOP_TERMS):
+    """Retorna, para cada linha da matriz CSR, um dict termo -> peso com os `top_n` maiores pesos."""
+    top_terms = []
+    for row in range(weights.shape[0]):
+        start, end = weights.indptr[row], weights.indptr[row + 1]
+        row_data = weights.data[start:end]
+        row_indices = weights.indices[start:end]
+        if len(row_data) > top_n:
+            selected = np.argpartition(row_data, -top_n)[-top_n:]
+        else:
+            selected = np.arange(len(row_data))
+        top_terms.append({vocabulary[row_indices[i]]: float(row_data[i]) for i in selected})
+    return top_terms
+
+
+def save_term_matrix(count_matrix, vocabulary, channel_names, output_dir):
+    """Grava a matriz de contagens (.npz) e o índice de linhas/colunas (.json) em `output_dir`."""
+    matrix_path = os.path.join(output_dir, TERM_MATRIX_FILENAME)
+    sparse.save_npz(matrix_path, count_matrix, compressed=True)
+    atomic_write_json(os.path.join(output_dir, TERM_MATRIX_INDEX_FILENAME), {
+        'canais': channel_names,
+        'termos': vocabulary,
+    }, compact=True)
+    logger.info(f"Matriz documento-termo salva em: {matrix_path} ({count_matrix.shape[0]} canais x {count_matrix.shape[1]} termos)")
+    return matrix_path
+
+
+def analyze_distinctive_terms(all_channel_data, trans_dir, image_format='png'):
+    """
+    Calcula os termos distintivos de cada canal (TF-IDF entre todos os canais) e gera uma nuvem por canal.
+
+    Usa as tabelas de frequência já salvas pela coleta ('caminho_frequencias') e preenche
+    'caminho_nuvem_distintiva' (relativo a `trans_dir`) em cada canal processado.
+    """
+    channels = []
+    frequency_tables = []
+    for channel_data in all_channel_data:
+        relative_path = channel_data.get('caminho_frequencias')
+        table = load_frequency_table(os.path.join(trans_dir, relative_path)) if relative_path else None
+        if table:
+            channels.append(channel_data)
+            frequency_tables.append(table)
+
+    if len(channels) < 2:
+        logger.info("Menos de dois canais com tabela de frequências. Análise de termos distintivos ignorada.")
+        return all_channel_data
+
+    try:
+        count_matrix, vocabulary = build_term_matrix(frequency_tables)
+        save_term_matrix(count_matrix, vocabulary, [c['nome_canal'] for c in channels], trans_dir)
+        distinctive_terms = top_terms_per_row(compute_tfidf(count_matrix), vocabulary)
+    except Exception as e:
+        logger.error(f"Erro ao calcular a matriz TF-IDF entre canais: {e}")
+        return all_channel_data
+
+    # Agenda todas as nuvens no pool de processos antes de esperar por qualquer uma
+    output_dir = os.path.join(trans_dir, DISTINCTIVE_SUBDIR_NAME)
+    pending = []
+    for channel_data, terms in zip(channels, distinctive_terms):
+        base_name = os.path.basename(channel_data['caminho_frequencias']).removesuffix('.freq.json')
+        filename = f"wcd_{base_name}.{image_format}"
+        future = submit_wordcloud_render(terms, os.path.join(output_dir, filename), image_format=image_format)
+        pending.append((channel_data, filename, future))
+
+    for channel_data, filename, future in pending:
+        try:
+            generated_path = future.result()
+        except Exception as e:
+            logger.error(f"Erro ao gerar a nuvem de termos distintivos para '{channel_data['nome_canal']}': {e}")
+            generated_path = None
+        if generated_path:
+            channel_data['caminho_nuvem_distintiva'] = os.path.join(DISTINCTIVE_SUBDIR_NAME, filename)
+        else:
+            logger.warning(f"Não foi possível gerar a nuvem de termos distintivos para '{channel_data['nome_canal']}'.")
+    return all_channel_data
@@ -0,0 +1,40 @@
+import os
+import json
+import tempfile
+
+
+def atomic_write_json(path, data, compact=False):
+    """
+    Grava `data` como JSON em `path` de forma atômica (arquivo temporário + os.replace),
+    para que leitores concorrentes nunca vejam um arquivo pela metade.
+
+    Args:
+        path (str): Caminho final do arquivo.
+        data: Objeto serializável em JSON.
+        compact (bool): Se True, grava sem indentação e sem espaços extras.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            if compact:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            else:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_json(path, default=None):
+    """Lê um arquivo JSON, retornando `default` se ele não existir ou estiver corrompido."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
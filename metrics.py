@@ -0,0 +1,209 @@
+import os
+import glob
+import time
+import logging
+import threading
+import contextvars
+from datetime import datetime
+from contextlib import contextmanager
+
+from file_utils import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# === Métricas de tempo por etapa da coleta ===
+METRICS_DIR = "metricas"
+PROMETHEUS_FILENAME = "coleta.prom" # Formato texto do Prometheus (ex.: para o textfile collector do node_exporter)
+LATEST_SUMMARY_FILENAME = "ultima_coleta.json" # Lido pela interface
+RUN_SUMMARY_GLOB = "coleta_*.json" # Resumos por execução (coleta_<data>_<hora>.json)
+RUN_SUMMARIES_KEPT = 30 # Resumos por execução mantidos; os mais antigos são apagados a cada gravação
+# Limites (em segundos) dos buckets dos histogramas de duração
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Canal em processamento na thread/contexto atual (definido por process_channel)
+_current_channel = contextvars.ContextVar('metrics_current_channel', default=None)
+
+
+class _StageTimer:
+    def __init__(self):
+        self.failed = False
+
+    def fail(self):
+        """Marca a etapa como falha sem lançar exceção (para funções que retornam None em caso de erro)."""
+        self.failed = True
+
+
+class _StageStats:
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+    def add(self, seconds, failed):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if failed:
+            self.failures += 1
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+
+    def as_dict(self):
+        return {
+            'execucoes': self.count,
+            'falhas': self.failures,
+            'total_segundos': round(self.total, 4),
+            'media_segundos': round(self.total / self.count, 4) if self.count else 0.0,
+            'max_segundos': round(self.max, 4),
+        }
+
+
+class MetricsRecorder:
+    """Acumula duração, contagem e falhas por etapa e por (canal, etapa). Seguro para várias threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self._channel_stages = {}
+            self._started_at = time.time()
+
+    @contextmanager
+    def channel(self, channel_name):
+        """Associa as etapas medidas dentro do bloco ao canal informado."""
+        token = _current_channel.set(channel_name)
+        try:
+            yield
+        finally:
+            _current_channel.reset(token)
+
+    @contextmanager
+    def stage(self, name, channel=None):
+        """Mede a duração de uma etapa; exceções contam como falha e são propagadas."""
+        timer = _StageTimer()
+        started = time.perf_counter()
+        try:
+            yield timer
+        except BaseException:
+            timer.failed = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, channel=channel, failed=timer.failed)
+
+    def record(self, name, seconds, channel=None, failed=False):
+        channel = channel or _current_channel.get()
+        with self._lock:
+            self._stages.setdefault(name, _StageStats()).add(seconds, failed)
+            if channel:
+                self._channel_stages.setdefault((channel, name), _StageStats()).add(seconds, failed)
+
+    def summary(self):
+        """Resumo em dict (serializável em JSON) com os totais por etapa e por canal."""
+        with self._lock:
+            channels = {}
+            for (channel, name), stats in sorted(self._channel_stages.items()):
+                channels.setdefault(channel, {})[name] = stats.as_dict()
+            return {
+                'iniciado_em': datetime.fromtimestamp(self._started_at).isoformat(timespec='seconds'),
+                'finalizado_em': datetime.now().isoformat(timespec='seconds'),
+                'duracao_total_segundos': round(time.time() - self._started_at, 3),
+                'etapas': {name: stats.as_dict() for name, stats in sorted(self._stages.items())},
+                'canais': channels,
+            }
+
+    def to_prometheus(self):
+        """Exporta as métricas no formato texto do Prometheus."""
+        lines = [
+            "# HELP coleta_etapa_duracao_segundos Duração das etapas da coleta.",
+            "# TYPE coleta_etapa_duracao_segundos histogram",
+        ]
+        with self._lock:
+            stages = sorted(self._stages.items())
+            channel_stages = sorted(self._channel_stages.items())
+            started_at = self._started_at
+
+        for name, stats in stages:
+            label = f'etapa="{_escape_label(name)}"'
+            for bound, bucket_count in zip(DURATION_BUCKETS, stats.buckets):
+                lines.append(f'coleta_etapa_duracao_segundos_bucket{{{label},le="{bound}"}} {bucket_count}')
+            lines.append(f'coleta_etapa_duracao_segundos_bucket{{{label},le="+Inf"}} {stats.count}')
+            lines.append(f'coleta_etapa_duracao_segundos_sum{{{label}}} {stats.total:.6f}')
+            lines.append(f'coleta_etapa_duracao_segundos_count{{{label}}} {stats.count}')
+
+        lines += ["# HELP coleta_etapa_falhas_total Falhas por etapa da coleta.", "# TYPE coleta_etapa_falhas_total counter"]
+        for name, stats in stages:
+            lines.append(f'coleta_etapa_falhas_total{{etapa="{_escape_label(name)}"}} {stats.failures}')
+
+        lines += [
+            "# HELP coleta_canal_etapa_duracao_segundos_total Tempo acumulado por canal e etapa.",
+            "# TYPE coleta_canal_etapa_duracao_segundos_total counter",
+        ]
+        for (channel, name), stats in channel_stages:
+            labels = f'canal="{_escape_label(channel)}",etapa="{_escape_label(name)}"'
+            lines.append(f'coleta_canal_etapa_duracao_segundos_total{{{labels}}} {stats.total:.6f}')
+        lines += ["# HELP coleta_canal_etapa_falhas_total Falhas por canal e etapa.", "# TYPE coleta_canal_etapa_falhas_total counter"]
+        for (channel, name), stats in channel_stages:
+            labels = f'canal="{_escape_label(channel)}",etapa="{_escape_label(name)}"'
+            lines.append(f'coleta_canal_etapa_falhas_total{{{labels}}} {stats.failures}')
+
+        lines += [
+            "# HELP coleta_execucao_duracao_segundos Duração total da última coleta.",
+            "# TYPE coleta_execucao_duracao_segundos gauge",
+            f"coleta_execucao_duracao_segundos {time.time() - started_at:.3f}",
+            "# HELP coleta_execucao_timestamp_segundos Momento (epoch) do fim da última coleta.",
+            "# TYPE coleta_execucao_timestamp_segundos gauge",
+            f"coleta_execucao_timestamp_segundos {time.time():.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, output_dir=METRICS_DIR, keep_runs=None):
+        """
+        Grava o arquivo .prom, o resumo JSON da execução (com data) e o resumo mais recente, e
+        mantém apenas os `keep_runs` resumos por execução mais novos (padrão: RUN_SUMMARIES_KEPT).
+        """
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            prometheus_path = os.path.join(output_dir, PROMETHEUS_FILENAME)
+            tmp_path = prometheus_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, prometheus_path)
+
+            summary = self.summary()
+            run_path = os.path.join(output_dir, f"coleta_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+            atomic_write_json(run_path, summary)
+            atomic_write_json(os.path.join(output_dir, LATEST_SUMMARY_FILENAME), summary)
+            prune_run_summaries(output_dir, RUN_SUMMARIES_KEPT if keep_runs is None else keep_runs)
+            logger.info(f"Métricas da coleta salvas em: {prometheus_path} e {run_path}")
+            return prometheus_path, run_path
+        except Exception as e:
+            logger.error(f"Erro ao salvar métricas da coleta: {e}")
+            return None, None
+
+
+def prune_run_summaries(output_dir=METRICS_DIR, keep_runs=RUN_SUMMARIES_KEPT):
+    """Apaga os resumos por execução mais antigos, mantendo os `keep_runs` mais novos. Retorna quantos removeu."""
+    # O nome traz a data e a hora, então a ordem alfabética é a cronológica
+    run_paths = sorted(glob.glob(os.path.join(output_dir, RUN_SUMMARY_GLOB)))
+    removed = 0
+    for path in run_paths[:-max(1, keep_runs)]:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError as e:
+            logger.warning(f"Não foi possível remover o resumo de métricas {path}: {e}")
+    return removed
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Instância compartilhada pelo coletor
+METRICS = MetricsRecorder()
@@ -1,47 +1,88 @@
 import os
 import re
+import sys
 import json
+import argparse
 # import time # Não é mais estritamente necessário sem Selenium, mas pode ser útil para delays futuros
 import textwrap
 import logging
+from collections import Counter
 from datetime import datetime
 # from bs4 import BeautifulSoup # Não é mais usado
 # from deep_translator import GoogleTranslator # Removido, pois não há mais tradução
-from yt_dlp import YoutubeDL
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from xml.etree import ElementTree # For parsing .srv3 subtitles if needed
 
 # Importar o novo módulo e suas constantes/funções
-from wordcloud_processor import generate_wordcloud_from_text, WORDCLOUDS_SUBDIR_NAME, get_portuguese_stopwords
+from wordcloud_processor import (
+    render_wordcloud_renditions_in_pool, shutdown_render_pool, WORDCLOUDS_SUBDIR_NAME,
+    compute_word_frequencies, save_frequency_table
+)
+from transcript_cache import get_cached_video, save_cached_video, evict_cache
+from subtitle_parser import parse_subtitle, SUBTITLE_FORMAT_PREFERENCE
+from async_collector import collect_channels, is_rate_limit_error, RateLimitError
+from transcript_store import save_channel_to_store
+from term_trends import record_video_terms
+from work_queue import WorkQueue, QUEUE_DB_PATH
+from refresh_schedule import split_due_channels, record_channel_check, get_schedule_entry
+from report_store import write_report, compact_reports
+from file_utils import atomic_write_json, read_json
+from metrics import METRICS
+from collection_job import (
+    acquire_run_lock, release_run_lock, install_cancel_handler, write_status,
+    STATE_RUNNING, STATE_FINISHED, STATE_FAILED, STATE_CANCELLED
+)
+from channel_window import (
+    VIDEO_WINDOW_SIZE, load_window_state, make_window_entry, make_missing_transcript_entry,
+    should_retry_transcript, update_window, save_window_state
+)
+from channel_meta_cache import (
+    get_cached_channel_meta, update_channel_meta, load_channel_cache,
+    DOWNLOAD_CHANNEL_IMAGES, CHANNEL_IMAGES_DIR
+)
 
 # === Configuração de diretórios ===
 LOG_DIR = "logs"
 TRANS_DIR = "trans"
 REPORT_DIR = "relatorios"
-# Adicionar um diretório temporário para legendas baixadas por yt-dlp
-SUBTITLES_TEMP_DIR = os.path.join(TRANS_DIR, "temp_subs")
+# Índice leve lido pela interface Streamlit (sem as transcrições)
+MANIFEST_FILENAME = "manifesto.json"
 # Adicionar diretório para nuvens de palavras (dentro de TRANS_DIR)
 WORDCLOUDS_DIR = os.path.join(TRANS_DIR, WORDCLOUDS_SUBDIR_NAME)
 
 
-# Adicionar WORDCLOUDS_DIR à criação de diretórios
-for dir_path in [LOG_DIR, TRANS_DIR, REPORT_DIR, SUBTITLES_TEMP_DIR, WORDCLOUDS_DIR]:
-    os.makedirs(dir_path, exist_ok=True)
+# Diretórios e logging são preparados em main (setup_collection), não na importação:
+# importar este módulo não cria arquivos nem carrega dependências pesadas.
+def create_directories():
+    for dir_path in [LOG_DIR, TRANS_DIR, REPORT_DIR, WORDCLOUDS_DIR]:
+        os.makedirs(dir_path, exist_ok=True)
 
 # === Logging com arquivo por data ===
-log_filename = os.path.join(LOG_DIR, f"coleta_{datetime.now().strftime('%Y%m%d')}.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(module)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_filename, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+def configure_logging():
+    log_filename = os.path.join(LOG_DIR, f"coleta_{datetime.now().strftime('%Y%m%d')}.log")
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(module)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_filename, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+
+def setup_collection():
+    create_directories()
+    configure_logging()
+
 logger = logging.getLogger(__name__)
 
-# Carregar stopwords uma vez para reutilização
-PORTUGUESE_STOPWORDS = get_portuguese_stopwords()
+def YoutubeDL(params=None):
+    """yt_dlp.YoutubeDL, importado apenas na primeira coleta (o import do yt_dlp é lento)."""
+    from yt_dlp import YoutubeDL as _YoutubeDL
+    return _YoutubeDL(params)
+
+# Idioma preferido das transcrições (também faz parte da chave do cache de transcrições)
+TRANSCRIPT_LANG = 'pt'
+
+# Formato das imagens das nuvens de palavras: 'png', 'webp' ou 'svg'
+WORDCLOUD_FORMAT = 'png'
 
 
 # === URLs dos canais ===
@@ -93,7 +134,7 @@ def get_latest_channel_videos(channel_url, num_videos=1):
     videos = []
     channel_title_from_playlist = None
     try:
-        with YoutubeDL(ydl_opts) as ydl:
+        with METRICS.stage('playlist'), YoutubeDL(ydl_opts) as ydl:
             playlist_info = ydl.extract_info(channel_url, download=False)
             channel_title_from_playlist = playlist_info.get('uploader') or playlist_info.get('channel') or playlist_info.get('title')
 
@@ -112,201 +153,234 @@ def get_latest_channel_videos(channel_url, num_videos=1):
                         })
                 return videos
     except Exception as e:
+        if is_rate_limit_error(e): # Propaga para o coletor fazer backoff
+            raise RateLimitError(str(e)) from e
         logger.error(f"Erro ao buscar vídeos do canal {channel_url}: {e}")
     return []
 
 
-# === Utilitários de Parse de Legendas ===
-def parse_vtt_content(vtt_content):
-    lines = vtt_content.splitlines()
-    transcript_parts = []
-    for line in lines:
-        line = line.strip()
-        if not line or "WEBVTT" in line or "-->" in line or re.match(r'^\d+$', line):
-            continue
-        line = re.sub(r'<[^>]+>', '', line)
-        line = re.sub(r' ', ' ', line) # Trata non-breaking space (U+00A0)
-        line = re.sub(r'\s+', ' ', line).strip()
-        if line:
-            transcript_parts.append(line)
-    return '\n'.join(transcript_parts)
-
-def parse_srv3_content(srv3_content):
+# === Banner do canal (cache em disco lido pela interface) ===
+def fetch_channel_banner_url(channel_url):
+    ydl_opts = {
+        'quiet': True,
+        'extract_flat': 'in_playlist',
+        'dump_single_json': True,
+        'playlist_items': '0',
+        'nocheckcertificate': True,
+        'geo_bypass_country': 'BR',
+    }
+    channel_page_url = channel_url.rsplit("/videos", 1)[0] if channel_url.endswith("/videos") else channel_url
+    with YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(channel_page_url, download=False)
+        thumbnails = info.get('thumbnails')
+        if thumbnails:
+            banner_thumbnail = thumbnails[-1]
+            for thumb in reversed(thumbnails):
+                if (thumb.get('width') or 0) > 1000 and thumb.get('url'):
+                    banner_thumbnail = thumb
+                    break
+            return banner_thumbnail.get('url')
+    return None
+
+def _download_channel_image(image_url, channel_name):
+    path = os.path.join(CHANNEL_IMAGES_DIR, f"banner_{sanitize_filename(channel_name)}.jpg")
+    os.makedirs(CHANNEL_IMAGES_DIR, exist_ok=True)
+    with YoutubeDL({'quiet': True, 'nocheckcertificate': True}) as ydl:
+        with ydl.urlopen(image_url) as response:
+            content = response.read()
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+def ensure_channel_meta(channel_url, channel_name):
+    """Resolve banner do canal uma vez e guarda no cache em disco (respeitando o TTL)."""
+    cached = get_cached_channel_meta(channel_url)
+    if cached:
+        return cached
+    meta = {'nome_canal': channel_name, 'banner_url': None, 'banner_arquivo': None}
     try:
-        root = ElementTree.fromstring(srv3_content)
-        texts = []
-        for p_element in root.findall('.//p'):
-            if p_element.text:
-                texts.append(p_element.text.strip())
-        if not texts: # Fallback se não encontrar em <p>
-            for text_element in root.findall('.//text'):
-                if text_element.text:
-                    texts.append(text_element.text.strip())
-        return '\n'.join(texts)
-    except ElementTree.ParseError as e:
-        logger.error(f"Erro ao parsear conteúdo SRV3 (XML): {e}")
-        # Tenta extração bruta como fallback
-        plain_text = re.sub(r'<[^>]+>', ' ', srv3_content)
-        plain_text = re.sub(r'\s+', ' ', plain_text).strip()
-        return plain_text
+        meta['banner_url'] = fetch_channel_banner_url(channel_url)
+        if meta['banner_url'] and DOWNLOAD_CHANNEL_IMAGES:
+            meta['banner_arquivo'] = _download_channel_image(meta['banner_url'], channel_name)
     except Exception as e:
-        logger.error(f"Erro inesperado ao parsear SRV3: {e}")
-        return ""
-
+        logger.warning(f"Não foi possível obter o banner do canal {channel_url}: {e}")
+        return None # Não grava no cache: tenta de novo na próxima coleta
+    return update_channel_meta(channel_url, meta)
+
+
+# === Coleta de metadados e transcrição com yt-dlp (uma única extração) ===
+def _extract_video_metadata(info_dict):
+    publish_date_final = None
+    publish_date_str = info_dict.get('upload_date') # YYYYMMDD
+    if publish_date_str:
+        try:
+            publish_date_final = datetime.strptime(publish_date_str, '%Y%m%d').strftime('%Y-%m-%d')
+        except ValueError:
+            logger.warning(f"Data de publicação em formato inesperado: {publish_date_str}")
+    return {
+        'data_publicacao': publish_date_final,
+        'visualizacoes': info_dict.get('view_count'),
+        'uploader': info_dict.get('uploader') or info_dict.get('channel'),
+    }
 
-# === Coleta de transcrição com yt-dlp ===
-def get_transcript_with_yt_dlp(video_id, preferred_lang='pt'):
+def _fetch_subtitle_with_ydl(ydl, subtitle_url):
+    """Fetcher padrão: baixa o conteúdo da legenda em memória usando a sessão HTTP do próprio yt-dlp."""
+    with ydl.urlopen(subtitle_url) as response:
+        return response.read().decode('utf-8', errors='replace')
+
+def _select_requested_subtitle(requested_subtitles, preferred_lang):
+    # Prioriza o idioma preferido, depois a variante brasileira e por fim o inglês
+    for lang in (preferred_lang, 'pt-BR', 'en'):
+        if lang in requested_subtitles and requested_subtitles[lang]:
+            return lang, requested_subtitles[lang]
+    return None, None
+
+def fetch_video_with_transcript(video_id, preferred_lang='pt', subtitle_fetcher=None):
+    """
+    Obtém metadados e transcrição de um vídeo com uma única chamada a extract_info.
+
+    A legenda é lida diretamente de `requested_subtitles` para a memória, sem gravar
+    arquivos temporários em disco.
+
+    Args:
+        video_id (str): ID do vídeo no YouTube.
+        preferred_lang (str): Idioma preferido da legenda.
+        subtitle_fetcher (callable, optional): Função (ydl, url) -> str usada para baixar
+            o conteúdo da legenda. Se None, usa a sessão HTTP do yt-dlp.
+
+    Returns:
+        tuple: (metadados, transcricao). `metadados` é um dict com 'data_publicacao',
+        'visualizacoes' e 'uploader' (vazio se a extração falhar) e `transcricao` é o
+        dict da transcrição ou None.
+    """
     video_url = f"https://www.youtube.com/watch?v={video_id}"
-    subtitle_output_template = os.path.join(SUBTITLES_TEMP_DIR, f"{video_id}_subtitle")
+    fetch_subtitle = subtitle_fetcher or _fetch_subtitle_with_ydl
 
     ydl_opts = {
-        'writesubtitles': True,
+        'writesubtitles': True, # Necessário para o yt-dlp preencher 'requested_subtitles'
         'writeautomaticsub': True,
         'subtitleslangs': [preferred_lang, 'pt-BR'],
-        'subtitlesformat': 'vtt/srv3/best',
+        'subtitlesformat': SUBTITLE_FORMAT_PREFERENCE, # json3 primeiro: o formato mais barato de parsear
         'skip_download': True,
         'quiet': True,
         'nocheckcertificate': True,
         'logtostderr': False,
-        'outtmpl': subtitle_output_template,
         'geo_bypass_country': 'BR', # Adicionado
     }
 
     original_text = ""
     source_lang_of_transcript = None
-    actual_subtitle_file_path = None
+    metadata = {}
 
     try:
         with YoutubeDL(ydl_opts) as ydl:
-            logger.info(f"Tentando baixar legenda para {video_id} com template: {subtitle_output_template}")
-            info_dict = ydl.extract_info(video_url, download=True) # download=True para que as legendas sejam escritas
-
-            if 'requested_subtitles' in info_dict and info_dict['requested_subtitles']:
-                sub_info = None
-                # Prioriza o idioma preferido
-                if preferred_lang in info_dict['requested_subtitles']:
-                    sub_info = info_dict['requested_subtitles'][preferred_lang]
-                    source_lang_of_transcript = preferred_lang
-                elif 'en' in info_dict['requested_subtitles']: # Fallback para inglês
-                    sub_info = info_dict['requested_subtitles']['en']
-                    source_lang_of_transcript = 'en'
-                    logger.info(f"Legenda em '{preferred_lang}' não encontrada para {video_id}. Usando 'en'.")
-                # Adicionar mais fallbacks se necessário (ex: 'es', etc.)
-                
-                if sub_info and 'filepath' in sub_info and sub_info['filepath']:
-                    actual_subtitle_file_path = sub_info['filepath']
-                elif sub_info and 'data' in sub_info: # Se yt-dlp retornou os dados diretamente
-                    raw_content = sub_info['data']
-                    sub_ext = sub_info.get('ext', 'vtt') # Assume vtt se não especificado
-                    if sub_ext == 'vtt':
-                        original_text = parse_vtt_content(raw_content)
-                    elif sub_ext == 'srv3':
-                        original_text = parse_srv3_content(raw_content)
-                    else:
-                        logger.warning(f"Formato de legenda em 'data' não suportado '{sub_ext}' para {video_id}")
-                        return None
-                else: # Tenta encontrar o arquivo manualmente (fallback, 'filepath' deveria funcionar)
-                    logger.warning(f"'filepath' não encontrado em sub_info para {video_id}. Tentando busca manual.")
-                    
-                    langs_to_try = []
-                    if source_lang_of_transcript: # Se já sabemos o idioma de alguma forma
-                        langs_to_try.append(source_lang_of_transcript)
-                    if preferred_lang not in langs_to_try:
-                        langs_to_try.append(preferred_lang)
-                    if 'en' not in langs_to_try: # Garante que 'en' seja tentado se não for um dos anteriores
-                        langs_to_try.append('en')
-                    
-                    unique_langs_to_try = []
-                    seen_langs = set()
-                    for lang in langs_to_try:
-                        if lang not in seen_langs:
-                            unique_langs_to_try.append(lang)
-                            seen_langs.add(lang)
-
-                    for lang_check in unique_langs_to_try:
-                        for ext_check in ['vtt', 'srv3']:
-                            # O nome do arquivo será algo como: video_id_subtitle.pt.vtt
-                            path_to_check = f"{subtitle_output_template}.{lang_check}.{ext_check}"
-                            if os.path.exists(path_to_check):
-                                actual_subtitle_file_path = path_to_check
-                                if not source_lang_of_transcript: # Atualiza se não foi definido
-                                    source_lang_of_transcript = lang_check
-                                break # Sai do loop de extensões
-                            else: # yt-dlp às vezes não usa o template completo para subs
-                                path_to_check_alt = os.path.join(SUBTITLES_TEMP_DIR, f"{video_id}.{lang_check}.{ext_check}")
-                                if os.path.exists(path_to_check_alt):
-                                    actual_subtitle_file_path = path_to_check_alt
-                                    if not source_lang_of_transcript:
-                                        source_lang_of_transcript = lang_check
-                                    break # Sai do loop de extensões
-                        if actual_subtitle_file_path: # Se encontrou, sai do loop de idiomas
-                            break
-                    
-                    if actual_subtitle_file_path:
-                        logger.info(f"Arquivo de legenda encontrado manualmente: {actual_subtitle_file_path}")
-
-            if actual_subtitle_file_path and os.path.exists(actual_subtitle_file_path):
-                logger.info(f"Lendo arquivo de legenda: {actual_subtitle_file_path}")
-                with open(actual_subtitle_file_path, 'r', encoding='utf-8') as f:
-                    raw_content = f.read()
-                
-                if actual_subtitle_file_path.endswith('.vtt'):
-                    original_text = parse_vtt_content(raw_content)
-                elif actual_subtitle_file_path.endswith('.srv3'):
-                    original_text = parse_srv3_content(raw_content)
+            logger.info(f"Obtendo metadados e legenda para {video_id}")
+            with METRICS.stage('extracao_video'):
+                info_dict = ydl.extract_info(video_url, download=False) # Nada é gravado em disco
+            metadata = _extract_video_metadata(info_dict)
+
+            requested_subtitles = info_dict.get('requested_subtitles') or {}
+            source_lang_of_transcript, sub_info = _select_requested_subtitle(requested_subtitles, preferred_lang)
+            if sub_info and source_lang_of_transcript != preferred_lang:
+                logger.info(f"Legenda em '{preferred_lang}' não encontrada para {video_id}. Usando '{source_lang_of_transcript}'.")
+
+            if sub_info:
+                raw_content = sub_info.get('data') # Alguns extratores já retornam o conteúdo
+                if raw_content is None and sub_info.get('url'):
+                    with METRICS.stage('download_legenda'):
+                        raw_content = fetch_subtitle(ydl, sub_info['url'])
+
+                # Formato escolhido pelo yt-dlp (json3, srv3, vtt...); se desconhecido, é detectado pelo conteúdo
+                sub_format = sub_info.get('ext')
+                if not raw_content:
+                    logger.warning(f"Legenda vazia ou sem URL para {video_id}.")
                 else:
-                    logger.warning(f"Formato de arquivo de legenda não suportado: {actual_subtitle_file_path}")
-                    original_text = "" # Ou talvez tentar tratar como texto puro?
-                
-                # Limpa o arquivo de legenda baixado
-                try:
-                    os.remove(actual_subtitle_file_path)
-                    logger.debug(f"Arquivo de legenda temporário removido: {actual_subtitle_file_path}")
-                except OSError as e_rem:
-                    logger.warning(f"Não foi possível remover o arquivo de legenda {actual_subtitle_file_path}: {e_rem}")
-            
+                    with METRICS.stage('parse_legenda'):
+                        original_text = parse_subtitle(raw_content, sub_format)
+                    if original_text is None:
+                        logger.warning(f"Formato de legenda não suportado '{sub_format}' para {video_id}")
+                        return metadata, None
+
             if not original_text:
                 logger.warning(f"Nenhuma transcrição encontrada ou extraída para {video_id} (idioma tentado: {source_lang_of_transcript or preferred_lang}).")
-                return None
+                return metadata, None
 
-            return {
+            return metadata, {
                 'original': original_text,
                 'formatted_original': format_for_a4(original_text),
                 'source_language': source_lang_of_transcript # Pode ser None se não foi determinado
             }
 
     except Exception as e:
+        if is_rate_limit_error(e): # Propaga para o coletor fazer backoff
+            raise RateLimitError(str(e)) from e
         logger.error(f"Erro ao obter transcrição com yt-dlp para {video_id}: {e}")
         # import traceback # Para depuração mais detalhada
         # logger.error(traceback.format_exc())
-        return None
+        return metadata, None
+
+def get_transcript_with_yt_dlp(video_id, preferred_lang='pt', subtitle_fetcher=None):
+    """Retorna apenas a transcrição do vídeo (ver fetch_video_with_transcript)."""
+    _, transcript = fetch_video_with_transcript(video_id, preferred_lang, subtitle_fetcher=subtitle_fetcher)
+    return transcript
 
 
 # === Processa canal ===
-def process_channel(channel_url):
+def process_channel(channel_url, subtitle_fetcher=None):
+    # Todas as etapas medidas durante o processamento ficam associadas a este canal
+    with METRICS.channel(channel_url), METRICS.stage('canal') as channel_timer:
+        data = _process_channel(channel_url, subtitle_fetcher)
+        if data is None:
+            channel_timer.fail()
+        return data
+
+def _process_channel(channel_url, subtitle_fetcher):
     logger.info(f"Processando canal: {channel_url}")
     
-    initial_videos_data = get_latest_channel_videos(channel_url, num_videos=1) # num_videos=1 para pegar o vídeo mais recente
+    # Lista plana dos últimos VIDEO_WINDOW_SIZE vídeos (uma única chamada, sem legendas)
+    initial_videos_data = get_latest_channel_videos(channel_url, num_videos=VIDEO_WINDOW_SIZE)
     
     if not initial_videos_data:
         logger.warning(f"Nenhum vídeo encontrado para o canal {channel_url}")
         return None
 
+    # Vídeos já contados em coletas anteriores não são baixados nem tokenizados de novo
+    window_state = load_window_state(channel_url)
+    window_entries = {entry['id']: entry for entry in window_state['videos']}
+
+    # Mesmo vídeo mais recente da última verificação: reaproveita a nuvem e os dados sem rodar o
+    # pipeline, a menos que algum vídeo da janela sem transcrição já deva ser tentado de novo
+    # (a legenda automática pode ficar pronta horas depois da publicação)
+    newest_video_id = initial_videos_data[0]['id']
+    retry_pending = any(
+        should_retry_transcript(window_entries[video['id']])
+        for video in initial_videos_data if video['id'] in window_entries
+    )
+    previous_data = None if retry_pending else load_previous_channel_data(channel_url, expected_video_id=newest_video_id)
+    if previous_data is not None:
+        record_channel_check(channel_url, newest_video_id)
+        logger.info(f"Nenhum vídeo novo em {channel_url}. Reaproveitando os dados da última coleta.")
+        return previous_data
+    # Transcrições gravadas na última coleta, repetidas no relatório para os vídeos que continuam na janela
+    previous_transcripts = load_previous_transcripts(channel_url, window_state.get('nome_canal'))
+
     first_video_data = initial_videos_data[0]
-    channel_name_initial = first_video_data.get('channel_title_from_playlist') or channel_url.split('/')[-2] or channel_url.split('/')[-1]
+    channel_name_initial = (window_state.get('nome_canal') or first_video_data.get('channel_title_from_playlist')
+                            or channel_url.split('/')[-2] or channel_url.split('/')[-1])
 
 
     data = {
         'url': channel_url,
         'nome_canal': channel_name_initial, # Será atualizado se uma melhor info for encontrada
         'videos_processados': [],
-        'caminho_nuvem_palavras': None # Novo campo para a nuvem de palavras do canal
+        'caminho_nuvem_palavras': None, # Novo campo para a nuvem de palavras do canal
+        'caminho_nuvem_preview': None, # Versão reduzida da nuvem, exibida na página
+        'caminho_frequencias': None, # Tabela de frequências (relativa a TRANS_DIR)
+        'videos_na_janela': 0
     }
     
-    # Coletar todas as transcrições dos vídeos processados para este canal
-    # Se num_videos=1, será apenas a transcrição do vídeo mais recente.
-    # Se num_videos > 1, concatenará as transcrições.
-    all_transcripts_for_channel = []
+    # Contagens de palavras dos vídeos que entram na janela nesta coleta
+    new_window_entries = {}
 
     try:
         for video_meta in initial_videos_data: 
@@ -314,32 +388,53 @@ def process_channel(channel_url):
             video_title = video_meta['title']
             video_url_yt = video_meta['url']
 
+            window_entry = window_entries.get(video_id)
+            if window_entry and not should_retry_transcript(window_entry):
+                # Já está na janela: não é extraído de novo; a transcrição vem da coleta anterior ou do cache
+                reused_video_entry = {
+                    'id': video_id,
+                    'titulo': video_title or window_entry.get('titulo'),
+                    'data_publicacao': window_entry.get('data_publicacao'),
+                    'visualizacoes': window_entry.get('visualizacoes'),
+                    'url': video_url_yt,
+                    'transcricao': _reused_transcript(video_id, window_entry, previous_transcripts)
+                }
+                if window_entry.get('idioma_transcricao_original'):
+                    reused_video_entry['idioma_transcricao_original'] = window_entry['idioma_transcricao_original']
+                data['videos_processados'].append(reused_video_entry)
+                continue
+
             logger.info(f"Processando vídeo: {video_title} ({video_id})")
 
-            # Configuração para obter metadados do vídeo, com geo_bypass_country
-            video_info_opts = {
-                'quiet': True,
-                'nocheckcertificate': True,
-                'geo_bypass_country': 'BR', # Adicionado e corrigido
-            }
             publish_date_final = None
             views_final = None
-            
-            try:
-                with YoutubeDL(video_info_opts) as ydl_vid: # Corrigido aqui
-                    info = ydl_vid.extract_info(video_url_yt, download=False)
-                    publish_date_str = info.get('upload_date') # YYYYMMDD
-                    if publish_date_str:
-                        publish_date_final = datetime.strptime(publish_date_str, '%Y%m%d').strftime('%Y-%m-%d')
-                    views_final = info.get('view_count')
-                    uploader_name = info.get('uploader') or info.get('channel')
-                    if uploader_name and data['nome_canal'] == channel_name_initial: # Atualiza se for a inicial
-                        data['nome_canal'] = uploader_name 
-            except Exception as e_vid_info:
-                logger.warning(f"Não foi possível obter metadados detalhados (data, views) para {video_id}: {e_vid_info}")
-
-            transcript_data = get_transcript_with_yt_dlp(video_id, preferred_lang='pt')
-            
+            uploader_name = None
+            extraction_ok = True
+
+            # Verifica o cache antes de qualquer chamada ao yt-dlp para este vídeo
+            cached_entry = get_cached_video(video_id, TRANSCRIPT_LANG)
+            if cached_entry:
+                logger.info(f"Transcrição de {video_id} encontrada no cache. Pulando download.")
+                cached_meta = cached_entry.get('metadados') or {}
+                publish_date_final = cached_meta.get('data_publicacao')
+                views_final = cached_meta.get('visualizacoes')
+                uploader_name = cached_meta.get('uploader')
+                transcript_data = cached_entry['transcricao']
+            else:
+                # Uma única extração traz metadados (data, views, uploader) e legendas
+                video_meta_fetched, transcript_data = fetch_video_with_transcript(
+                    video_id, preferred_lang=TRANSCRIPT_LANG, subtitle_fetcher=subtitle_fetcher
+                )
+                extraction_ok = bool(video_meta_fetched) # Vazio quando a própria extração falhou
+                publish_date_final = video_meta_fetched.get('data_publicacao')
+                views_final = video_meta_fetched.get('visualizacoes')
+                uploader_name = video_meta_fetched.get('uploader')
+                if transcript_data: # Só armazena transcrições obtidas com sucesso
+                    save_cached_video(video_id, TRANSCRIPT_LANG, video_meta_fetched, transcript_data)
+
+            if uploader_name and data['nome_canal'] == channel_name_initial: # Atualiza se for a inicial
+                data['nome_canal'] = uploader_name
+
             processed_video_entry = {
                 'id': video_id,
                 'titulo': video_title,
@@ -353,36 +448,103 @@ def process_channel(channel_url):
             
             data['videos_processados'].append(processed_video_entry)
 
-            # Adiciona a transcrição original à lista para a nuvem de palavras do canal
+            # Conta as palavras apenas deste vídeo novo; o agregado do canal é atualizado pela janela
             if transcript_data and transcript_data.get('original'):
-                all_transcripts_for_channel.append(transcript_data['original'])
-        
-        # Gerar nuvem de palavras para o canal se houver transcrições
-        if all_transcripts_for_channel:
-            full_transcript_text_for_channel = "\n".join(all_transcripts_for_channel)
-            
+                with METRICS.stage('frequencias'):
+                    video_frequencies = compute_word_frequencies(transcript_data['original'])
+                new_window_entries[video_id] = make_window_entry(processed_video_entry, video_frequencies)
+            elif extraction_ok:
+                # Vídeo sem transcrição: fica na janela sem contagens e só é tentado de novo após o prazo
+                new_window_entries[video_id] = make_missing_transcript_entry(processed_video_entry)
+
+        # Soma os vídeos que entraram e subtrai os que saíram da janela
+        window_state, added_ids, removed_ids = update_window(
+            window_state, [video['id'] for video in initial_videos_data], new_window_entries
+        )
+        window_state['nome_canal'] = data['nome_canal']
+        data['videos_na_janela'] = len(window_state['videos'])
+        logger.info(f"Janela do canal '{data['nome_canal']}': {len(added_ids)} vídeo(s) novo(s), {len(removed_ids)} removido(s), {data['videos_na_janela']} no total.")
+        channel_frequencies = Counter(window_state['agregado'])
+
+        # Gerar nuvem de palavras para o canal se houver transcrições na janela
+        if channel_frequencies:
             # Usa o nome do canal (que pode ter sido atualizado) para o arquivo da nuvem
             wc_filename_base = sanitize_filename(data['nome_canal'])
-            wordcloud_filename = f"wc_{wc_filename_base}.png"
-            wordcloud_output_path = os.path.join(WORDCLOUDS_DIR, wordcloud_filename)
-            
-            logger.info(f"Gerando nuvem de palavras para o canal '{data['nome_canal']}'...")
-            generated_wc_path = generate_wordcloud_from_text(
-                full_transcript_text_for_channel,
-                wordcloud_output_path,
-                stopwords_list=PORTUGUESE_STOPWORDS # Passa as stopwords carregadas
+            window_changed = bool(added_ids or removed_ids)
+
+            # Tabela de frequências ao lado do JSON do canal, para re-renderizar sem re-tokenizar
+            frequencies_filename = f"{wc_filename_base}.freq.json"
+            frequencies_path = os.path.join(TRANS_DIR, frequencies_filename)
+            try:
+                if window_changed or not os.path.exists(frequencies_path):
+                    save_frequency_table(channel_frequencies, frequencies_path)
+                data['caminho_frequencias'] = frequencies_filename # Relativo a TRANS_DIR
+            except Exception as e_freq:
+                logger.warning(f"Não foi possível salvar a tabela de frequências do canal '{data['nome_canal']}': {e_freq}")
+
+            # Versões completa e prévia, com o hash do conteúdo no nome (relativas a TRANS_DIR)
+            previous_cloud = window_state.get('nuvem') or {}
+            previous_cloud_exists = all(
+                previous_cloud.get(key) and os.path.exists(os.path.join(TRANS_DIR, previous_cloud[key]))
+                for key in ('completa', 'preview')
             )
-            if generated_wc_path:
-                # Armazena o caminho relativo ao diretório TRANS_DIR
-                data['caminho_nuvem_palavras'] = os.path.join(WORDCLOUDS_SUBDIR_NAME, wordcloud_filename)
+            wordcloud_base_name = f"wc_{wc_filename_base}"
+            if (not window_changed and previous_cloud_exists
+                    and os.path.basename(previous_cloud['completa']).startswith(f"{wordcloud_base_name}.")
+                    and previous_cloud['completa'].endswith(f".{WORDCLOUD_FORMAT}")):
+                # Janela igual à da coleta anterior: a nuvem gravada continua válida
+                cloud_paths = previous_cloud
+            else:
+                logger.info(f"Gerando nuvem de palavras para o canal '{data['nome_canal']}'...")
+                # O layout roda no pool de processos; esta thread apenas aguarda os caminhos gravados
+                with METRICS.stage('nuvem_palavras') as wc_timer:
+                    renditions = render_wordcloud_renditions_in_pool(
+                        channel_frequencies,
+                        WORDCLOUDS_DIR,
+                        wordcloud_base_name,
+                        image_format=WORDCLOUD_FORMAT
+                    )
+                    if not renditions:
+                        wc_timer.fail()
+                cloud_paths = {
+                    key: os.path.join(WORDCLOUDS_SUBDIR_NAME, os.path.basename(path)) for key, path in renditions.items()
+                } if renditions else None
+            if cloud_paths:
+                data['caminho_nuvem_palavras'] = cloud_paths['completa']
+                data['caminho_nuvem_preview'] = cloud_paths['preview']
+                window_state['nuvem'] = cloud_paths
             else:
                 logger.warning(f"Não foi possível gerar a nuvem de palavras para o canal '{data['nome_canal']}'.")
         else:
             logger.info(f"Nenhuma transcrição disponível para gerar nuvem de palavras para o canal '{data['nome_canal']}'.")
 
-        save_individual_transcript(data)
+        try:
+            save_window_state(window_state)
+        except Exception as e_window:
+            logger.warning(f"Não foi possível salvar a janela de vídeos do canal '{data['nome_canal']}': {e_window}")
+
+        with METRICS.stage('gravacao_json'):
+            data_file = save_individual_transcript(data)
+        # Banco SQLite com índice FTS5 (uma transação por canal)
+        with METRICS.stage('banco_sqlite') as db_timer:
+            if not save_channel_to_store(data):
+                db_timer.fail()
+        # Série semanal de termos: soma apenas os vídeos da janela ainda não registrados
+        with METRICS.stage('serie_termos'):
+            record_video_terms(channel_url, window_state['videos'])
+        # Banner resolvido aqui (com TTL) para que a interface não faça chamadas de rede
+        with METRICS.stage('banner_canal'):
+            ensure_channel_meta(channel_url, data['nome_canal'])
+        # Próxima verificação calculada a partir das datas de publicação dos vídeos da janela
+        record_channel_check(
+            channel_url, newest_video_id,
+            publish_dates=[video.get('data_publicacao') for video in window_state['videos']],
+            data_file=data_file
+        )
         return data
 
+    except RateLimitError:
+        raise
     except Exception as e:
         logger.error(f"Erro ao processar canal {channel_url}: {e}")
         # import traceback
@@ -399,50 +561,286 @@ def save_individual_transcript(data_channel):
         with open(path, 'w', encoding='utf-8') as f:
             json.dump(data_channel, f, ensure_ascii=False, indent=2)
         logger.info(f"Dados salvos para o canal '{data_channel['nome_canal']}': {path}")
+        return path
     except Exception as e:
         logger.error(f"Erro ao salvar dados individuais para '{data_channel.get('nome_canal', 'Desconhecido')}': {e}")
+        return None
+
+def load_previous_transcripts(channel_url, channel_name=None):
+    """
+    Transcrições (video_id -> transcrição) do JSON do canal gravado na última coleta.
+
+    O arquivo vem da agenda (refresh_schedule) ou, na falta dela, do nome do canal na janela.
+    """
+    entry = get_schedule_entry(channel_url) or {}
+    path = entry.get('arquivo_dados')
+    if not path and channel_name:
+        path = os.path.join(TRANS_DIR, f"{sanitize_filename(channel_name)}.json")
+    data = read_json(path) if path else None
+    if not data or data.get('url') != channel_url:
+        return {}
+    return {
+        video['id']: video['transcricao'] for video in data.get('videos_processados') or []
+        if isinstance(video.get('transcricao'), dict) and video['transcricao'].get('original')
+    }
+
+def _reused_transcript(video_id, window_entry, previous_transcripts):
+    # Vídeo que continua na janela: mesma transcrição da coleta anterior, sem nova extração
+    if window_entry.get('sem_transcricao'):
+        return {'status': 'não disponível'}
+    transcript = previous_transcripts.get(video_id)
+    if transcript is None:
+        cached_entry = get_cached_video(video_id, TRANSCRIPT_LANG)
+        transcript = cached_entry['transcricao'] if cached_entry else None
+    return transcript or {'status': 'contabilizada em coleta anterior'}
+
+def load_previous_channel_data(channel_url, expected_video_id=None):
+    """
+    Dados do canal gravados na última coleta (ver refresh_schedule), ou None.
+
+    Retorna None se o arquivo ou a nuvem não existirem mais, ou se `expected_video_id` não for
+    o vídeo mais recente registrado na agenda.
+    """
+    entry = get_schedule_entry(channel_url)
+    if not entry or not entry.get('arquivo_dados'):
+        return None
+    if expected_video_id is not None and entry.get('ultimo_video_id') != expected_video_id:
+        return None
+    data = read_json(entry['arquivo_dados'])
+    if not data or data.get('url') != channel_url:
+        return None
+    wordcloud_path = data.get('caminho_nuvem_palavras')
+    if wordcloud_path and not os.path.exists(os.path.join(TRANS_DIR, wordcloud_path)):
+        return None
+    return data
+
+
+# === Manifesto leve para a interface (apenas os campos exibidos) ===
+def build_manifest(all_channel_data, report_filename):
+    channel_cache = load_channel_cache()
+    channels = []
+    for channel_data in all_channel_data:
+        videos = channel_data.get('videos_processados') or []
+        latest_video = videos[0] if videos else None
+        channel_meta = channel_cache.get(channel_data.get('url')) or {}
+        channels.append({
+            'nome_canal': channel_data.get('nome_canal'),
+            'url': channel_data.get('url'),
+            'banner_url': channel_meta.get('banner_url'),
+            'banner_arquivo': channel_meta.get('banner_arquivo'),
+            'caminho_nuvem_palavras': channel_data.get('caminho_nuvem_palavras'),
+            'caminho_nuvem_preview': channel_data.get('caminho_nuvem_preview'),
+            'caminho_nuvem_distintiva': channel_data.get('caminho_nuvem_distintiva'),
+            'ultimo_video': {
+                'id': latest_video.get('id'),
+                'titulo': latest_video.get('titulo'),
+                'url': latest_video.get('url'),
+                'data_publicacao': latest_video.get('data_publicacao'),
+                'thumbnail_url': f"https://i.ytimg.com/vi/{latest_video.get('id')}/hqdefault.jpg",
+            } if latest_video else None,
+        })
+    return {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'relatorio': report_filename,
+        'canais': channels,
+    }
 
+def save_manifest(all_channel_data, report_filename):
+    try:
+        path = os.path.join(REPORT_DIR, MANIFEST_FILENAME)
+        atomic_write_json(path, build_manifest(all_channel_data, report_filename))
+        logger.info(f"Manifesto da interface atualizado: {path}")
+    except Exception as e:
+        logger.error(f"Erro ao salvar manifesto: {e}")
 
 # === Salva relatório geral ===
-def generate_report(all_channel_data):
+def generate_report(all_channel_data, report_limits=None):
+    # Apenas os canais alterados desde a coleta anterior (delta) ou um snapshot completo (ver report_store)
     try:
-        filename = os.path.join(REPORT_DIR, f"transcricoes_coletadas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(all_channel_data, f, ensure_ascii=False, indent=2)
-        logger.info(f"Relatório consolidado gerado: {filename}")
+        filename = write_report(all_channel_data, REPORT_DIR, **(report_limits or {}))
+        logger.info(f"Relatório consolidado gerado: {os.path.join(REPORT_DIR, filename)}")
     except Exception as e:
         logger.error(f"Erro ao salvar relatório final: {e}")
+        return
+    # Gravado depois do relatório: o manifesto nunca aponta para um relatório inexistente
+    save_manifest(all_channel_data, filename)
 
 # === Execução principal ===
+def _make_progress_callback(total):
+    progress = {'concluidos': 0, 'falhas': 0}
+
+    def on_result(url, result, error):
+        progress['concluidos'] += 1
+        if not result:
+            progress['falhas'] += 1
+        write_status(concluidos=progress['concluidos'], falhas=progress['falhas'], total=total, canal_atual=url)
+
+    return on_result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Coleta as transcrições dos canais e gera as nuvens de palavras.")
+    parser.add_argument('--canais', metavar='ARQUIVO',
+                        help="Arquivo com uma URL de canal por linha (padrão: TARGET_CHANNEL_URLS)")
+    parser.add_argument('--fila', nargs='?', const=QUEUE_DB_PATH, default=None, metavar='BANCO',
+                        help=f"Retira os canais de uma fila compartilhada em SQLite (padrão: {QUEUE_DB_PATH}), "
+                             "para dividir a coleta entre vários processos ou máquinas")
+    parser.add_argument('--id-execucao', default=None,
+                        help="Execução da fila em que este coletor trabalha (padrão: a execução ainda não "
+                             "consolidada mais recente ou, se não houver, uma nova identificada pela data e hora)")
+    parser.add_argument('--coletor', default=None, help="Identificador deste coletor na fila (padrão: host:pid)")
+    parser.add_argument('--todos', action='store_true',
+                        help="Verifica todos os canais, ignorando a agenda de verificação (agenda_canais.db)")
+    parser.add_argument('--compactar-relatorios', action='store_true',
+                        help="Apenas compacta os deltas de relatório em um novo snapshot, aplica a retenção e encerra")
+    # Limites dos relatórios (padrão: constantes/variáveis de ambiente de report_store.py)
+    parser.add_argument('--relatorios-max-deltas', type=int, default=None, metavar='N',
+                        help="Deltas por snapshot antes de compactar (NOINGLES_RELATORIOS_MAX_DELTAS)")
+    parser.add_argument('--relatorios-idade-snapshot', type=float, default=None, metavar='DIAS',
+                        help="Idade do snapshot a partir da qual um novo é gravado (NOINGLES_RELATORIOS_IDADE_SNAPSHOT_DIAS)")
+    parser.add_argument('--relatorios-snapshots', type=int, default=None, metavar='N',
+                        help="Snapshots (com seus deltas) mantidos em relatorios/ (NOINGLES_RELATORIOS_SNAPSHOTS)")
+    parser.add_argument('--relatorios-legado-dias', type=float, default=None, metavar='DIAS',
+                        help="Idade a partir da qual os relatórios completos antigos são apagados; 0 desativa "
+                             "(NOINGLES_RELATORIOS_LEGADO_DIAS)")
+    return parser.parse_args(argv)
+
+def report_limits_from_args(args):
+    """Argumentos de write_report/compact_reports informados na linha de comando."""
+    limits = {
+        'max_deltas': args.relatorios_max_deltas,
+        'snapshot_max_age_days': args.relatorios_idade_snapshot,
+        'keep_snapshots': args.relatorios_snapshots,
+        'legacy_max_age_days': args.relatorios_legado_dias,
+    }
+    return {name: value for name, value in limits.items() if value is not None}
+
+def load_channel_urls(path):
+    """URLs de canais de um arquivo texto (uma por linha; linhas vazias e comentários '#' são ignorados)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def add_skipped_channels(collected_data, skipped_urls):
+    """Completa o relatório com os dados da última coleta dos canais fora do prazo de verificação."""
+    collected_urls = {data.get('url') for data in collected_data}
+    for url in skipped_urls:
+        if url in collected_urls:
+            continue
+        previous_data = load_previous_channel_data(url)
+        if previous_data is not None:
+            collected_data.append(previous_data)
+    return collected_data
+
+def consolidate_finished_runs(queue, report_limits=None):
+    """Gera o relatório das execuções da fila que terminaram sem ser consolidadas (ex.: coletor interrompido depois do último canal)."""
+    for run_id in queue.finished_runs:
+        finished_run = WorkQueue(queue.db_path, run_id=run_id, worker_id=queue.worker_id)
+        if not finished_run.try_become_consolidator():
+            continue
+        results = finished_run.load_results()
+        logger.info(f"Consolidando a execução '{run_id}', já esgotada: {len(results)} canal(is) com resultado.")
+        if results:
+            with METRICS.stage('relatorio'):
+                generate_report(results, report_limits)
+
+
 if __name__ == "__main__":
-    logger.info("Início da coleta de dados...")
-    
-    # Garante que os recursos do NLTK estão disponíveis antes de iniciar as threads
-    from wordcloud_processor import ensure_nltk_resources
-    ensure_nltk_resources() # Chamada explícita aqui, embora já seja chamada na importação de wordcloud_processor
-
-    all_collected_data = []
-    # Reduzir workers se estiver tendo problemas de rate limiting ou recursos
-    # max_workers=2 ou 3 pode ser mais estável.
-    with ThreadPoolExecutor(max_workers=3) as executor: 
-        future_to_url = {executor.submit(process_channel, url): url for url in TARGET_CHANNEL_URLS}
-
-        for future in as_completed(future_to_url):
-            url = future_to_url[future]
-            try:
-                result = future.result()
-                if result:
-                    all_collected_data.append(result)
-                else:
-                    logger.warning(f"Nenhum resultado retornado para o canal: {url}")
-            except Exception as e:
-                logger.error(f"Erro ao obter resultado da thread para {url}: {e}")
-                # import traceback
-                # logger.error(traceback.format_exc()) # Descomente para debug detalhado
-
-    if all_collected_data:
-        generate_report(all_collected_data)
+    args = parse_args()
+    setup_collection()
+    report_limits = report_limits_from_args(args)
+    if args.compactar_relatorios:
+        compact_reports(REPORT_DIR, **{name: value for name, value in report_limits.items()
+                                       if name in ('keep_snapshots', 'legacy_max_age_days')})
+        sys.exit(0)
+    channel_urls = load_channel_urls(args.canais) if args.canais else TARGET_CHANNEL_URLS
+    # Só entram na coleta os canais no prazo de verificação; os demais reaproveitam a última coleta
+    if args.todos:
+        skipped_urls = []
     else:
-        logger.warning("Nenhum dado foi coletado com sucesso de nenhum canal.")
-    
-    logger.info("Fim da coleta de dados.")
+        channel_urls, skipped_urls = split_due_channels(channel_urls)
+        logger.info(f"{len(channel_urls)} canal(is) no prazo de verificação; {len(skipped_urls)} reaproveitado(s) da última coleta.")
+
+    queue = None
+    if args.fila:
+        # Vários coletores dividem a fila: o lock de coleta única e o arquivo de status não se aplicam
+        queue = WorkQueue(args.fila, run_id=args.id_execucao, worker_id=args.coletor)
+        queue.enqueue(channel_urls)
+        logger.info(f"Coletor '{queue.worker_id}' na fila '{queue.run_id}' ({args.fila}).")
+    # Apenas uma coleta por vez (a interface e execuções manuais compartilham o mesmo lock)
+    elif not acquire_run_lock():
+        logger.error("Outra coleta já está em andamento. Encerrando.")
+        sys.exit(1)
+    install_cancel_handler()
+    if queue is None:
+        write_status(estado=STATE_RUNNING, pid=os.getpid(), total=len(channel_urls), concluidos=0, falhas=0)
+
+    final_state = STATE_FAILED
+    try:
+        logger.info("Início da coleta de dados...")
+
+        # Garante que os recursos do NLTK estão disponíveis antes de iniciar as threads
+        # (depois da primeira verificação bem-sucedida, apenas confere a marca gravada)
+        from wordcloud_processor import ensure_nltk_resources
+        ensure_nltk_resources()
+
+        # Remove entradas antigas do cache de transcrições (por idade e tamanho total)
+        evict_cache()
+
+        # Coletor assíncrono: concorrência adaptativa, token bucket e backoff com jitter
+        # substituem o antigo ThreadPoolExecutor(max_workers=3) ajustado à mão.
+        try:
+            if queue is not None:
+                consolidate_finished_runs(queue, report_limits)
+                queue.start_heartbeat() # Renova os leases dos canais em processamento
+                try:
+                    collect_channels(queue.iter_claims(), process_channel, on_result=queue.on_result)
+                finally:
+                    queue.stop_heartbeat()
+                logger.info(f"Fila '{queue.run_id}' esgotada: {queue.counts()}")
+                # Apenas o primeiro coletor a encontrar a fila esgotada consolida os resultados de todos
+                if queue.try_become_consolidator():
+                    all_collected_data = queue.load_results()
+                else:
+                    all_collected_data = None
+                    logger.info("A consolidação desta execução fica a cargo de outro coletor.")
+            else:
+                all_collected_data = collect_channels(
+                    channel_urls, process_channel,
+                    on_result=_make_progress_callback(len(channel_urls))
+                )
+
+            if all_collected_data is not None:
+                all_collected_data = add_skipped_channels(all_collected_data, skipped_urls)
+
+            # Termos distintivos de cada canal (TF-IDF sobre a matriz esparsa de todos os canais)
+            if all_collected_data:
+                if queue is None:
+                    write_status(canal_atual=None, mensagem="Calculando termos distintivos...")
+                with METRICS.stage('termos_distintivos'):
+                    from distinctive_terms import analyze_distinctive_terms # numpy/scipy/sklearn só aqui
+                    analyze_distinctive_terms(all_collected_data, TRANS_DIR, image_format=WORDCLOUD_FORMAT)
+        finally:
+            shutdown_render_pool()
+
+        if all_collected_data:
+            with METRICS.stage('relatorio'):
+                generate_report(all_collected_data, report_limits)
+        elif all_collected_data is not None:
+            logger.warning("Nenhum dado foi coletado com sucesso de nenhum canal.")
+
+        logger.info("Fim da coleta de dados.")
+        final_state = STATE_FINISHED
+    except KeyboardInterrupt:
+        logger.warning("Coleta cancelada.")
+        final_state = STATE_CANCELLED
+        if queue is not None:
+            queue.release_claims() # Outros coletores assumem os canais sem esperar o lease expirar
+    except Exception as e:
+        logger.error(f"Erro inesperado na coleta: {e}")
+        raise
+    finally:
+        METRICS.write() # Métricas da execução (Prometheus + resumo JSON), mesmo se cancelada
+        if queue is None:
+            write_status(estado=final_state, canal_atual=None, mensagem=None,
+                         finalizado_em=datetime.now().isoformat(timespec='seconds'))
+            release_run_lock()
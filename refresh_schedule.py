@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+from datetime import date
+from statistics import median
+
+logger = logging.getLogger(__name__)
+
+# === Agenda de verificação dos canais conforme a frequência de publicação ===
+# Para cada canal guarda o último vídeo visto, as datas de publicação recentes e quando ele
+# deve ser verificado de novo. Canais que publicam todo dia são verificados com mais frequência
+# que canais mensais; a cada verificação sem vídeo novo o intervalo aumenta.
+# Gravada em SQLite (como a fila de work_queue.py): vários coletores, inclusive em máquinas
+# diferentes, atualizam a agenda ao mesmo tempo sem perder as entradas uns dos outros.
+SCHEDULE_PATH = os.path.join("trans", "agenda_canais.db")
+MIN_CHECK_INTERVAL = 60 * 60 # 1 hora
+MAX_CHECK_INTERVAL = 7 * 24 * 60 * 60 # 7 dias
+DEFAULT_CHECK_INTERVAL = 6 * 60 * 60 # Canais sem histórico suficiente
+# Fração do intervalo típico entre vídeos usada como intervalo de verificação
+CADENCE_FRACTION = 0.5
+# Multiplicador do intervalo a cada verificação sem vídeo novo
+UNCHANGED_BACKOFF = 1.5
+# Datas de publicação guardadas por canal
+UPLOAD_HISTORY_SIZE = 20
+
+SCHEDULE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS agenda (
+    url TEXT PRIMARY KEY,
+    entrada TEXT NOT NULL
+);
+"""
+
+
+_schema_ready = set()
+
+
+def _connect(schedule_path):
+    os.makedirs(os.path.dirname(schedule_path) or '.', exist_ok=True)
+    new_file = not os.path.exists(schedule_path)
+    # Mesmas escolhas da fila: transações explícitas e sem WAL (funciona em NFS/SMB)
+    conn = sqlite3.connect(schedule_path, timeout=60, isolation_level=None)
+    # O modo do journal fica gravado no arquivo: PRAGMA e schema só na primeira conexão de cada banco
+    if new_file or schedule_path not in _schema_ready:
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.executescript(SCHEDULE_SCHEMA)
+        _schema_ready.add(schedule_path)
+    return conn
+
+
+def load_schedule(schedule_path=SCHEDULE_PATH):
+    """Dict url_do_canal -> entrada da agenda (vazio se o banco não existir)."""
+    if not os.path.exists(schedule_path):
+        return {}
+    conn = _connect(schedule_path)
+    try:
+        return {url: json.loads(entry) for url, entry in conn.execute("SELECT url, entrada FROM agenda")}
+    finally:
+        conn.close()
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def compute_check_interval(publish_dates, unchanged_checks=0):
+    """
+    Intervalo (em segundos) até a próxima verificação.
+
+    Args:
+        publish_dates (list): Datas de publicação (YYYY-MM-DD) dos vídeos recentes do canal.
+        unchanged_checks (int): Verificações seguidas sem vídeo novo.
+    """
+    days = sorted({day for day in map(_parse_date, publish_dates) if day}, reverse=True)
+    gaps = [(newer - older).days * 86400 for newer, older in zip(days, days[1:])]
+    interval = median(gaps) * CADENCE_FRACTION if gaps else DEFAULT_CHECK_INTERVAL
+    interval *= UNCHANGED_BACKOFF ** unchanged_checks
+    return int(min(max(interval, MIN_CHECK_INTERVAL), MAX_CHECK_INTERVAL))
+
+
+def split_due_channels(channel_urls, now=None, schedule_path=SCHEDULE_PATH):
+    """
+    Separa os canais que devem ser verificados agora dos que ainda não estão no prazo.
+
+    Returns:
+        tuple: (urls_a_verificar, urls_fora_do_prazo), na ordem original.
+    """
+    now = now or time.time()
+    schedule = load_schedule(schedule_path)
+    due, not_due = [], []
+    for url in channel_urls:
+        entry = schedule.get(url)
+        if entry and entry.get('proxima_verificacao', 0) > now and entry.get('arquivo_dados'):
+            not_due.append(url)
+        else:
+            due.append(url)
+    return due, not_due
+
+
+def _read_entry(conn, channel_url):
+    row = conn.execute("SELECT entrada FROM agenda WHERE url = ?", (channel_url,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def get_schedule_entry(channel_url, schedule_path=SCHEDULE_PATH):
+    if not os.path.exists(schedule_path):
+        return None
+    conn = _connect(schedule_path)
+    try:
+        return _read_entry(conn, channel_url)
+    finally:
+        conn.close()
+
+
+def record_channel_check(channel_url, newest_video_id, publish_dates=None, data_file=None, schedule_path=SCHEDULE_PATH):
+    """
+    Registra uma verificação do canal e calcula a próxima.
+
+    Args:
+        newest_video_id (str): ID do vídeo mais recente encontrado agora.
+        publish_dates (list, optional): Datas de publicação recentes (atualizam o histórico).
+        data_file (str, optional): JSON com os dados completos do canal, reutilizado enquanto
+            não houver vídeo novo.
+    """
+    now = time.time()
+    conn = _connect(schedule_path)
+    try:
+        # Leitura e gravação na mesma transação, com o banco travado para escrita entre processos
+        conn.execute("BEGIN IMMEDIATE")
+        entry = _read_entry(conn, channel_url) or {}
+        changed = entry.get('ultimo_video_id') != newest_video_id
+        unchanged_checks = 0 if changed else entry.get('verificacoes_sem_novidade', 0) + 1
+        history = entry.get('datas_publicacao') or []
+        if publish_dates:
+            history = sorted({d for d in list(history) + list(publish_dates) if d}, reverse=True)[:UPLOAD_HISTORY_SIZE]
+        interval = compute_check_interval(history, unchanged_checks)
+        entry.update({
+            'ultimo_video_id': newest_video_id,
+            'datas_publicacao': history,
+            'verificacoes_sem_novidade': unchanged_checks,
+            'ultima_verificacao': now,
+            'intervalo_segundos': interval,
+            'proxima_verificacao': now + interval,
+        })
+        if data_file:
+            entry['arquivo_dados'] = data_file
+        conn.execute(
+            "INSERT OR REPLACE INTO agenda (url, entrada) VALUES (?, ?)",
+            (channel_url, json.dumps(entry, ensure_ascii=False))
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return entry
@@ -0,0 +1,237 @@
+import os
+import glob
+import json
+import time
+import hashlib
+import logging
+from datetime import datetime
+
+from file_utils import atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+# === Relatórios incrementais (snapshot + deltas) com compactação e retenção ===
+# Cada coleta grava apenas os canais que mudaram desde a coleta anterior (delta), apontando
+# para o snapshot base. O índice guarda a cadeia atual (snapshot + deltas) e o hash de cada
+# canal, de modo que encontrar e remontar o último relatório não depende do tamanho do diretório.
+REPORT_DIR = "relatorios"
+REPORT_INDEX_FILENAME = "indice_relatorios.json"
+SNAPSHOT_PREFIX = "snapshot_"
+DELTA_PREFIX = "delta_"
+# Relatórios completos gravados antes dos deltas
+LEGACY_REPORT_GLOB = "transcricoes_coletadas_*.json"
+
+
+def _env_number(name, default, cast=int):
+    # Limites configuráveis por variável de ambiente (ex.: no cron ou no serviço da coleta)
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning(f"Valor inválido em {name}: '{value}'. Usando {default}.")
+        return default
+
+
+# Limites padrão; cada um pode ser alterado pela variável de ambiente indicada ou pelos
+# argumentos de write_report/compact_reports/apply_retention (e pelas opções de noingles.py).
+# Compactação: um novo snapshot é gravado quando a cadeia atinge este número de deltas...
+MAX_DELTAS_PER_SNAPSHOT = _env_number('NOINGLES_RELATORIOS_MAX_DELTAS', 10)
+# ... ou quando o snapshot base fica mais antigo que isto
+SNAPSHOT_MAX_AGE_DAYS = _env_number('NOINGLES_RELATORIOS_IDADE_SNAPSHOT_DIAS', 7, float)
+# Retenção: cadeias (snapshot + deltas) mantidas, incluindo a atual
+KEEP_SNAPSHOTS = _env_number('NOINGLES_RELATORIOS_SNAPSHOTS', 3)
+# Retenção: relatórios completos antigos são apagados após esta idade (0 desativa)
+LEGACY_REPORT_MAX_AGE_DAYS = _env_number('NOINGLES_RELATORIOS_LEGADO_DIAS', 30, float)
+
+
+def report_index_path(report_dir=REPORT_DIR):
+    return os.path.join(report_dir, REPORT_INDEX_FILENAME)
+
+
+def load_report_index(report_dir=REPORT_DIR):
+    """Índice dos relatórios, ou None se ainda não houver nenhum snapshot."""
+    index = read_json(report_index_path(report_dir))
+    if not index or not index.get('cadeias'):
+        return None
+    return index
+
+
+def channel_hash(channel_data):
+    """Hash do conteúdo do canal, usado para decidir se ele entra no próximo delta."""
+    payload = json.dumps(channel_data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _timestamp():
+    return datetime.now().strftime('%Y%m%d_%H%M%S')
+
+
+def _unique_filename(report_dir, prefix):
+    filename = f"{prefix}{_timestamp()}.json"
+    counter = 1
+    while os.path.exists(os.path.join(report_dir, filename)):
+        filename = f"{prefix}{_timestamp()}_{counter}.json"
+        counter += 1
+    return filename
+
+
+def load_report_state(index, report_dir=REPORT_DIR):
+    """
+    Remonta o último relatório: o snapshot da cadeia atual com os deltas aplicados em ordem.
+
+    Returns:
+        list: Dados dos canais, na ordem da última coleta.
+    """
+    chain = index['cadeias'][-1]
+    snapshot = read_json(os.path.join(report_dir, chain['snapshot']))
+    if snapshot is None:
+        raise OSError(f"Snapshot '{chain['snapshot']}' ausente ou corrompido")
+    channels = {channel['url']: channel for channel in snapshot.get('canais', [])}
+    order = [channel['url'] for channel in snapshot.get('canais', [])]
+    for delta_filename in chain['deltas']:
+        delta = read_json(os.path.join(report_dir, delta_filename))
+        if delta is None:
+            raise OSError(f"Delta '{delta_filename}' ausente ou corrompido")
+        for channel in delta.get('canais_alterados', []):
+            channels[channel['url']] = channel
+        for url in delta.get('canais_removidos', []):
+            channels.pop(url, None)
+        order = delta.get('ordem', order)
+    return [channels[url] for url in order if url in channels]
+
+
+def _write_snapshot(report_dir, all_channel_data):
+    filename = _unique_filename(report_dir, SNAPSHOT_PREFIX)
+    atomic_write_json(os.path.join(report_dir, filename), {
+        'tipo': 'snapshot',
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'canais': all_channel_data,
+    }, compact=True)
+    return filename
+
+
+def _new_chain(report_dir, all_channel_data, index):
+    filename = _write_snapshot(report_dir, all_channel_data)
+    chains = (index or {}).get('cadeias', [])
+    chains.append({'snapshot': filename, 'criado_em': time.time(), 'deltas': []})
+    return {
+        'cadeias': chains,
+        'ultimo': filename,
+        'hashes': {channel['url']: channel_hash(channel) for channel in all_channel_data},
+    }
+
+
+def _needs_compaction(chain, max_deltas=None, snapshot_max_age_days=None):
+    max_deltas = MAX_DELTAS_PER_SNAPSHOT if max_deltas is None else max_deltas
+    snapshot_max_age_days = SNAPSHOT_MAX_AGE_DAYS if snapshot_max_age_days is None else snapshot_max_age_days
+    too_many_deltas = len(chain['deltas']) >= max_deltas
+    too_old = time.time() - chain.get('criado_em', 0) > snapshot_max_age_days * 86400
+    return too_many_deltas or too_old
+
+
+def write_report(all_channel_data, report_dir=REPORT_DIR, max_deltas=None, snapshot_max_age_days=None,
+                 keep_snapshots=None, legacy_max_age_days=None):
+    """
+    Grava o relatório da coleta: um delta com os canais alterados ou, ao iniciar uma nova
+    cadeia (primeira coleta ou compactação), um snapshot completo. Aplica a retenção em seguida.
+
+    Args:
+        max_deltas, snapshot_max_age_days, keep_snapshots, legacy_max_age_days (optional):
+            Substituem MAX_DELTAS_PER_SNAPSHOT, SNAPSHOT_MAX_AGE_DAYS, KEEP_SNAPSHOTS e
+            LEGACY_REPORT_MAX_AGE_DAYS.
+
+    Returns:
+        str: Nome do arquivo gravado (relativo a `report_dir`).
+    """
+    os.makedirs(report_dir, exist_ok=True)
+    index = load_report_index(report_dir)
+    if index is None or _needs_compaction(index['cadeias'][-1], max_deltas, snapshot_max_age_days):
+        index = _new_chain(report_dir, all_channel_data, index)
+        logger.info(f"Snapshot de relatório gravado: {index['ultimo']}")
+    else:
+        previous_hashes = index.get('hashes', {})
+        hashes = {channel['url']: channel_hash(channel) for channel in all_channel_data}
+        changed = [channel for channel in all_channel_data if previous_hashes.get(channel['url']) != hashes[channel['url']]]
+        removed = [url for url in previous_hashes if url not in hashes]
+        chain = index['cadeias'][-1]
+        filename = _unique_filename(report_dir, DELTA_PREFIX)
+        atomic_write_json(os.path.join(report_dir, filename), {
+            'tipo': 'delta',
+            'gerado_em': datetime.now().isoformat(timespec='seconds'),
+            'base': chain['snapshot'],
+            'anterior': index.get('ultimo'),
+            'ordem': [channel['url'] for channel in all_channel_data],
+            'canais_alterados': changed,
+            'canais_removidos': removed,
+        }, compact=True)
+        chain['deltas'].append(filename)
+        index.update({'ultimo': filename, 'hashes': hashes})
+        logger.info(f"Delta de relatório gravado: {filename} ({len(changed)} canal(is) alterado(s), {len(removed)} removido(s))")
+    # Índice gravado por último: ele nunca aponta para um arquivo inexistente
+    atomic_write_json(report_index_path(report_dir), index)
+    apply_retention(report_dir, index, keep_snapshots, legacy_max_age_days)
+    return index['ultimo']
+
+
+def compact_reports(report_dir=REPORT_DIR, keep_snapshots=None, legacy_max_age_days=None):
+    """Dobra a cadeia atual em um novo snapshot (ex.: rodado periodicamente) e aplica a retenção."""
+    index = load_report_index(report_dir)
+    if index is None:
+        logger.info("Nenhum relatório para compactar.")
+        return None
+    if not index['cadeias'][-1]['deltas']:
+        logger.info("Cadeia atual sem deltas; nada a compactar.")
+        apply_retention(report_dir, index, keep_snapshots, legacy_max_age_days)
+        return index['ultimo']
+    index = _new_chain(report_dir, load_report_state(index, report_dir), index)
+    atomic_write_json(report_index_path(report_dir), index)
+    logger.info(f"Relatórios compactados no snapshot {index['ultimo']}")
+    apply_retention(report_dir, index, keep_snapshots, legacy_max_age_days)
+    return index['ultimo']
+
+
+def _remove_report_file(path):
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logger.warning(f"Não foi possível remover o relatório {path}: {e}")
+        return False
+
+
+def apply_retention(report_dir=REPORT_DIR, index=None, keep_snapshots=None, legacy_max_age_days=None):
+    """
+    Mantém as últimas `keep_snapshots` cadeias (padrão: KEEP_SNAPSHOTS) e apaga relatórios
+    completos antigos, mais velhos que `legacy_max_age_days` (padrão: LEGACY_REPORT_MAX_AGE_DAYS).
+
+    Returns:
+        int: Quantidade de arquivos removidos.
+    """
+    keep_snapshots = max(1, KEEP_SNAPSHOTS if keep_snapshots is None else keep_snapshots)
+    legacy_max_age_days = LEGACY_REPORT_MAX_AGE_DAYS if legacy_max_age_days is None else legacy_max_age_days
+    index = index or load_report_index(report_dir)
+    removed = 0
+    if index and len(index['cadeias']) > keep_snapshots:
+        expired = index['cadeias'][:-keep_snapshots]
+        index['cadeias'] = index['cadeias'][-keep_snapshots:]
+        # O índice deixa de referenciar as cadeias antes de os arquivos serem apagados
+        atomic_write_json(report_index_path(report_dir), index)
+        for chain in expired:
+            for filename in [chain['snapshot']] + chain['deltas']:
+                removed += _remove_report_file(os.path.join(report_dir, filename))
+    if index and legacy_max_age_days > 0:
+        cutoff = time.time() - legacy_max_age_days * 86400
+        for path in glob.glob(os.path.join(report_dir, LEGACY_REPORT_GLOB)):
+            try:
+                expired_legacy = os.path.getmtime(path) < cutoff
+            except OSError:
+                continue
+            if expired_legacy:
+                removed += _remove_report_file(path)
+    if removed:
+        logger.info(f"Retenção de relatórios: {removed} arquivo(s) removido(s).")
+    return removed
@@ -0,0 +1,219 @@
+import io
+import re
+import json
+import logging
+from xml.etree import ElementTree
+
+logger = logging.getLogger(__name__)
+
+# === Padrões pré-compilados para o parse de legendas ===
+# Tags inline (<c>, </c>, <c.colorE5E5E5>, <i>, ...) e timestamps inline (<00:00:01.234>) em uma só passada
+VTT_INLINE_TAG_RE = re.compile(r'<[^>]*>')
+WHITESPACE_RE = re.compile(r'\s+')
+CUE_NUMBER_RE = re.compile(r'^\d+$')
+# Timestamps inline só aparecem nas legendas automáticas do YouTube (formato de janela rolante)
+VTT_INLINE_TIMESTAMP_RE = re.compile(r'<\d{2}:\d{2}:\d{2}\.\d{3}>')
+# Cue settings usados pelo YouTube nas legendas automáticas
+VTT_AUTO_CUE_SETTINGS = 'align:start position:0%'
+# Blocos que não contêm texto falado: a palavra-chave abre o bloco, sozinha ou seguida de espaço
+VTT_SKIPPED_BLOCK_RE = re.compile(r'^(?:NOTE|STYLE|REGION)(?:[ \t]|$)')
+# Elementos de texto do timedtext: <p> no srv3 e <text> nos formatos antigos (srv1)
+SRV_TEXT_TAGS = ('p', 'text')
+
+# Ordem de preferência passada ao yt-dlp ('subtitlesformat'): do formato mais barato de parsear ao mais caro
+SUBTITLE_FORMAT_PREFERENCE = 'json3/srv3/vtt/best'
+
+
+def iter_vtt_text(lines, dedupe=None):
+    """
+    Gera as linhas de texto de uma legenda WebVTT, uma a uma.
+
+    Args:
+        lines (iterable): Linhas da legenda (um arquivo aberto, um StringIO, uma lista...).
+        dedupe (bool, optional): Remove as repetições das legendas automáticas do YouTube,
+            que repetem cada linha 2-3 vezes por causa das cues em janela rolante.
+            Se None, é ativado automaticamente ao detectar o formato de legenda automática.
+
+    Yields:
+        str: Linhas de texto limpas, sem tags, timestamps ou cabeçalhos.
+    """
+    auto_detect = dedupe is None
+    in_header = True # Cabeçalho: do 'WEBVTT' até a primeira linha em branco (Kind:, Language:, ...)
+    in_skipped_block = False
+    at_block_start = True # Primeira linha depois de uma linha em branco (fora de uma cue)
+    previous_text = None
+
+    for raw_line in lines:
+        line = raw_line.strip()
+
+        if not line:
+            in_header = False
+            in_skipped_block = False
+            at_block_start = True
+            continue
+        block_start, at_block_start = at_block_start, False
+        if '-->' in line:
+            in_header = False
+            if auto_detect and not dedupe and VTT_AUTO_CUE_SETTINGS in line:
+                dedupe = True
+            continue
+        if in_header:
+            if line.startswith('WEBVTT') or ':' in line:
+                continue
+            in_header = False # Arquivo sem linha em branco após o cabeçalho
+        if in_skipped_block:
+            continue
+        # Só abre um bloco NOTE/STYLE/REGION no início de um bloco; dentro da cue é texto falado
+        if block_start and VTT_SKIPPED_BLOCK_RE.match(line):
+            in_skipped_block = True
+            continue
+        if CUE_NUMBER_RE.match(line):
+            continue
+
+        if auto_detect and not dedupe and VTT_INLINE_TIMESTAMP_RE.search(line):
+            dedupe = True
+
+        text = VTT_INLINE_TAG_RE.sub('', line)
+        text = WHITESPACE_RE.sub(' ', text).strip() # \s também cobre o non-breaking space (U+00A0)
+        if not text:
+            continue
+
+        # Nas legendas automáticas, cada cue repete a linha da cue anterior antes da linha nova
+        if dedupe and text == previous_text:
+            continue
+        previous_text = text
+        yield text
+
+
+def parse_vtt_content(vtt_content, dedupe=None):
+    """
+    Converte uma legenda WebVTT em texto corrido (uma linha por linha de legenda).
+
+    Args:
+        vtt_content (str | iterable): Conteúdo da legenda ou um iterável de linhas.
+        dedupe (bool, optional): Ver iter_vtt_text.
+    """
+    if isinstance(vtt_content, str):
+        vtt_content = io.StringIO(vtt_content) # Itera sem materializar a lista de linhas
+    return '\n'.join(iter_vtt_text(vtt_content, dedupe=dedupe))
+
+
+def _clean_line(text):
+    return WHITESPACE_RE.sub(' ', text).strip()
+
+
+def _as_binary_stream(content):
+    if isinstance(content, str):
+        return io.BytesIO(content.encode('utf-8'))
+    if isinstance(content, (bytes, bytearray)):
+        return io.BytesIO(content)
+    return content # Já é um arquivo aberto em modo binário
+
+
+def iter_srv3_text(content):
+    """
+    Gera as linhas de texto de uma legenda srv3 (timedtext XML) sem montar a árvore inteira.
+
+    O XML é lido com iterparse: cada <p> (ou <text>, no formato antigo) é convertido em texto
+    com itertext() — o que inclui as palavras dentro de <s> das legendas automáticas — e
+    descartado em seguida.
+
+    Args:
+        content (str | bytes | file): Conteúdo da legenda ou arquivo aberto em modo binário.
+
+    Raises:
+        ElementTree.ParseError: Se o XML estiver malformado (as linhas anteriores ao erro já foram geradas).
+    """
+    for _, element in ElementTree.iterparse(_as_binary_stream(content), events=('end',)):
+        if element.tag in SRV_TEXT_TAGS:
+            text = _clean_line(''.join(element.itertext())) # Entidades já decodificadas pelo parser XML
+            if text:
+                yield text
+            element.clear() # Libera o conteúdo do elemento já processado
+
+
+def parse_srv3_content(srv3_content):
+    """
+    Converte uma legenda srv3 em texto corrido (uma linha por <p>).
+
+    Em caso de XML malformado, retorna o texto lido até o ponto do erro.
+    """
+    lines = []
+    try:
+        for line in iter_srv3_text(srv3_content):
+            lines.append(line)
+    except ElementTree.ParseError as e:
+        logger.warning(f"XML da legenda srv3 malformado ({e}); usando as {len(lines)} linha(s) lidas até o erro.")
+    return '\n'.join(lines)
+
+
+def iter_json3_text(json3_content):
+    """
+    Gera as linhas de texto de uma legenda json3 (events -> segs -> utf8).
+
+    Nas legendas automáticas, eventos com 'aAppend' trazem apenas a quebra de linha da janela
+    rolante; o texto de cada evento já vem sem repetições.
+    """
+    data = json.loads(json3_content) if isinstance(json3_content, (str, bytes, bytearray)) else json3_content
+    for event in data.get('events') or ():
+        segments = event.get('segs')
+        if not segments:
+            continue
+        for line in ''.join(segment.get('utf8', '') for segment in segments).split('\n'):
+            line = _clean_line(line)
+            if line:
+                yield line
+
+
+def parse_json3_content(json3_content):
+    """Converte uma legenda json3 em texto corrido. Retorna "" se o JSON for inválido."""
+    try:
+        return '\n'.join(iter_json3_text(json3_content))
+    except (ValueError, AttributeError, TypeError) as e:
+        logger.error(f"Erro ao parsear legenda json3: {e}")
+        return ""
+
+
+# Parser por formato de legenda (nome do formato no yt-dlp)
+SUBTITLE_PARSERS = {
+    'json3': parse_json3_content,
+    'srv3': parse_srv3_content,
+    'srv2': parse_srv3_content,
+    'srv1': parse_srv3_content,
+    'vtt': parse_vtt_content,
+}
+
+
+def detect_subtitle_format(content):
+    """Identifica o formato pelo início do conteúdo (para entradas sem formato conhecido)."""
+    head = content[:256]
+    if isinstance(head, (bytes, bytearray)):
+        head = head.decode('utf-8', errors='replace')
+    head = head.lstrip('\ufeff \t\r\n')
+    if head.startswith('{'):
+        return 'json3'
+    if head.startswith('WEBVTT'):
+        return 'vtt'
+    if head.startswith('<'):
+        return 'srv3'
+    return None
+
+
+def parse_subtitle(content, subtitle_format=None):
+    """
+    Converte uma legenda em texto corrido usando o parser do formato.
+
+    Args:
+        content (str | bytes): Conteúdo da legenda.
+        subtitle_format (str, optional): Formato informado pelo yt-dlp ('json3', 'srv3', 'vtt'...).
+            Se ausente ou desconhecido, o formato é detectado pelo conteúdo.
+
+    Returns:
+        str | None: O texto, ou None se o formato não for suportado.
+    """
+    parser = SUBTITLE_PARSERS.get(subtitle_format) or SUBTITLE_PARSERS.get(detect_subtitle_format(content))
+    if parser is None:
+        return None
+    if parser is parse_vtt_content and isinstance(content, (bytes, bytearray)):
+        content = content.decode('utf-8', errors='replace')
+    return parser(content)
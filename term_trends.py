@@ -0,0 +1,184 @@
+import logging
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+from transcript_store import connect, connect_readonly, DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# === Série temporal de termos por canal e semana de publicação ===
+# Gravada no mesmo banco das transcrições. Cada vídeo é somado uma única vez (tabela de
+# vídeos processados) ao agregado semanal, que é o que a interface consulta.
+TREND_TERMS_PER_VIDEO = 1000 # Apenas os termos mais frequentes de cada vídeo entram na série
+RISERS_BASELINE_WEEKS = 4 # Semanas anteriores usadas como referência em top_rising_terms
+RISERS_MIN_COUNT = 5 # Contagem mínima na semana para um termo aparecer entre os que mais subiram
+
+TRENDS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS termos_videos_processados (
+    video_id TEXT PRIMARY KEY,
+    canal_url TEXT NOT NULL,
+    semana TEXT NOT NULL,
+    processado_em TEXT
+);
+
+-- Agregado semanal: semana = segunda-feira (YYYY-MM-DD) da data de publicação do vídeo
+CREATE TABLE IF NOT EXISTS termos_semanais (
+    canal_url TEXT NOT NULL,
+    semana TEXT NOT NULL,
+    termo TEXT NOT NULL,
+    contagem INTEGER NOT NULL,
+    PRIMARY KEY (canal_url, semana, termo)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_termos_semanais_semana ON termos_semanais(semana, termo);
+CREATE INDEX IF NOT EXISTS idx_termos_semanais_termo ON termos_semanais(termo, semana);
+"""
+
+_schema_ready = set()
+_write_lock = threading.Lock()
+
+
+def _connect(db_path):
+    conn = connect(db_path)
+    if db_path not in _schema_ready:
+        conn.executescript(TRENDS_SCHEMA)
+        _schema_ready.add(db_path)
+    return conn
+
+
+def _read(sql, params=(), db_path=DB_PATH):
+    """
+    Executa uma consulta em uma conexão somente leitura: nada de PRAGMA ou DDL a cada leitura
+    da interface. Banco ou tabelas ainda inexistentes (nenhuma coleta) resultam em lista vazia.
+    """
+    try:
+        conn = connect_readonly(db_path)
+    except sqlite3.OperationalError:
+        return []
+    try:
+        return conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError as e:
+        if "no such table" in str(e):
+            return []
+        raise
+    finally:
+        conn.close()
+
+
+def week_of(publish_date):
+    """Segunda-feira (YYYY-MM-DD) da semana de uma data YYYY-MM-DD, ou None se a data for inválida."""
+    try:
+        day = date.fromisoformat(publish_date)
+    except (TypeError, ValueError):
+        return None
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def record_video_terms(channel_url, videos, db_path=DB_PATH):
+    """
+    Soma à série semanal as contagens dos vídeos ainda não registrados.
+
+    Args:
+        channel_url (str): URL do canal.
+        videos (list): Entradas da janela do canal (com 'id', 'data_publicacao' e 'frequencias').
+            Vídeos já registrados ou sem data de publicação são ignorados.
+
+    Returns:
+        int: Quantidade de vídeos somados à série.
+    """
+    candidates = {video['id']: video for video in videos if video.get('frequencias') and week_of(video.get('data_publicacao'))}
+    if not candidates:
+        return 0
+    now = datetime.now().isoformat(timespec='seconds')
+    try:
+        with _write_lock:
+            conn = _connect(db_path)
+            try:
+                with conn: # Uma transação por canal
+                    placeholders = ",".join("?" * len(candidates))
+                    already_recorded = {
+                        row[0] for row in conn.execute(
+                            f"SELECT video_id FROM termos_videos_processados WHERE video_id IN ({placeholders})",
+                            list(candidates)
+                        )
+                    }
+                    new_videos = [video for video_id, video in candidates.items() if video_id not in already_recorded]
+                    for video in new_videos:
+                        week = week_of(video['data_publicacao'])
+                        top_terms = sorted(video['frequencias'].items(), key=lambda item: -item[1])[:TREND_TERMS_PER_VIDEO]
+                        conn.executemany(
+                            "INSERT INTO termos_semanais (canal_url, semana, termo, contagem) VALUES (?, ?, ?, ?) "
+                            "ON CONFLICT(canal_url, semana, termo) DO UPDATE SET contagem = contagem + excluded.contagem",
+                            [(channel_url, week, term, count) for term, count in top_terms]
+                        )
+                        conn.execute(
+                            "INSERT INTO termos_videos_processados (video_id, canal_url, semana, processado_em) VALUES (?, ?, ?, ?)",
+                            (video['id'], channel_url, week, now)
+                        )
+            finally:
+                conn.close()
+        if new_videos:
+            logger.info(f"Série de termos do canal {channel_url}: {len(new_videos)} vídeo(s) adicionado(s).")
+        return len(new_videos)
+    except Exception as e:
+        logger.error(f"Erro ao gravar a série de termos do canal {channel_url}: {e}")
+        return 0
+
+
+def latest_week(db_path=DB_PATH):
+    """Semana mais recente com dados, ou None."""
+    rows = _read("SELECT MAX(semana) FROM termos_semanais", db_path=db_path)
+    return rows[0][0] if rows else None
+
+
+def top_rising_terms(week=None, channel_url=None, limit=20, baseline_weeks=RISERS_BASELINE_WEEKS,
+                     min_count=RISERS_MIN_COUNT, db_path=DB_PATH):
+    """
+    Termos que mais subiram na semana em relação à média das `baseline_weeks` semanas anteriores.
+
+    Args:
+        week (str, optional): Segunda-feira da semana (YYYY-MM-DD). Se None, usa a mais recente.
+        channel_url (str, optional): Restringe a um canal; se None, soma todos os canais.
+
+    Returns:
+        list[dict]: 'termo', 'contagem', 'media_anterior' e 'razao' ((atual + 1) / (média + 1)).
+    """
+    week = week or latest_week(db_path)
+    if not week:
+        return []
+    baseline_start = (date.fromisoformat(week) - timedelta(weeks=baseline_weeks)).isoformat()
+    channel_filter = " AND canal_url = ?" if channel_url else ""
+    channel_params = [channel_url] if channel_url else []
+    sql = (
+        "WITH atual AS ("
+        f"  SELECT termo, SUM(contagem) AS contagem FROM termos_semanais WHERE semana = ?{channel_filter} GROUP BY termo"
+        "), anterior AS ("
+        f"  SELECT termo, SUM(contagem) * 1.0 / ? AS media FROM termos_semanais WHERE semana >= ? AND semana < ?{channel_filter} GROUP BY termo"
+        ") "
+        "SELECT atual.termo, atual.contagem, COALESCE(anterior.media, 0.0) AS media, "
+        "(atual.contagem + 1.0) / (COALESCE(anterior.media, 0.0) + 1.0) AS razao "
+        "FROM atual LEFT JOIN anterior ON anterior.termo = atual.termo "
+        "WHERE atual.contagem >= ? "
+        "ORDER BY razao DESC, atual.contagem DESC LIMIT ?"
+    )
+    params = [week] + channel_params + [baseline_weeks, baseline_start, week] + channel_params + [min_count, limit]
+    return [
+        {'termo': term, 'contagem': count, 'media_anterior': round(mean, 2), 'razao': round(ratio, 2)}
+        for term, count, mean, ratio in _read(sql, params, db_path)
+    ]
+
+
+def term_weekly_series(term, channel_url=None, db_path=DB_PATH):
+    """Contagem semanal de um termo (somando os canais, ou de um único canal): lista de (semana, contagem)."""
+    sql = "SELECT semana, SUM(contagem) FROM termos_semanais WHERE termo = ?"
+    params = [term]
+    if channel_url:
+        sql += " AND canal_url = ?"
+        params.append(channel_url)
+    sql += " GROUP BY semana ORDER BY semana"
+    return _read(sql, params, db_path)
+
+
+def list_weeks(db_path=DB_PATH):
+    """Semanas com dados, da mais recente para a mais antiga."""
+    return [row[0] for row in _read("SELECT DISTINCT semana FROM termos_semanais ORDER BY semana DESC", db_path=db_path)]
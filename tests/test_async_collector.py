@@ -0,0 +1,107 @@
+import time
+import logging
+import threading
+
+import pytest
+
+import async_collector
+from async_collector import collect_channels, is_rate_limit_error, RateLimitError
+from fake_youtube import RateLimitedYoutubeDL, bench_channel_url, reset_call_counts, CALL_COUNTS
+
+CHANNELS = [bench_channel_url(fixture, subtitle_format) for fixture in ('5min', '30min', '1h')
+            for subtitle_format in ('vtt', 'srv3', 'json3')]
+
+
+@pytest.mark.parametrize("message", [
+    "ERROR: [youtube] abc: Unable to download webpage: HTTP Error 429: Too Many Requests",
+    "Too Many Requests",
+    "server returned status code 429",
+    "rate limit exceeded",
+])
+def test_rate_limit_messages_are_detected(message):
+    assert is_rate_limit_error(Exception(message))
+
+
+@pytest.mark.parametrize("message", [
+    "ERROR: [youtube] x429abc: Video unavailable",
+    "Unable to download https://i.ytimg.com/vi/AB429cd/hqdefault.jpg: HTTP Error 404",
+    "Erro ao parsear 1429 linhas",
+])
+def test_other_errors_mentioning_429_are_not_rate_limits(message):
+    assert not is_rate_limit_error(Exception(message))
+
+
+def test_status_code_attribute_is_a_rate_limit():
+    class HTTPError(Exception):
+        status = 429
+
+    assert is_rate_limit_error(HTTPError("Unknown"))
+    assert is_rate_limit_error(RateLimitError("qualquer"))
+
+
+def test_collector_backs_off_and_reduces_concurrency_on_429(monkeypatch, caplog):
+    delays = []
+
+    def record_delay(attempt, base_delay, max_delay):
+        delays.append(attempt)
+        return 0.0 # Sem esperar de fato
+
+    monkeypatch.setattr(async_collector, 'backoff_delay', record_delay)
+    reset_call_counts()
+    RateLimitedYoutubeDL.reset_rate_limit(failures=4)
+
+    def process(url):
+        with RateLimitedYoutubeDL({'playlistend': 1}) as ydl:
+            return ydl.extract_info(url)
+
+    with caplog.at_level(logging.INFO, logger='async_collector'):
+        results = collect_channels(CHANNELS, process, initial_concurrency=8, max_concurrency=8,
+                                   rate_per_second=1000, burst=100, max_retries=6)
+
+    # Todos os canais terminam depois das novas tentativas (uma chamada a mais por 429)
+    assert CALL_COUNTS['extract_info'] == len(CHANNELS) + 4
+    assert len(results) == len(CHANNELS)
+    assert len({result['uploader'] for result in results}) == len(CHANNELS)
+    # Cada 429 gerou um backoff e pelo menos uma redução da concorrência
+    assert len(delays) == 4
+    assert any("Concorrência reduzida para" in record.getMessage() for record in caplog.records)
+
+
+def test_collector_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(async_collector, 'backoff_delay', lambda attempt, base_delay, max_delay: 0.0)
+    RateLimitedYoutubeDL.reset_rate_limit(failures=100)
+    outcomes = []
+
+    def process(url):
+        with RateLimitedYoutubeDL({'playlistend': 1}) as ydl:
+            return ydl.extract_info(url)
+
+    results = collect_channels(CHANNELS[:1], process, max_retries=2, rate_per_second=1000, burst=10,
+                               on_result=lambda url, result, error: outcomes.append(error))
+    assert results == []
+    assert len(outcomes) == 1 and is_rate_limit_error(outcomes[0])
+
+
+def test_channels_are_taken_from_the_source_only_when_a_slot_is_free():
+    # Com uma fila compartilhada, cada canal retirado é um lease: não pode haver mais canais
+    # retirados e não concluídos do que o limite de concorrência (aqui, 3 e só diminuindo)
+    lock = threading.Lock()
+    taken, finished, max_outstanding = [0], [0], [0]
+
+    def source():
+        for url in CHANNELS:
+            with lock:
+                taken[0] += 1
+                max_outstanding[0] = max(max_outstanding[0], taken[0] - finished[0])
+            yield url
+
+    def process(url):
+        time.sleep(0.02)
+        with lock:
+            finished[0] += 1
+        return {'url': url}
+
+    results = collect_channels(source(), process, initial_concurrency=3, max_concurrency=16,
+                               latency_target=0.0, rate_per_second=1000, burst=100)
+    assert len(results) == len(CHANNELS)
+    assert max_outstanding[0] <= 3
@@ -0,0 +1,34 @@
+import time
+import multiprocessing
+
+import channel_meta_cache
+from channel_meta_cache import update_channel_meta, get_cached_channel_meta, load_channel_cache
+
+
+def _write_channels(args):
+    cache_path, worker, count = args
+    for i in range(count):
+        update_channel_meta(f"https://www.youtube.com/@canal_{worker}_{i}", {'banner_url': f"banner_{worker}_{i}"}, cache_path=cache_path)
+
+
+def test_parallel_collectors_keep_each_others_entries(tmp_path):
+    cache_path = str(tmp_path / "cache_canais.db")
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        pool.map(_write_channels, [(cache_path, worker, 15) for worker in range(4)])
+
+    cache = load_channel_cache(cache_path)
+    assert len(cache) == 60
+    assert cache["https://www.youtube.com/@canal_3_14"]['banner_url'] == "banner_3_14"
+
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "cache_canais.db")
+    assert get_cached_channel_meta("https://www.youtube.com/@canal", cache_path=cache_path) is None
+
+    update_channel_meta("https://www.youtube.com/@canal", {'banner_url': "b1"}, cache_path=cache_path)
+    update_channel_meta("https://www.youtube.com/@canal", {'banner_url': "b2"}, cache_path=cache_path)
+    assert get_cached_channel_meta("https://www.youtube.com/@canal", cache_path=cache_path)['banner_url'] == "b2"
+
+    eight_days_later = time.time() + 8 * 86400
+    monkeypatch.setattr(channel_meta_cache.time, 'time', lambda: eight_days_later)
+    assert get_cached_channel_meta("https://www.youtube.com/@canal", cache_path=cache_path) is None
@@ -0,0 +1,14 @@
+import os
+
+import pytest
+
+from check_import_time import IMPORT_BUDGETS, check_module
+
+# Multiplica os orçamentos em máquinas lentas (ex.: IMPORT_BUDGET_FACTOR=2 no CI)
+BUDGET_FACTOR = float(os.environ.get('IMPORT_BUDGET_FACTOR', '1.0'))
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS))
+def test_import_within_budget(module):
+    seconds, budget, problems = check_module(module, repetitions=3, factor=BUDGET_FACTOR)
+    assert not problems, f"{module}: {'; '.join(problems)} ({seconds * 1000:.1f} ms, orçamento {budget * 1000:.0f} ms)"
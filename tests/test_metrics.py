@@ -0,0 +1,26 @@
+import os
+
+from metrics import MetricsRecorder, prune_run_summaries, LATEST_SUMMARY_FILENAME, PROMETHEUS_FILENAME
+
+
+def test_write_keeps_only_the_newest_run_summaries(tmp_path):
+    for day in range(1, 6):
+        (tmp_path / f"coleta_200009{day:02d}_120000.json").write_text("{}", encoding='utf-8')
+
+    recorder = MetricsRecorder()
+    with recorder.stage('playlist'):
+        pass
+    prometheus_path, run_path = recorder.write(output_dir=str(tmp_path), keep_runs=3)
+
+    runs = sorted(name for name in os.listdir(tmp_path) if name.startswith("coleta_"))
+    assert runs == ["coleta_20000904_120000.json", "coleta_20000905_120000.json", os.path.basename(run_path)]
+    assert os.path.exists(prometheus_path)
+    assert (tmp_path / LATEST_SUMMARY_FILENAME).exists()
+    assert (tmp_path / PROMETHEUS_FILENAME).exists()
+
+
+def test_prune_always_keeps_the_latest_run(tmp_path):
+    for hour in range(3):
+        (tmp_path / f"coleta_20260901_{hour:02d}0000.json").write_text("{}", encoding='utf-8')
+    assert prune_run_summaries(str(tmp_path), keep_runs=0) == 2
+    assert os.listdir(tmp_path) == ["coleta_20260901_020000.json"]
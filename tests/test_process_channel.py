@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+pytest.importorskip("wordcloud") # process_channel desenha a nuvem de cada canal
+
+import noingles
+import channel_window
+import wordcloud_processor
+from channel_window import VIDEO_WINDOW_SIZE
+from fake_youtube import FakeYoutubeDL, bench_channel_url, reset_call_counts, CALL_COUNTS, NO_SUBTITLES
+from refresh_schedule import SCHEDULE_PATH
+
+
+@pytest.fixture
+def collector(tmp_path, monkeypatch):
+    """noingles em um diretório temporário, com o YoutubeDL falso e a nuvem desenhada no próprio processo."""
+    monkeypatch.chdir(tmp_path)
+    noingles.create_directories()
+    monkeypatch.setattr(noingles, 'YoutubeDL', FakeYoutubeDL)
+    monkeypatch.setattr(noingles, 'render_wordcloud_renditions_in_pool', wordcloud_processor.generate_wordcloud_renditions)
+    reset_call_counts()
+    return noingles
+
+
+def forget_schedule():
+    # Sem a agenda, a coleta seguinte percorre a janela em vez de reaproveitar os dados anteriores
+    os.remove(SCHEDULE_PATH)
+
+
+def test_videos_in_window_keep_their_transcripts(collector):
+    channel_url = bench_channel_url('5min', 'json3')
+    first = collector.process_channel(channel_url)
+    forget_schedule()
+    reset_call_counts()
+
+    second = collector.process_channel(channel_url)
+
+    assert CALL_COUNTS['extract_info_video'] == 0
+    assert [video['transcricao'] for video in second['videos_processados']] == \
+        [video['transcricao'] for video in first['videos_processados']]
+    assert all(video['transcricao'].get('original') for video in second['videos_processados'])
+    saved = collector.read_json(os.path.join(collector.TRANS_DIR, f"{collector.sanitize_filename(second['nome_canal'])}.json"))
+    assert all(video['transcricao'].get('original') for video in saved['videos_processados'])
+
+
+def test_videos_without_transcript_are_not_extracted_again(collector, monkeypatch):
+    channel_url = bench_channel_url('5min', NO_SUBTITLES)
+    first = collector.process_channel(channel_url)
+    assert CALL_COUNTS['extract_info_video'] == VIDEO_WINDOW_SIZE
+    assert all(video['transcricao'] == {'status': 'não disponível'} for video in first['videos_processados'])
+
+    forget_schedule()
+    reset_call_counts()
+    collector.process_channel(channel_url)
+    assert CALL_COUNTS['extract_info_video'] == 0
+
+    # Depois do prazo, os vídeos sem transcrição são tentados de novo
+    monkeypatch.setattr(channel_window, 'MISSING_TRANSCRIPT_RETRY_SECONDS', 0)
+    forget_schedule()
+    reset_call_counts()
+    collector.process_channel(channel_url)
+    assert CALL_COUNTS['extract_info_video'] == VIDEO_WINDOW_SIZE
+
+
+def test_missing_transcripts_are_retried_without_a_new_video(collector, monkeypatch):
+    # A agenda fica no lugar: o mesmo vídeo mais recente não pode esconder a nova tentativa
+    channel_url = bench_channel_url('5min', NO_SUBTITLES)
+    collector.process_channel(channel_url)
+
+    reset_call_counts()
+    collector.process_channel(channel_url)
+    assert CALL_COUNTS['extract_info_video'] == 0 # Dentro do prazo: dados da última coleta
+
+    monkeypatch.setattr(channel_window, 'MISSING_TRANSCRIPT_RETRY_SECONDS', 0)
+    reset_call_counts()
+    collector.process_channel(channel_url)
+    assert CALL_COUNTS['extract_info_video'] == VIDEO_WINDOW_SIZE
+
+
+@pytest.mark.parametrize("subtitle_format", ['vtt_auto', 'srv3', 'json3'])
+def test_one_extraction_per_video(collector, subtitle_format):
+    data = collector.process_channel(bench_channel_url('5min', subtitle_format))
+
+    assert len(data['videos_processados']) == VIDEO_WINDOW_SIZE
+    # Metadados e legendas vêm da mesma extração; cada legenda é baixada uma vez
+    assert CALL_COUNTS['extract_info_video'] == VIDEO_WINDOW_SIZE
+    assert CALL_COUNTS['urlopen'] == VIDEO_WINDOW_SIZE
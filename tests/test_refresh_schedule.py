@@ -0,0 +1,26 @@
+import os
+
+import refresh_schedule
+from refresh_schedule import record_channel_check, get_schedule_entry, load_schedule
+
+CHANNEL = "https://www.youtube.com/@canal"
+
+
+def test_schema_is_created_once_per_database(tmp_path, monkeypatch):
+    schedule_path = str(tmp_path / "agenda_canais.db")
+    record_channel_check(CHANNEL, "v1", ["2026-10-01"], schedule_path=schedule_path)
+
+    # Depois da primeira conexão, um schema inválido não pode ser executado de novo
+    monkeypatch.setattr(refresh_schedule, 'SCHEDULE_SCHEMA', "ISTO NÃO É SQL;")
+    record_channel_check(CHANNEL, "v1", schedule_path=schedule_path)
+    assert get_schedule_entry(CHANNEL, schedule_path=schedule_path)['verificacoes_sem_novidade'] == 1
+    assert list(load_schedule(schedule_path)) == [CHANNEL]
+
+
+def test_schema_is_recreated_when_the_database_is_removed(tmp_path):
+    schedule_path = str(tmp_path / "agenda_canais.db")
+    record_channel_check(CHANNEL, "v1", schedule_path=schedule_path)
+    os.remove(schedule_path)
+
+    record_channel_check(CHANNEL, "v2", schedule_path=schedule_path)
+    assert get_schedule_entry(CHANNEL, schedule_path=schedule_path)['ultimo_video_id'] == "v2"
@@ -0,0 +1,84 @@
+import re
+
+import pytest
+
+from fixtures import make_manual_vtt, make_auto_vtt, make_srv3, make_json3, make_transcript_text
+from subtitle_parser import parse_vtt_content, iter_vtt_text, parse_srv3_content, parse_json3_content, parse_subtitle
+
+DURATIONS = [60, 5 * 60, 30 * 60]
+
+
+def legacy_parse_vtt(vtt_content):
+    # Parser anterior (re.sub por padrão, sem remover repetições), para comparação. As linhas
+    # Kind:/Language: do cabeçalho, que ele deixava passar, são ignoradas aqui.
+    parts = []
+    for line in vtt_content.splitlines():
+        line = line.strip()
+        if not line or "WEBVTT" in line or "-->" in line or re.match(r'^\d+$', line):
+            continue
+        line = re.sub(r'\s+', ' ', re.sub(r'<[^>]+>', '', line)).strip()
+        if line and not line.startswith(('Kind:', 'Language:')):
+            parts.append(line)
+    return '\n'.join(parts)
+
+
+@pytest.mark.parametrize("duration", DURATIONS)
+def test_manual_vtt_text_is_identical(duration):
+    vtt = make_manual_vtt(duration)
+    expected = make_transcript_text(duration)
+    assert parse_vtt_content(vtt) == expected
+    assert parse_vtt_content(vtt) == legacy_parse_vtt(vtt)
+
+
+@pytest.mark.parametrize("duration", DURATIONS)
+def test_auto_vtt_collapses_rolling_lines(duration):
+    vtt = make_auto_vtt(duration)
+    parsed = parse_vtt_content(vtt)
+    legacy = legacy_parse_vtt(vtt)
+    assert parsed == make_transcript_text(duration)
+    assert len(parsed) < len(legacy)
+    assert len(legacy.split()) >= 2 * len(parsed.split()) # Cada linha aparecia ao menos duas vezes
+
+
+def test_auto_vtt_without_dedupe_keeps_repetitions():
+    vtt = make_auto_vtt(60)
+    assert parse_vtt_content(vtt, dedupe=False) == legacy_parse_vtt(vtt)
+
+
+def test_iter_vtt_text_accepts_line_iterables():
+    vtt = make_manual_vtt(60)
+    assert list(iter_vtt_text(vtt.splitlines(keepends=True))) == make_transcript_text(60).split('\n')
+
+
+def test_note_style_and_region_blocks_are_skipped():
+    vtt = (
+        "WEBVTT\n\n"
+        "NOTE comentário do autor\ncontinua o comentário\n\n"
+        "STYLE\n::cue { color: white }\n\n"
+        "REGION\nid:fill width:40%\n\n"
+        "00:00:00.000 --> 00:00:02.000\nprimeira fala\n"
+    )
+    assert parse_vtt_content(vtt) == "primeira fala"
+
+
+def test_cue_text_starting_with_block_keyword_is_kept():
+    vtt = (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:02.000\nNOTE que isso importa\nsegunda linha\n\n"
+        "00:00:02.000 --> 00:00:04.000\nNOTEBOOK novo\n"
+    )
+    assert parse_vtt_content(vtt) == "NOTE que isso importa\nsegunda linha\nNOTEBOOK novo"
+
+
+@pytest.mark.parametrize("duration", DURATIONS)
+def test_srv3_and_json3_match_the_transcript(duration):
+    expected = make_transcript_text(duration)
+    assert parse_srv3_content(make_srv3(duration)) == expected
+    assert parse_srv3_content(make_srv3(duration).encode('utf-8')) == expected
+    assert parse_json3_content(make_json3(duration)) == expected
+    assert parse_subtitle(make_srv3(duration)) == expected # Formato detectado pelo conteúdo
+
+
+def test_srv3_entities_are_decoded_once():
+    srv3 = '<timedtext format="3"><body><p t="0">P&amp;D &amp;amp; &lt;tag&gt;</p></body></timedtext>'
+    assert parse_srv3_content(srv3) == "P&D &amp; <tag>"
@@ -0,0 +1,37 @@
+import os
+
+import term_trends
+from term_trends import record_video_terms, list_weeks, latest_week, top_rising_terms, term_weekly_series
+
+
+def _video(video_id, publish_date, frequencies):
+    return {'id': video_id, 'data_publicacao': publish_date, 'frequencias': frequencies}
+
+
+def test_readers_do_not_create_the_database(tmp_path):
+    db_path = str(tmp_path / "trans" / "transcricoes.db")
+    assert list_weeks(db_path=db_path) == []
+    assert latest_week(db_path=db_path) is None
+    assert top_rising_terms(db_path=db_path) == []
+    assert term_weekly_series("python", db_path=db_path) == []
+    assert not os.path.exists(db_path)
+
+
+def test_readers_use_a_read_only_connection(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "transcricoes.db")
+    videos = [
+        _video("a", "2026-09-01", {"python": 3}),
+        _video("b", "2026-09-08", {"python": 9, "rust": 6}),
+    ]
+    assert record_video_terms("https://www.youtube.com/@canal", videos, db_path=db_path) == 2
+
+    # Depois da gravação, as leituras não podem passar pela conexão que aplica PRAGMA e schema
+    def fail_connect(*args, **kwargs):
+        raise AssertionError("leitura abriu a conexão de escrita")
+    monkeypatch.setattr(term_trends, "connect", fail_connect)
+    monkeypatch.setattr(term_trends, "_connect", fail_connect)
+
+    assert list_weeks(db_path=db_path) == ["2026-09-07", "2026-08-31"]
+    assert latest_week(db_path=db_path) == "2026-09-07"
+    assert term_weekly_series("python", db_path=db_path) == [("2026-08-31", 3), ("2026-09-07", 9)]
+    assert [row['termo'] for row in top_rising_terms(db_path=db_path)] == ["rust", "python"]
@@ -0,0 +1,27 @@
+import time
+import threading
+
+import wordcloud_processor
+
+
+def test_stopword_matcher_is_built_once_across_threads(monkeypatch):
+    builds = []
+
+    def slow_entries():
+        builds.append(threading.get_ident())
+        time.sleep(0.05) # Janela em que as outras threads também pedem o motor
+        return ["de", "a", "o que"]
+
+    monkeypatch.setattr(wordcloud_processor, '_stopword_matcher', None)
+    monkeypatch.setattr(wordcloud_processor, '_load_default_stopword_entries', slow_entries)
+    matchers = []
+    threads = [threading.Thread(target=lambda: matchers.append(wordcloud_processor.get_stopword_matcher()))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert len({id(matcher) for matcher in matchers}) == 1
+    assert "de" in matchers[0].words
@@ -0,0 +1,49 @@
+from work_queue import WorkQueue, STATE_DONE, STATE_FAILED
+
+URLS = ["https://www.youtube.com/@canal_a", "https://www.youtube.com/@canal_b"]
+
+
+def _queue(tmp_path, worker_id="coletor-1"):
+    return WorkQueue(str(tmp_path / "fila_coleta.db"), worker_id=worker_id, poll_seconds=0.01)
+
+
+def test_collectors_started_together_share_the_new_run(tmp_path):
+    first = _queue(tmp_path)
+    second = _queue(tmp_path, worker_id="coletor-2") # Antes do enqueue do primeiro
+    first.enqueue(URLS)
+    third = _queue(tmp_path, worker_id="coletor-3") # Com canais pendentes
+    assert first.run_id == second.run_id == third.run_id
+    assert first.finished_runs == second.finished_runs == third.finished_runs == []
+
+
+def test_run_with_expired_leases_is_joined(tmp_path):
+    crashed = WorkQueue(str(tmp_path / "fila_coleta.db"), worker_id="coletor-1", lease_seconds=-1)
+    crashed.enqueue(URLS)
+    assert crashed.claim() == URLS[0] # Coletor morre com o canal em andamento
+
+    restarted = _queue(tmp_path, worker_id="coletor-2")
+    assert restarted.run_id == crashed.run_id
+    assert restarted.claim() == URLS[0]
+
+
+def test_crash_after_the_last_entry_starts_a_new_run(tmp_path):
+    crashed = WorkQueue(str(tmp_path / "fila_coleta.db"), worker_id="coletor-1", max_attempts=1)
+    crashed.enqueue(URLS)
+    crashed.on_result(crashed.claim(), {'url': URLS[0]}, None)
+    crashed.on_result(crashed.claim(), None, RuntimeError("erro"))
+    assert crashed.counts() == {STATE_DONE: 1, STATE_FAILED: 1}
+    # ... e termina antes de consolidar
+
+    restarted = _queue(tmp_path, worker_id="coletor-2")
+    assert restarted.run_id != crashed.run_id
+    assert restarted.finished_runs == [crashed.run_id]
+    restarted.enqueue(URLS)
+    assert restarted.claim() == URLS[0] # Os canais são coletados de novo na nova execução
+
+    # A execução esgotada continua consolidável, uma única vez
+    finished = WorkQueue(restarted.db_path, run_id=crashed.run_id, worker_id="coletor-2")
+    assert finished.try_become_consolidator()
+    assert finished.load_results() == [{'url': URLS[0]}]
+    assert not crashed.try_become_consolidator()
+
+    assert _queue(tmp_path, worker_id="coletor-3").finished_runs == []
@@ -0,0 +1,107 @@
+import os
+import re
+import time
+import logging
+
+from file_utils import atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+# === Configuração do cache de transcrições ===
+# Um arquivo JSON por (vídeo, idioma) com a transcrição já parseada e os metadados do vídeo.
+CACHE_DIR = os.path.join("trans", "cache_transcricoes")
+CACHE_MAX_AGE_DAYS = 30 # Entradas mais antigas que isso são descartadas
+CACHE_MAX_BYTES = 200 * 1024 * 1024 # Limite de tamanho total do diretório de cache (200 MB)
+
+
+def _cache_path(video_id, lang, cache_dir):
+    safe_id = re.sub(r'[^a-zA-Z0-9_-]', '_', video_id)
+    safe_lang = re.sub(r'[^a-zA-Z0-9_-]', '_', lang or 'und')
+    return os.path.join(cache_dir, f"{safe_id}.{safe_lang}.json")
+
+
+def get_cached_video(video_id, lang, cache_dir=CACHE_DIR, max_age_days=CACHE_MAX_AGE_DAYS):
+    """
+    Retorna a entrada em cache para (video_id, lang) ou None se não existir/estiver expirada.
+
+    A entrada é um dict com as chaves 'metadados' e 'transcricao'.
+    """
+    path = _cache_path(video_id, lang, cache_dir)
+    if not os.path.exists(path):
+        return None
+
+    entry = read_json(path)
+    if not entry or 'transcricao' not in entry:
+        logger.warning(f"Entrada de cache inválida para {video_id} ({lang}). Descartando.")
+        _remove_quietly(path)
+        return None
+
+    age_seconds = time.time() - entry.get('salvo_em', 0)
+    if age_seconds > max_age_days * 86400:
+        logger.debug(f"Entrada de cache expirada para {video_id} ({lang}).")
+        _remove_quietly(path)
+        return None
+
+    return entry
+
+
+def save_cached_video(video_id, lang, metadata, transcript, cache_dir=CACHE_DIR):
+    """Grava a transcrição parseada e os metadados de um vídeo no cache."""
+    entry = {
+        'video_id': video_id,
+        'idioma': lang,
+        'salvo_em': time.time(),
+        'metadados': metadata,
+        'transcricao': transcript,
+    }
+    try:
+        atomic_write_json(_cache_path(video_id, lang, cache_dir), entry, compact=True)
+    except Exception as e:
+        logger.warning(f"Não foi possível gravar o cache de transcrição para {video_id}: {e}")
+
+
+def evict_cache(cache_dir=CACHE_DIR, max_age_days=CACHE_MAX_AGE_DAYS, max_bytes=CACHE_MAX_BYTES):
+    """
+    Remove entradas expiradas e, se o diretório passar de `max_bytes`,
+    remove as entradas mais antigas (por data de modificação) até caber no limite.
+
+    Returns:
+        int: Quantidade de arquivos removidos.
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    now = time.time()
+    removed = 0
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if not entry.is_file() or not entry.name.endswith('.json'):
+            continue
+        stat = entry.stat()
+        if now - stat.st_mtime > max_age_days * 86400:
+            if _remove_quietly(entry.path):
+                removed += 1
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total_bytes = sum(size for _, size, _ in entries)
+    if total_bytes > max_bytes:
+        entries.sort() # Mais antigas primeiro
+        for _, size, path in entries:
+            if total_bytes <= max_bytes:
+                break
+            if _remove_quietly(path):
+                total_bytes -= size
+                removed += 1
+
+    if removed:
+        logger.info(f"Cache de transcrições: {removed} entrada(s) removida(s) de '{cache_dir}'.")
+    return removed
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
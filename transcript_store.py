@@ -0,0 +1,191 @@
+import os
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# === Banco SQLite com as transcrições (canais, vídeos, transcrições e índice FTS5) ===
+DB_PATH = os.path.join("trans", "transcricoes.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS canais (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    nome TEXT,
+    atualizado_em TEXT
+);
+
+CREATE TABLE IF NOT EXISTS videos (
+    id TEXT PRIMARY KEY,
+    canal_id INTEGER NOT NULL REFERENCES canais(id),
+    titulo TEXT,
+    url TEXT,
+    data_publicacao TEXT,
+    visualizacoes INTEGER,
+    coletado_em TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_videos_canal_data ON videos(canal_id, data_publicacao);
+CREATE INDEX IF NOT EXISTS idx_videos_data ON videos(data_publicacao);
+
+CREATE TABLE IF NOT EXISTS transcricoes (
+    video_id TEXT PRIMARY KEY REFERENCES videos(id),
+    idioma TEXT,
+    texto TEXT NOT NULL
+);
+
+-- Índice de texto completo sobre as transcrições (conteúdo externo: o texto não é duplicado)
+CREATE VIRTUAL TABLE IF NOT EXISTS transcricoes_fts USING fts5(
+    texto,
+    content='transcricoes',
+    content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS transcricoes_ai AFTER INSERT ON transcricoes BEGIN
+    INSERT INTO transcricoes_fts(rowid, texto) VALUES (new.rowid, new.texto);
+END;
+CREATE TRIGGER IF NOT EXISTS transcricoes_ad AFTER DELETE ON transcricoes BEGIN
+    INSERT INTO transcricoes_fts(transcricoes_fts, rowid, texto) VALUES ('delete', old.rowid, old.texto);
+END;
+CREATE TRIGGER IF NOT EXISTS transcricoes_au AFTER UPDATE ON transcricoes BEGIN
+    INSERT INTO transcricoes_fts(transcricoes_fts, rowid, texto) VALUES ('delete', old.rowid, old.texto);
+    INSERT INTO transcricoes_fts(rowid, texto) VALUES (new.rowid, new.texto);
+END;
+"""
+
+_schema_ready = set()
+_write_lock = threading.Lock() # Serializa as escritas das threads do coletor neste processo
+
+
+def connect(db_path=DB_PATH):
+    """Abre uma conexão com o banco (modo WAL), criando o schema na primeira vez."""
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    if db_path not in _schema_ready:
+        conn.executescript(SCHEMA)
+        _schema_ready.add(db_path)
+    return conn
+
+
+def connect_readonly(db_path=DB_PATH):
+    """
+    Abre uma conexão somente leitura, sem PRAGMA nem schema (usada pelas consultas da interface).
+
+    Raises:
+        sqlite3.OperationalError: Se o banco ainda não existir.
+    """
+    return sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True, timeout=30)
+
+
+def save_channel_to_store(data_channel, db_path=DB_PATH):
+    """
+    Grava um canal, seus vídeos e transcrições em uma única transação.
+
+    Args:
+        data_channel (dict): Dados do canal no formato produzido por process_channel.
+    """
+    now = datetime.now().isoformat(timespec='seconds')
+    video_rows = []
+    transcript_rows = []
+    for video in data_channel.get('videos_processados', []):
+        video_rows.append((
+            video['id'], video.get('titulo'), video.get('url'),
+            video.get('data_publicacao'), video.get('visualizacoes'), now
+        ))
+        transcript = video.get('transcricao') or {}
+        if transcript.get('original'):
+            transcript_rows.append((video['id'], transcript.get('source_language'), transcript['original']))
+
+    try:
+        with _write_lock:
+            conn = connect(db_path)
+            try:
+                with conn: # Uma transação por canal
+                    conn.execute(
+                        "INSERT INTO canais (url, nome, atualizado_em) VALUES (?, ?, ?) "
+                        "ON CONFLICT(url) DO UPDATE SET nome = excluded.nome, atualizado_em = excluded.atualizado_em",
+                        (data_channel['url'], data_channel.get('nome_canal'), now)
+                    )
+                    channel_id = conn.execute("SELECT id FROM canais WHERE url = ?", (data_channel['url'],)).fetchone()[0]
+                    conn.executemany(
+                        "INSERT INTO videos (id, canal_id, titulo, url, data_publicacao, visualizacoes, coletado_em) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(id) DO UPDATE SET titulo = excluded.titulo, visualizacoes = excluded.visualizacoes, "
+                        "data_publicacao = COALESCE(excluded.data_publicacao, videos.data_publicacao), coletado_em = excluded.coletado_em",
+                        [(row[0], channel_id) + row[1:] for row in video_rows]
+                    )
+                    # UPSERT (e não INSERT OR REPLACE) para que o gatilho de UPDATE mantenha o FTS em sincronia
+                    conn.executemany(
+                        "INSERT INTO transcricoes (video_id, idioma, texto) VALUES (?, ?, ?) "
+                        "ON CONFLICT(video_id) DO UPDATE SET idioma = excluded.idioma, texto = excluded.texto "
+                        "WHERE transcricoes.texto IS NOT excluded.texto OR transcricoes.idioma IS NOT excluded.idioma",
+                        transcript_rows
+                    )
+            finally:
+                conn.close()
+        logger.info(f"Canal '{data_channel.get('nome_canal')}' gravado no banco: {len(video_rows)} vídeo(s), {len(transcript_rows)} transcrição(ões).")
+        return True
+    except Exception as e:
+        logger.error(f"Erro ao gravar canal '{data_channel.get('nome_canal', 'Desconhecido')}' no banco: {e}")
+        return False
+
+
+def search_channels_mentioning(query, since=None, db_path=DB_PATH):
+    """
+    Canais cujas transcrições casam com a consulta FTS5 `query` (ex.: 'selic' ou '"taxa selic"').
+
+    Args:
+        since (str, optional): Data mínima de publicação (YYYY-MM-DD).
+
+    Returns:
+        list[dict]: Canais com a quantidade de vídeos que mencionam o termo.
+    """
+    sql = (
+        "SELECT c.nome, c.url, COUNT(*) AS videos, MAX(v.data_publicacao) AS ultima_mencao "
+        "FROM transcricoes_fts "
+        "JOIN transcricoes t ON t.rowid = transcricoes_fts.rowid "
+        "JOIN videos v ON v.id = t.video_id "
+        "JOIN canais c ON c.id = v.canal_id "
+        "WHERE transcricoes_fts MATCH ?"
+    )
+    params = [query]
+    if since:
+        sql += " AND v.data_publicacao >= ?"
+        params.append(since)
+    sql += " GROUP BY c.id ORDER BY videos DESC, ultima_mencao DESC"
+
+    conn = connect(db_path)
+    try:
+        return [
+            {'nome_canal': nome, 'url': url, 'videos': videos, 'ultima_mencao': ultima}
+            for nome, url, videos, ultima in conn.execute(sql, params)
+        ]
+    finally:
+        conn.close()
+
+
+def search_transcripts(query, limit=20, db_path=DB_PATH):
+    """Vídeos cujas transcrições casam com `query`, ordenados por relevância (bm25), com um trecho destacado."""
+    sql = (
+        "SELECT v.id, v.titulo, v.url, v.data_publicacao, c.nome, "
+        "snippet(transcricoes_fts, 0, '[', ']', '…', 12) "
+        "FROM transcricoes_fts "
+        "JOIN transcricoes t ON t.rowid = transcricoes_fts.rowid "
+        "JOIN videos v ON v.id = t.video_id "
+        "JOIN canais c ON c.id = v.canal_id "
+        "WHERE transcricoes_fts MATCH ? "
+        "ORDER BY bm25(transcricoes_fts) LIMIT ?"
+    )
+    conn = connect(db_path)
+    try:
+        return [
+            {'id': vid, 'titulo': titulo, 'url': url, 'data_publicacao': data, 'nome_canal': canal, 'trecho': trecho}
+            for vid, titulo, url, data, canal, trecho in conn.execute(sql, (query, limit))
+        ]
+    finally:
+        conn.close()
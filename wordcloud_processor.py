@@ -1,22 +1,70 @@
 import os
 import re
-import nltk
-from wordcloud import WordCloud
-#import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+import hashlib
+import unicodedata
+import threading
+from functools import lru_cache
+from collections import Counter, namedtuple
 import logging
 
+from file_utils import atomic_write_json, read_json
+
 logger = logging.getLogger(__name__)
 
 # Nome do diretório para salvar as nuvens de palavras (será criado dentro de TRANS_DIR)
 WORDCLOUDS_SUBDIR_NAME = "nuvens_palavras"
 
+# Formato e qualidade padrão das imagens geradas (qualidade só se aplica a formatos com perda, como webp)
+WORDCLOUD_DEFAULT_FORMAT = "png"
+WORDCLOUD_DEFAULT_QUALITY = 85
+
+# Versões de cada nuvem: a completa (usada ao ampliar) e uma prévia menor exibida na página.
+# A escala multiplica o tamanho do layout (800x400) ao desenhar a imagem.
+WORDCLOUD_FULL_SCALE = 1
+WORDCLOUD_PREVIEW_SCALE = 0.5
+WORDCLOUD_PREVIEW_SUFFIX = ".preview"
+# Caracteres do hash do conteúdo no nome do arquivo (nomes imutáveis, cacheáveis pelo navegador)
+WORDCLOUD_HASH_LENGTH = 12
+# Gerações mantidas de cada nuvem: a atual e a anterior (ainda referenciada pelo manifesto
+# exibido na interface enquanto a coleta está em andamento)
+WORDCLOUD_RENDITIONS_KEPT = 2
+
+# nltk e wordcloud (que traz numpy e PIL) são importados apenas no primeiro uso: importar este
+# módulo não acessa a rede nem o disco, o que mantém rápidos os reruns do Streamlit e os
+# processos do pool de renderização (que só desenham as nuvens).
+LOCAL_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+# Marca gravada após verificar os recursos do NLTK (uma vez por instalação/versão do NLTK)
+NLTK_RESOURCES_MARKER = os.path.join(LOCAL_CACHE_DIR, "nltk_recursos.json")
+# Stopwords já normalizadas (NLTK + STOPWORDS_DIR), reconstruídas quando as fontes mudam
+STOPWORDS_CACHE_PATH = os.path.join(LOCAL_CACHE_DIR, "stopwords_pt.json")
+
+def _package_version(name):
+    from importlib import metadata # ~35 ms de importação: só quando necessário
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
 # Tenta baixar 'stopwords' e 'punkt' do NLTK se não estiverem presentes
 # 'punkt' é necessário para tokenização em algumas versões do WordCloud ou para pré-processamento futuro
-def ensure_nltk_resources():
+def ensure_nltk_resources(force=False):
+    """
+    Verifica (e baixa, se preciso) os recursos do NLTK.
+
+    Depois de uma verificação bem-sucedida, grava NLTK_RESOURCES_MARKER com a versão do NLTK;
+    as chamadas seguintes retornam sem importar o NLTK enquanto a versão instalada não mudar.
+    """
+    nltk_version = _package_version('nltk')
+    marker = read_json(NLTK_RESOURCES_MARKER) or {}
+    if not force and nltk_version and marker.get('nltk') == nltk_version:
+        return
+    try:
+        import nltk
+    except ImportError as e:
+        logger.error(f"NLTK não está instalado: {e}")
+        return
     resources = {"corpora/stopwords": "stopwords", "tokenizers/punkt": "punkt"}
+    all_present = True
     for resource_path, resource_id in resources.items():
         try:
             nltk.data.find(resource_path)
@@ -24,204 +72,298 @@ def ensure_nltk_resources():
         except LookupError: # Alterado de nltk.downloader.DownloadError
             logger.info(f"Recurso NLTK '{resource_id}' não encontrado. Baixando...")
             try:
-                nltk.download(resource_id, quiet=True)
+                if not nltk.download(resource_id, quiet=True):
+                    raise RuntimeError("download não concluído")
                 logger.info(f"Recurso NLTK '{resource_id}' baixado com sucesso.")
             except Exception as e: # Captura qualquer erro durante o download
                 logger.error(f"Erro ao baixar recurso NLTK '{resource_id}': {e}")
+                all_present = False
         except Exception as e: # Captura outros erros inesperados ao verificar o recurso
             logger.error(f"Erro ao verificar recurso NLTK '{resource_id}': {e}")
+            all_present = False
+    if all_present and nltk_version:
+        try:
+            atomic_write_json(NLTK_RESOURCES_MARKER, {'nltk': nltk_version, 'recursos': sorted(resources.values())})
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar a marca dos recursos do NLTK: {e}")
+
+# === Motor de stopwords ===
+# Listas de domínio em arquivos .txt (uma entrada por linha, '#' para comentários)
+STOPWORDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stopwords_pt")
+# Mesma tokenização padrão do WordCloud (palavras com 2+ caracteres)
+TOKEN_RE = re.compile(r"\w[\w']+")
+# Fallback básico caso o NLTK e os arquivos de stopwords não estejam disponíveis
+FALLBACK_STOPWORDS = ('que', 'de', 'do', 'da', 'o', 'a', 'e', 'é', 'um', 'uma')
+
+StopwordMatcher = namedtuple('StopwordMatcher', ['words', 'phrases', 'max_phrase_len'])
+
+@lru_cache(maxsize=65536)
+def fold_term(term):
+    """Normaliza um termo para comparação: minúsculas e sem acentos ('Pô' -> 'po')."""
+    decomposed = unicodedata.normalize('NFKD', term.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+def load_stopword_files(directory=STOPWORDS_DIR):
+    """Lê todas as entradas dos arquivos .txt de `directory`, ignorando comentários e linhas vazias."""
+    entries = []
+    if not os.path.isdir(directory):
+        logger.warning(f"Diretório de stopwords '{directory}' não encontrado.")
+        return entries
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.txt'):
+            continue
+        with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = line.split('#', 1)[0].strip()
+                if entry:
+                    entries.append(entry)
+    return entries
+
+def build_stopword_matcher(entries):
+    """
+    Compila uma lista de stopwords em um StopwordMatcher.
 
-ensure_nltk_resources()
-
-def get_portuguese_stopwords():
-    """Retorna uma lista de stopwords em português do NLTK, mais algumas personalizadas."""
+    Entradas de uma palavra vão para `words`; entradas com várias palavras ('por exemplo',
+    'quer dizer') viram n-gramas em `phrases`. Tudo é normalizado com fold_term.
+    """
+    words = set()
+    phrases = set()
+    for entry in entries:
+        tokens = tuple(fold_term(token) for token in TOKEN_RE.findall(entry))
+        if len(tokens) == 1:
+            words.add(tokens[0])
+        elif len(tokens) > 1:
+            phrases.add(tokens)
+        elif entry.strip():
+            words.add(fold_term(entry.strip())) # Entradas de 1 caractere ('o', 'a', 'é')
+    max_phrase_len = max((len(phrase) for phrase in phrases), default=0)
+    return StopwordMatcher(frozenset(words), frozenset(phrases), max_phrase_len)
+
+def _load_nltk_stopwords():
+    try:
+        ensure_nltk_resources()
+        import nltk
+        return nltk.corpus.stopwords.words('portuguese')
+    except ImportError as e:
+        logger.error(f"NLTK não está instalado: {e}")
+    except LookupError:
+        logger.error("Pacote 'stopwords' do NLTK não encontrado. Tente nltk.download('stopwords').")
+    except Exception as e:
+        logger.error(f"Erro ao carregar stopwords do NLTK: {e}")
+    return []
+
+def _stopword_sources_signature(directory=STOPWORDS_DIR):
+    # Versão do NLTK e (nome, tamanho, mtime) de cada arquivo .txt: muda sempre que uma fonte muda
+    files = []
+    if os.path.isdir(directory):
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith('.txt'):
+                stat = os.stat(os.path.join(directory, filename))
+                files.append([filename, stat.st_size, stat.st_mtime_ns])
+    return {'nltk': _package_version('nltk'), 'arquivos': files}
+
+def _load_default_stopword_entries():
+    """Entradas do motor padrão, lidas do cache em STOPWORDS_CACHE_PATH quando ele está atualizado."""
+    try:
+        signature = _stopword_sources_signature()
+    except OSError as e:
+        logger.error(f"Erro ao ler o diretório de stopwords: {e}")
+        signature = None
+    cached = read_json(STOPWORDS_CACHE_PATH)
+    if signature and cached and cached.get('assinatura') == signature and cached.get('entradas'):
+        return cached['entradas']
+
+    nltk_entries = list(_load_nltk_stopwords())
+    entries = list(nltk_entries)
     try:
-        base_stopwords = set(nltk.corpus.stopwords.words('portuguese'))
-        # Adicione aqui outras stopwords comuns em transcrições ou específicas do seu domínio
-
-        custom_stopwords = {
-
-    # outras
-    'interior', 'entrar', 'ideal', 'começam', 'estudando', 'ganhar', 'ganho', 'ganhei', 'perda', 'perdi', 'perdeu', 'perdendo', 'perca', 'cedo', 'necessariamente', 'elevado', 'recebe', 'mês', 'distante', 'jovem', 'juventude', 'velho', 'adulto', 'criança', 'nesse', 'nessa', 'neste', 'nesta', 'hoje', 'amanhã', 'depois', 'ontem', 'pagar', 'entrar', 'concluir', 'dessa', 'desse', 'filhos', 'casamento', 'ideal', 'começam', 'ocupado', 'filho', 'familiar', 'mês', 'pagando', 'cresci', 'cresce', 'crescimento', 'deparar', 'chato', 'falando', 'deixa', 'deixar', 'deixou', 'toda', 'todo', 'cozinha', 'repente', 'ama', 'função', 'funções', 'funcionalidade', 'piada', 'relação', 'muitas', 'muito', 'muita', 'muitos', 'Pô', 'pô', 'ó', 'Ó', 'atrás', 'dentro', 'todas', 'mundo', 'vams', 'meio', 'chama', 'diferente', 'diferença', 'diferentes', 'atender', 'atendimento', 'whatsapp', 'novos', 'acredita', 'operador', 'evolução', 'ajuda', 'pai', 'filho', 'surpreendendo', 'passado', 'conseguir','esquece', 'esquecer', 'esquecida', 'filhos', 'filha', 'filhas', 'fila', 'filas', 'puxada', 'alguns', 'alguma', 'algumas', 'coisa', 'coisas', 'leves', 'leve', 'grandes', 'grandeza', 'grandão', 'paraa', 'lugar', 'chegar', 'chegou', 'chegada', 'largada', 'trazer', 'vezes','gosto', 'gosta', 'Uhum', 
-    # --- Artigos ---
-    'o', 'a', 'os', 'as', 'um', 'uma', 'uns', 'umas',
-
-    # --- Preposições ---
-    'de', 'do', 'da', 'dos', 'das', 'em', 'no', 'na', 'nos', 'nas',
-    'por', 'pelo', 'pela', 'pelos', 'pelas',
-    'para', 'pra', 'pro', # 'pra' e 'pro' são contrações informais importantes
-    'com', 'sem', 'sob', 'sobre', 'ante', 'após', 'até', 'contra',
-    'desde', 'entre', 'perante', 'trás', 'através', 'segundo', 'conforme', 'durante',
-
-    # --- Conjunções ---
-    'e', 'ou', 'mas', 'porém', 'contudo', 'entretanto', 'todavia',
-    'que', 'se', 'porque', 'pois', 'quando', 'enquanto', 'embora',
-    'como', 'assim', 'logo', 'portanto', 'então', 'assim', 'afinal',
-
-    # --- Pronomes Pessoais e Tratamento ---
-    'eu', 'tu', 'ele', 'ela', 'nós', 'vós', 'eles', 'elas',
-    'me', 'te', 'se', 'lhe', 'nos', 'vos', 'lhes',
-    'mim', 'ti', 'si', 'conosco', 'convosco',
-    'você', 'vocês', 'sr', 'sra', 'senhor', 'senhora',
-
-    # --- Pronomes Possessivos ---
-    'meu', 'minha', 'meus', 'minhas',
-    'teu', 'tua', 'teus', 'tuas',
-    'seu', 'sua', 'seus', 'suas', # Já cobre 'dele', 'dela', 'deles', 'delas' implicitamente
-    'nosso', 'nossa', 'nossos', 'nossas',
-    'vosso', 'vossa', 'vossos', 'vossas',
-
-    # --- Pronomes Demonstrativos ---
-    'este', 'esta', 'estes', 'estas', 'isto',
-    'esse', 'essa', 'esses', 'essas', 'isso',
-    'aquele', 'aquela', 'aqueles', 'aquelas', 'aquilo',
-    'tal', 'tais', 'mesmo', 'mesma', 'mesmos', 'mesmas',
-    'outro', 'outra', 'outros', 'outras',
-
-    # --- Pronomes Indefinidos e Relativos ---
-    'alguém', 'ninguém', 'tudo', 'nada', 'algo', 'cada', 'qualquer', 'quaisquer',
-    'quem', 'qual', 'quais', 'cujo', 'cuja', 'cujos', 'cujas', 'onde', 'quanto', 'quantos', 'quanta', 'quantas',
-
-    # --- Advérbios Comuns (tempo, lugar, modo, intensidade, etc.) ---
-    'aqui', 'ali', 'lá', 'aí', 'acolá', 'cá',
-    'agora', 'hoje', 'ontem', 'amanhã', 'depois', 'antes', 'breve',
-    'sempre', 'nunca', 'jamais', 'ainda', 'já',
-    'muito', 'pouco', 'mais', 'menos', 'bem', 'mal', 'assim', 'quase',
-    'também', 'só', 'somente', 'apenas', 'inclusive', 'exclusive',
-    'talvez', 'certamente', 'realmente', 'provavelmente', 'acaso',
-    'onde', 'aonde', 'donde', 'como', 'quando',
-
-    # --- Verbos Auxiliares e Comuns (em algumas formas) ---
-    # Ser
-    'ser', 'sou', 'és', 'é', 'somos', 'sois', 'são',
-    'era', 'eras', 'era', 'éramos', 'éreis', 'eram',
-    'fui', 'foste', 'foi', 'fomos', 'fostes', 'foram',
-    'serei', 'serás', 'será', 'seremos', 'sereis', 'serão',
-    'seria', 'serias', 'seria', 'seríamos', 'seríeis', 'seriam',
-    'sendo', 'sido',
-    # Estar
-    'estar', 'estou', 'estás', 'está', 'estamos', 'estais', 'estão',
-    'estava', 'estavas', 'estava', 'estávamos', 'estáveis', 'estavam',
-    'esteve', 'estiveste', 'esteve', 'estivemos', 'estivestes', 'estiveram',
-    'estarei', 'estarás', 'estará', 'estaremos', 'estareis', 'estarão',
-    'estaria', 'estarias', 'estaria', 'estaríamos', 'estaríeis', 'estariam',
-    'estando', 'estado',
-    # Ter
-    'ter', 'tenho', 'tens', 'tem', 'temos', 'tendes', 'têm',
-    'tinha', 'tinhas', 'tinha', 'tínhamos', 'tínheis', 'tinham',
-    'tive', 'tiveste', 'teve', 'tivemos', 'tivestes', 'tiveram',
-    'terei', 'terás', 'terá', 'teremos', 'tereis', 'terão',
-    'teria', 'terias', 'teria', 'teríamos', 'teríeis', 'teriam',
-    'tendo', 'tido',
-    # Haver
-    'haver', 'hei', 'hás', 'há', 'havemos', 'haveis', 'hão',
-    'havia', 'houve', 'haverá', 'haveria',
-    # Ir
-    'ir', 'vou', 'vais', 'vai', 'vamos', 'ides', 'vão', # 'vamo' é coloquial
-    'ia', 'ias', 'ia', 'íamos', 'íeis', 'iam',
-    'fui', 'foste', 'foi', 'fomos', 'fostes', 'foram', # Repetido de 'ser', mas comum para 'ir'
-    'irei', 'irás', 'irá', 'iremos', 'ireis', 'irão',
-    'iria', 'irias', 'iria', 'iríamos', 'iríeis', 'iriam',
-    'indo', 'ido',
-    # Fazer
-    'fazer', 'faço', 'fazes', 'faz', 'fazemos', 'fazeis', 'fazem',
-    'fazia', 'fiz', 'fez', 'fará', 'faria', 'feito', 'fazendo',
-    # Poder
-    'poder', 'posso', 'podes', 'pode', 'podemos', 'podeis', 'podem',
-    'podia', 'pude', 'pôde', 'poderá', 'poderia', 'podendo', 'podido',
-    # Dizer
-    'dizer', 'digo', 'dizes', 'diz', 'dizemos', 'dizeis', 'dizem',
-    'dizia', 'disse', 'dirá', 'diria', 'dizendo', 'dito',
-    # Querer
-    'querer', 'quero', 'queres', 'quer', 'queremos', 'quereis', 'querem',
-    'queria', 'quis', 'quisera', 'querendo', 'querido',
-    # Saber
-    'saber', 'sei', 'sabes', 'sabe', 'sabemos', 'sabeis', 'sabem',
-    'sabia', 'soube', 'saberá', 'saberia', 'sabendo', 'sabido',
-    # Ver
-    'ver', 'vejo', 'vês', 'vê', 'vemos', 'vedes', 'veem',
-    'via', 'vi', 'viu', 'verá', 'veria', 'vendo', 'visto', 'enxerga', 'olha', 'olhar', 'olhando',
-    # Dar
-    'dar', 'dou', 'dás', 'dá', 'damos', 'dais', 'dão',
-    'dava', 'dei', 'deu', 'dará', 'daria', 'dando', 'dado',
-    # Vir
-    'vir', 'venho', 'vens', 'vem', 'vimos', 'vindes', 'vêm',
-    'vinha', 'vim', 'veio', 'virá', 'viria', 'vindo',
-    # Ficar
-    'ficar', 'fico', 'fica', 'ficamos', 'ficam', 'ficava', 'fiquei', 'ficou', 'ficará', 'ficaria', 'ficando',
-    # Achar
-    'achar', 'acho', 'acha', 'achamos', 'acham', 'achava', 'achei', 'achou', 'achará', 'acharia', 'achando',
-
-    # --- Interjeições e Expressões Comuns (coloquiais BR) ---
-    'né', 'tá', 'tô', 'aí', 'daí', 'então', 'poxa', 'puts', 'eita', 'vixe', 'xi', 'ué', 'uai',
-    'tipo', 'mano', 'cara', 'meu', # 'cara' e 'meu' como vocativos/interjeições
-    'ah', 'oh', 'ih', 'eh', 'hem', 'hein', 'hum', 'hmm', 'olá', 'oi', 'alô',
-    'oba', 'opa', 'epa', 'ora', 'pois', 'psiu', 'oba', 'eba',
-    'caramba', 'nossa', 'céus', 'credo', 'ufa', 'valeu', 'beleza', 'show', 'joia', 'legal', 'bacana', 'massa', 'top',
-    'ok', 'okay', 'certo', 'combinado',
-
-    # --- Saudações e Despedidas ---
-    'bom', 'boa', 'dia', 'tarde', 'noite', # "bom dia", "boa tarde", "boa noite"
-    'obrigado', 'obrigada', 'de nada', 'por nada', 'disponha',
-    'tchau', 'adeus', 'até logo', 'até mais',
-
-    # --- Palavras Genéricas / Vagas / Enchimento ---
-    'coisa', 'coisas', 'negócio', 'parada', 'lance', 'bagulho', 'troço',
-    'gente', 'pessoal', 'galera', 'turma', 'pessoa', 'pessoas',
-    'parte', 'ponto', 'lado', 'jeito', 'forma', 'maneira', 'modo',
-    'questão', 'assunto', 'caso', 'situação', 'problema', 'solução',
-    'nível', 'grau', 'espécie', 'exemplo', 'fato',
-    'momento', 'hora', 'tempo', 'vez', 'instante', 'época',
-    'tudo', # Já incluso em pronomes indefinidos, mas reforçando
-    'alguma', 'nenhuma', 'vários', 'várias', 'diversos', 'diversas',
-    'grande', 'pequeno', 'enorme', 'mínimo', 'máximo',
-    'alto', 'baixo', 'novo', 'velho',
-    'primeiro', 'segundo', 'terceiro', 'último', # Numerais ordinais básicos
-    'próprio', 'própria',
-
-    # --- Numerais Cardinais (por extenso, os mais comuns) ---
-    'zero', 'um', 'dois', 'duas', 'três', 'quatro', 'cinco',
-    'seis', 'sete', 'oito', 'nove', 'dez',
-
-    # --- Termos de Mídia Social / YouTube (se relevante para seu contexto) ---
-    'vídeo', 'canal', 'link', 'post', 'clique', 'clicar', 'curtir', 'curte', 'like',
-    'compartilhar', 'compartilhe', 'comentar', 'comentário', 'comenta', 'comentem',
-    'inscrição', 'inscrever', 'inscreva-se', 'inscreva', 'segue', 'seguir', 'seguindo',
-    'live', 'stories', 'feed', 'perfil', 'conta', 'online', 'site', 'blog',
-    'descrição', 'abaixo', 'acima', 'confira', 'veja', 'assista',
-
-    # --- Conectores Orais / Vícios de Linguagem (muitos já cobertos, mas reforçando) ---
-    'basicamente', 'literalmente', 'justamente', 'exatamente', 'principalmente',
-    'enfim', 'finalmente', 'aliás', 'inclusive', 'além', 'ademais',
-    'quer dizer', 'ou seja', 'isto é', 'por exemplo',
-
-    # --- Termos de Processo/Ação Genéricos ---
-    'começar', 'começa', 'começando', 'iniciar', 'inicia', 'iniciando',
-    'terminar', 'termina', 'terminando', 'finalizar', 'finaliza', 'finalizando',
-    'continuar', 'continua', 'continuando', 'seguir', 'segue', 'seguindo', # 'seguir' também pode ser de 'follow'
-    'usar', 'usa', 'usando', 'utilizar', 'utiliza', 'utilizando',
-    'mostrar', 'mostra', 'mostrando', 'apresentar', 'apresenta', 'apresentando',
-    'colocar', 'coloca', 'colocando', 'botar', 'bota', 'botando', # 'botar' é mais informal
-    'pegar', 'pega', 'pegando',
-    'falar', 'fala', 'falando', 'conversar', 'conversa', 'conversando',
-    'perguntar', 'pergunta', 'perguntando', 'responder', 'responde', 'respondendo',
-
-    # --- Palavras de comparação e grau ---
-    'tão', 'tanto', 'tanta', 'tantos', 'tantas', 'quanto',
-    'maior', 'menor', 'melhor', 'pior',
-    'super', 'hiper', 'mega', 'ultra', # prefixos comuns que viram palavras
+        entries.extend(load_stopword_files())
+    except Exception as e:
+        logger.error(f"Erro ao carregar arquivos de stopwords: {e}")
+    # Sem as stopwords do NLTK o cache não é gravado: a próxima execução tenta de novo
+    if signature and nltk_entries:
+        try:
+            atomic_write_json(STOPWORDS_CACHE_PATH, {'assinatura': signature, 'entradas': entries}, compact=True)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o cache de stopwords: {e}")
+    return entries
+
+# Construído sob lock: as threads do coletor pedem o motor ao mesmo tempo na primeira coleta, e
+# cada construção pode tentar baixar os recursos do NLTK (lru_cache não impede construções simultâneas)
+_stopword_matcher = None
+_stopword_matcher_lock = threading.Lock()
+
+def get_stopword_matcher():
+    """Motor de stopwords padrão (NLTK + arquivos de STOPWORDS_DIR), construído uma única vez por processo."""
+    global _stopword_matcher
+    if _stopword_matcher is None:
+        with _stopword_matcher_lock:
+            if _stopword_matcher is None:
+                entries = _load_default_stopword_entries() or list(FALLBACK_STOPWORDS)
+                matcher = build_stopword_matcher(entries)
+                logger.debug(f"Stopwords carregadas: {len(matcher.words)} palavras e {len(matcher.phrases)} expressões.")
+                _stopword_matcher = matcher
+    return _stopword_matcher
+
+@lru_cache(maxsize=1)
+def get_portuguese_stopwords():
+    """Retorna (memoizado) um frozenset com as stopwords em português normalizadas, incluindo as expressões."""
+    matcher = get_stopword_matcher()
+    return matcher.words | frozenset(' '.join(phrase) for phrase in matcher.phrases)
+
+def filter_stopword_tokens(tokens, matcher=None):
+    """
+    Remove de uma lista de tokens as expressões (n-gramas) e as palavras que são stopwords.
+
+    Os tokens retornados mantêm a grafia original; a comparação usa fold_term.
+    """
+    if matcher is None:
+        matcher = get_stopword_matcher()
+    folded = [fold_term(token) for token in tokens]
+    kept = []
+    i = 0
+    total = len(tokens)
+    while i < total:
+        skip = 0
+        # Tenta a expressão mais longa primeiro ('até logo' antes de 'até')
+        for length in range(min(matcher.max_phrase_len, total - i), 1, -1):
+            if tuple(folded[i:i + length]) in matcher.phrases:
+                skip = length
+                break
+        if skip:
+            i += skip
+            continue
+        if folded[i] not in matcher.words:
+            kept.append(tokens[i])
+        i += 1
+    return kept
+
+# === Renderizadores (gravam a imagem diretamente, sem matplotlib) ===
+def _save_png(wordcloud, output_filepath, quality):
+    wordcloud.to_image().save(output_filepath, format='PNG', optimize=True)
+
+def _save_webp(wordcloud, output_filepath, quality):
+    wordcloud.to_image().save(output_filepath, format='WEBP', quality=quality, method=4)
+
+def _save_svg(wordcloud, output_filepath, quality):
+    with open(output_filepath, 'w', encoding='utf-8') as f:
+        f.write(wordcloud.to_svg())
+
+WORDCLOUD_RENDERERS = {
+    'png': _save_png,
+    'webp': _save_webp,
+    'svg': _save_svg,
 }
 
+def save_wordcloud_image(wordcloud, output_filepath, image_format=None, quality=WORDCLOUD_DEFAULT_QUALITY):
+    """
+    Grava um WordCloud já gerado no formato pedido (png, webp ou svg).
 
-        return list(base_stopwords.union(custom_stopwords))
-    except LookupError:
-        logger.error("Pacote 'stopwords' do NLTK não encontrado. Tente nltk.download('stopwords').")
-        return list({'que', 'de', 'do', 'da', 'o', 'a', 'e', 'é', 'um', 'uma'}) # Fallback básico
+    Se `image_format` for None, o formato é deduzido da extensão de `output_filepath`.
+    """
+    if image_format is None:
+        image_format = os.path.splitext(output_filepath)[1].lstrip('.').lower() or WORDCLOUD_DEFAULT_FORMAT
+    renderer = WORDCLOUD_RENDERERS.get(image_format)
+    if renderer is None:
+        raise ValueError(f"Formato de imagem não suportado: '{image_format}'. Use um de {sorted(WORDCLOUD_RENDERERS)}.")
+    os.makedirs(os.path.dirname(output_filepath) or '.', exist_ok=True)
+    renderer(wordcloud, output_filepath, quality)
+
+# === Tabelas de frequência ===
+URL_RE = re.compile(r'http\S+')
+MENTION_RE = re.compile(r'@\w+')
+HASHTAG_RE = re.compile(r'#\w+')
+# Quantidade de palavras enviadas para o layout (o padrão do WordCloud também é 200)
+WORDCLOUD_MAX_WORDS = 200
+
+def compute_word_frequencies(text, stopwords_list=None):
+    """
+    Conta as palavras de um texto, já sem URLs, menções, hashtags, números e stopwords.
+
+    As stopwords (palavras e expressões) são filtradas uma única vez sobre a sequência de tokens.
+
+    Args:
+        text (str): Texto a ser contado.
+        stopwords_list (iterable, optional): Stopwords alternativas. Se None, usa o motor padrão.
+
+    Returns:
+        collections.Counter: Contagem por palavra (em minúsculas).
+    """
+    if not text:
+        return Counter()
+    matcher = get_stopword_matcher() if stopwords_list is None else build_stopword_matcher(stopwords_list)
+
+    # Remove URLs e menções @ que podem poluir a nuvem
+    text_cleaned = URL_RE.sub('', text)
+    text_cleaned = MENTION_RE.sub('', text_cleaned)
+    text_cleaned = HASHTAG_RE.sub('', text_cleaned) # Remove hashtags
+
+    tokens = [token for token in TOKEN_RE.findall(text_cleaned.lower()) if not token.isdigit()]
+    return Counter(filter_stopword_tokens(tokens, matcher))
+
+def save_frequency_table(frequencies, output_filepath):
+    """Grava a tabela de frequências em JSON compacto, ordenada da palavra mais frequente para a menos."""
+    table = {
+        'total_tokens': sum(frequencies.values()),
+        'frequencias': dict(Counter(frequencies).most_common()),
+    }
+    atomic_write_json(output_filepath, table, compact=True)
+    logger.info(f"Tabela de frequências salva em: {output_filepath}")
+    return output_filepath
+
+def load_frequency_table(filepath):
+    """Lê uma tabela gravada por save_frequency_table. Retorna um Counter ou None se não existir."""
+    table = read_json(filepath)
+    if not table or 'frequencias' not in table:
+        return None
+    return Counter(table['frequencias'])
+
+def merge_frequency_tables(tables):
+    """Soma várias tabelas de frequência (ex.: para uma nuvem que agrega vários canais)."""
+    merged = Counter()
+    for table in tables:
+        if table:
+            merged.update(table)
+    return merged
+
+def _build_wordcloud(frequencies):
+    from wordcloud import WordCloud
+    return WordCloud(
+        width=800,
+        height=400,
+        background_color='white',
+        min_font_size=10,
+        max_words=WORDCLOUD_MAX_WORDS,
+    ).generate_from_frequencies(dict(frequencies))
+
+def generate_wordcloud_from_frequencies(frequencies, output_filepath, image_format=None, quality=WORDCLOUD_DEFAULT_QUALITY):
+    """
+    Gera uma nuvem de palavras a partir de uma tabela de frequências e a salva em um arquivo.
+
+    Args:
+        frequencies (dict): Palavra -> contagem (ou peso).
+        output_filepath (str): O caminho completo para salvar a imagem da nuvem de palavras.
+        image_format (str, optional): 'png', 'webp' ou 'svg'. Se None, usa a extensão do arquivo.
+        quality (int, optional): Qualidade para formatos com perda (webp).
+
+    Returns:
+        str: O caminho para o arquivo da nuvem de palavras gerada, ou None se erro.
+    """
+    if not frequencies:
+        logger.warning("Tabela de frequências vazia fornecida para geração da nuvem de palavras.")
+        return None
+
+    try:
+        wordcloud = _build_wordcloud(frequencies)
+        save_wordcloud_image(wordcloud, output_filepath, image_format=image_format, quality=quality)
+        logger.info(f"Nuvem de palavras gerada e salva em: {output_filepath}")
+        return output_filepath
     except Exception as e:
-        logger.error(f"Erro ao carregar stopwords: {e}")
-        return []
+        logger.error(f"Erro ao gerar nuvem de palavras para '{os.path.basename(output_filepath)}': {e}")
+        # import traceback
+        # logger.error(traceback.format_exc())
+        return None
 
-def generate_wordcloud_from_text(text, output_filepath, stopwords_list=None):
+def generate_wordcloud_from_text(text, output_filepath, stopwords_list=None, image_format=None, quality=WORDCLOUD_DEFAULT_QUALITY):
     """
     Gera uma nuvem de palavras a partir de um texto e a salva em um arquivo.
 
@@ -229,6 +371,8 @@ def generate_wordcloud_from_text(text, output_filepath, stopwords_list=None):
         text (str): O texto para gerar a nuvem de palavras.
         output_filepath (str): O caminho completo para salvar a imagem da nuvem de palavras.
         stopwords_list (list, optional): Lista de stopwords. Se None, usa as de português.
+        image_format (str, optional): 'png', 'webp' ou 'svg'. Se None, usa a extensão do arquivo.
+        quality (int, optional): Qualidade para formatos com perda (webp).
 
     Returns:
         str: O caminho para o arquivo da nuvem de palavras gerada, ou None se erro.
@@ -237,40 +381,154 @@ def generate_wordcloud_from_text(text, output_filepath, stopwords_list=None):
         logger.warning("Texto vazio fornecido para geração da nuvem de palavras.")
         return None
 
-    if stopwords_list is None:
-        stopwords_list = get_portuguese_stopwords()
+    frequencies = compute_word_frequencies(text, stopwords_list)
+    return generate_wordcloud_from_frequencies(frequencies, output_filepath, image_format=image_format, quality=quality)
+
+# === Versões completa e prévia com hash do conteúdo no nome ===
+def _rendition_pattern(base_name, image_format):
+    return re.compile(
+        rf"^{re.escape(base_name)}(?:\.[0-9a-f]{{{WORDCLOUD_HASH_LENGTH}}})?"
+        rf"(?P<sufixo>{re.escape(WORDCLOUD_PREVIEW_SUFFIX)})?\.{re.escape(image_format)}$"
+    )
+
+def _save_hashed_rendition(wordcloud, output_dir, base_name, suffix, image_format, quality):
+    # Grava em um arquivo temporário, calcula o hash do conteúdo e renomeia para o nome final
+    tmp_path = os.path.join(output_dir, f".{base_name}{suffix}.{os.getpid()}.tmp.{image_format}")
+    save_wordcloud_image(wordcloud, tmp_path, image_format=image_format, quality=quality)
+    digest = hashlib.sha1()
+    with open(tmp_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    final_path = os.path.join(output_dir, f"{base_name}.{digest.hexdigest()[:WORDCLOUD_HASH_LENGTH]}{suffix}.{image_format}")
+    os.replace(tmp_path, final_path)
+    return final_path
+
+def cleanup_old_renditions(output_dir, base_name, image_format, keep=WORDCLOUD_RENDITIONS_KEPT):
+    """Remove as versões antigas de uma nuvem, mantendo as `keep` mais recentes de cada tipo (completa e prévia)."""
+    pattern = _rendition_pattern(base_name, image_format)
+    by_kind = {}
+    try:
+        names = os.listdir(output_dir)
+    except OSError:
+        return
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            path = os.path.join(output_dir, name)
+            by_kind.setdefault(bool(match.group('sufixo')), []).append(path)
+    for paths in by_kind.values():
+        paths.sort(key=lambda path: os.path.getmtime(path), reverse=True)
+        for old_path in paths[keep:]:
+            try:
+                os.remove(old_path)
+            except OSError as e:
+                logger.warning(f"Não foi possível remover a nuvem antiga '{old_path}': {e}")
+
+def generate_wordcloud_renditions(frequencies, output_dir, base_name, image_format=None, quality=WORDCLOUD_DEFAULT_QUALITY):
+    """
+    Gera a nuvem uma única vez (um só layout) e grava a versão completa e a prévia.
+
+    Os arquivos se chamam `<base_name>.<hash>.<formato>` e `<base_name>.<hash>.preview.<formato>`:
+    como o nome muda junto com o conteúdo, o navegador pode guardá-los em cache sem revalidar.
+    Versões antigas da mesma nuvem são removidas (ver WORDCLOUD_RENDITIONS_KEPT).
+
+    Returns:
+        dict: {'completa': caminho, 'preview': caminho}, ou None se erro.
+    """
+    if not frequencies:
+        logger.warning("Tabela de frequências vazia fornecida para geração da nuvem de palavras.")
+        return None
+    image_format = image_format or WORDCLOUD_DEFAULT_FORMAT
 
     try:
-        # Remove URLs e menções @ que podem poluir a nuvem
-        text_cleaned = re.sub(r'http\S+', '', text)
-        text_cleaned = re.sub(r'@\w+', '', text_cleaned)
-        text_cleaned = re.sub(r'#\w+', '', text_cleaned) # Remove hashtags
-
-        wordcloud = WordCloud(
-            width=800,
-            height=400,
-            background_color='white',
-            stopwords=set(stopwords_list), # WordCloud espera um set para eficiência
-            min_font_size=10,
-            collocations=False, # Evita bigramas comuns como "bom dia" se não desejar
-            normalize_plurals=False # Tenta normalizar plurais, pode ser útil
-        ).generate(text_cleaned)
-
-        plt.figure(figsize=(10, 5))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis("off")
-        
-        os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
-        plt.savefig(output_filepath, bbox_inches='tight')
-        plt.close() # Libera memória
-        logger.info(f"Nuvem de palavras gerada e salva em: {output_filepath}")
-        return output_filepath
+        os.makedirs(output_dir, exist_ok=True)
+        wordcloud = _build_wordcloud(frequencies)
+        # A escala é aplicada apenas ao desenhar: as duas versões compartilham o mesmo layout
+        wordcloud.scale = WORDCLOUD_FULL_SCALE
+        full_path = _save_hashed_rendition(wordcloud, output_dir, base_name, "", image_format, quality)
+        wordcloud.scale = WORDCLOUD_PREVIEW_SCALE
+        preview_path = _save_hashed_rendition(wordcloud, output_dir, base_name, WORDCLOUD_PREVIEW_SUFFIX, image_format, quality)
+        cleanup_old_renditions(output_dir, base_name, image_format)
+        logger.info(f"Nuvem de palavras gerada e salva em: {full_path} (prévia: {os.path.basename(preview_path)})")
+        return {'completa': full_path, 'preview': preview_path}
     except Exception as e:
-        logger.error(f"Erro ao gerar nuvem de palavras para '{os.path.basename(output_filepath)}': {e}")
-        # import traceback
-        # logger.error(traceback.format_exc())
+        logger.error(f"Erro ao gerar nuvem de palavras '{base_name}': {e}")
         return None
 
+# === Renderização em pool de processos ===
+# O layout do WordCloud é CPU-bound; em threads ele disputa o GIL com os workers de rede.
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+def get_render_pool():
+    """Retorna o ProcessPoolExecutor compartilhado de renderização (um processo por núcleo)."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # 'spawn' evita herdar locks de threads do processo coletor via fork
+            _render_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _render_pool
+
+def shutdown_render_pool():
+    """Encerra o pool de renderização, aguardando as nuvens pendentes."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=True)
+            _render_pool = None
+
+def submit_wordcloud_render(frequencies, output_filepath, image_format=None, quality=WORDCLOUD_DEFAULT_QUALITY):
+    """Agenda a renderização no pool sem esperar; retorna o Future cujo resultado é o caminho gravado (ou None)."""
+    top_frequencies = dict(Counter(frequencies).most_common(WORDCLOUD_MAX_WORDS))
+    return get_render_pool().submit(
+        generate_wordcloud_from_frequencies, top_frequencies, output_filepath,
+        image_format=image_format, quality=quality
+    )
+
+def render_wordcloud_in_pool(frequencies, output_filepath, image_format=None, quality=WORDCLOUD_DEFAULT_QUALITY):
+    """
+    Gera a nuvem de palavras em um processo do pool e aguarda o resultado.
+
+    Apenas as WORDCLOUD_MAX_WORDS palavras mais frequentes são enviadas ao processo,
+    o que mantém a serialização entre processos pequena mesmo para transcrições longas.
+
+    Pode ser chamada de várias threads ao mesmo tempo; a thread chamadora apenas espera
+    (sem segurar o GIL) enquanto o layout roda em outro núcleo.
+
+    Returns:
+        str: O caminho do arquivo gravado, ou None se erro.
+    """
+    from concurrent.futures.process import BrokenProcessPool
+    top_frequencies = dict(Counter(frequencies).most_common(WORDCLOUD_MAX_WORDS))
+    try:
+        return submit_wordcloud_render(top_frequencies, output_filepath, image_format, quality).result()
+    except BrokenProcessPool as e:
+        logger.error(f"Pool de renderização indisponível ({e}). Gerando '{os.path.basename(output_filepath)}' no processo atual.")
+        return generate_wordcloud_from_frequencies(top_frequencies, output_filepath, image_format=image_format, quality=quality)
+
+def submit_wordcloud_renditions(frequencies, output_dir, base_name, image_format=None, quality=WORDCLOUD_DEFAULT_QUALITY):
+    """Agenda generate_wordcloud_renditions no pool; o resultado do Future é o dict de caminhos (ou None)."""
+    top_frequencies = dict(Counter(frequencies).most_common(WORDCLOUD_MAX_WORDS))
+    return get_render_pool().submit(
+        generate_wordcloud_renditions, top_frequencies, output_dir, base_name,
+        image_format=image_format, quality=quality
+    )
+
+def render_wordcloud_renditions_in_pool(frequencies, output_dir, base_name, image_format=None, quality=WORDCLOUD_DEFAULT_QUALITY):
+    """Gera as versões completa e prévia em um processo do pool e aguarda (ver render_wordcloud_in_pool)."""
+    from concurrent.futures.process import BrokenProcessPool
+    top_frequencies = dict(Counter(frequencies).most_common(WORDCLOUD_MAX_WORDS))
+    try:
+        return submit_wordcloud_renditions(top_frequencies, output_dir, base_name, image_format, quality).result()
+    except BrokenProcessPool as e:
+        logger.error(f"Pool de renderização indisponível ({e}). Gerando '{base_name}' no processo atual.")
+        return generate_wordcloud_renditions(top_frequencies, output_dir, base_name, image_format=image_format, quality=quality)
+
 if __name__ == '__main__':
     # Exemplo de uso (para teste rápido)
     ensure_nltk_resources()
@@ -282,7 +540,7 @@ if __name__ == '__main__':
     dinheiro dinheiro dinheiro investimento investimento economia.
     """
     pt_stopwords = get_portuguese_stopwords()
-    print(f"Stopwords: {pt_stopwords[:20]}...") # Mostra algumas
+    print(f"Stopwords: {sorted(pt_stopwords)[:20]}...") # Mostra algumas
 
     # Cria um diretório de teste para a nuvem
     test_output_dir = "test_wordclouds"
@@ -0,0 +1,334 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# === Fila de canais compartilhada entre vários coletores ===
+# Vários processos noingles.py (na mesma máquina ou em máquinas que compartilham o diretório)
+# retiram canais da mesma fila. Cada canal retirado recebe um "lease" com validade: se o
+# processo morrer, o lease expira e o canal volta a ficar disponível para outro coletor.
+QUEUE_DB_PATH = os.path.join("trans", "fila_coleta.db")
+LEASE_SECONDS = 900
+# Tentativas por canal (falhas e leases expirados) antes de marcá-lo como falho
+MAX_ATTEMPTS = 3
+# Intervalo entre consultas quando não há canal livre, mas ainda há canais em andamento
+POLL_SECONDS = 5.0
+
+STATE_PENDING = "pendente"
+STATE_CLAIMED = "em_andamento"
+STATE_DONE = "concluido"
+STATE_FAILED = "falhou"
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id TEXT PRIMARY KEY,
+    criada_em TEXT,
+    consolidada_por TEXT,
+    consolidada_em TEXT
+);
+
+CREATE TABLE IF NOT EXISTS fila (
+    execucao_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    ordem INTEGER NOT NULL,
+    estado TEXT NOT NULL,
+    coletor TEXT,
+    lease_ate REAL,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    resultado TEXT,
+    erro TEXT,
+    atualizado_em TEXT,
+    PRIMARY KEY (execucao_id, url)
+);
+CREATE INDEX IF NOT EXISTS idx_fila_estado ON fila(execucao_id, estado, ordem);
+"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _now_iso():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class WorkQueue:
+    """Fila de canais de uma execução (`run_id`), gravada em SQLite."""
+
+    def __init__(self, db_path=QUEUE_DB_PATH, run_id=None, worker_id=None, lease_seconds=LEASE_SECONDS,
+                 max_attempts=MAX_ATTEMPTS, poll_seconds=POLL_SECONDS):
+        self.db_path = db_path
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+        self._held = set() # Canais retirados por este coletor e ainda não finalizados
+        self._held_lock = threading.Lock()
+        self._stop_heartbeat = threading.Event()
+        self._heartbeat_thread = None
+        # Execuções anteriores sem nada a processar que ainda não foram consolidadas (ver _join_or_create_run)
+        self.finished_runs = []
+        conn = self._connect()
+        try:
+            conn.executescript(QUEUE_SCHEMA)
+            self.run_id = run_id or self._transaction(conn, self._join_or_create_run)
+        finally:
+            conn.close()
+
+    def _join_or_create_run(self, conn):
+        # Sem run_id explícito: os coletores iniciados juntos entram na execução ainda não
+        # consolidada mais recente que ainda tenha canais a processar (pendentes ou em andamento,
+        # inclusive com lease expirado) ou que acabou de ser criada (ainda sem canais).
+        # Execuções não consolidadas em que todos os canais já terminaram (ex.: coletor
+        # interrompido depois do último canal) ficam em `finished_runs` para serem consolidadas,
+        # e o primeiro coletor cria uma nova execução.
+        runs = conn.execute(
+            "SELECT id, "
+            "(SELECT COUNT(*) FROM fila WHERE fila.execucao_id = execucoes.id), "
+            "(SELECT COUNT(*) FROM fila WHERE fila.execucao_id = execucoes.id AND estado IN (?, ?)) "
+            "FROM execucoes WHERE consolidada_por IS NULL ORDER BY criada_em DESC, id DESC",
+            (STATE_PENDING, STATE_CLAIMED)
+        ).fetchall()
+        for run_id, total, open_entries in runs:
+            if total == 0 or open_entries:
+                return run_id
+            self.finished_runs.insert(0, run_id) # Da mais antiga para a mais recente
+        base_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        run_id, counter = base_id, 1
+        while conn.execute("SELECT 1 FROM execucoes WHERE id = ?", (run_id,)).fetchone():
+            run_id = f"{base_id}_{counter}"
+            counter += 1
+        conn.execute("INSERT INTO execucoes (id, criada_em) VALUES (?, ?)", (run_id, _now_iso()))
+        return run_id
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        # isolation_level=None: as transações são abertas explicitamente com BEGIN IMMEDIATE.
+        # Sem WAL: o modo WAL não funciona em sistemas de arquivos de rede (NFS/SMB).
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        return conn
+
+    def _transaction(self, conn, statements):
+        # Executa `statements(conn)` com o banco travado para escrita (retirada atômica entre processos)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = statements(conn)
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def enqueue(self, urls):
+        """Adiciona os canais à execução. Pode ser chamado por todos os coletores: canais já presentes são ignorados."""
+        now = _now_iso()
+
+        def statements(conn):
+            conn.execute("INSERT OR IGNORE INTO execucoes (id, criada_em) VALUES (?, ?)", (self.run_id, now))
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO fila (execucao_id, url, ordem, estado, atualizado_em) VALUES (?, ?, ?, ?, ?)",
+                [(self.run_id, url, position, STATE_PENDING, now) for position, url in enumerate(urls)]
+            )
+            return conn.total_changes - before
+
+        conn = self._connect()
+        try:
+            added = self._transaction(conn, statements)
+        finally:
+            conn.close()
+        logger.info(f"Fila '{self.run_id}': {added} canal(is) adicionado(s).")
+        return added
+
+    def claim(self):
+        """Retira o próximo canal livre (pendente ou com lease expirado). Retorna a URL ou None."""
+        now = time.time()
+
+        def statements(conn):
+            # Leases expirados sem tentativas restantes: o canal é dado como falho
+            conn.execute(
+                "UPDATE fila SET estado = ?, erro = 'lease expirado', atualizado_em = ? "
+                "WHERE execucao_id = ? AND estado = ? AND lease_ate < ? AND tentativas >= ?",
+                (STATE_FAILED, _now_iso(), self.run_id, STATE_CLAIMED, now, self.max_attempts)
+            )
+            row = conn.execute(
+                "SELECT url FROM fila WHERE execucao_id = ? "
+                "AND (estado = ? OR (estado = ? AND lease_ate < ?)) "
+                "ORDER BY ordem LIMIT 1",
+                (self.run_id, STATE_PENDING, STATE_CLAIMED, now)
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute(
+                "UPDATE fila SET estado = ?, coletor = ?, lease_ate = ?, tentativas = tentativas + 1, atualizado_em = ? "
+                "WHERE execucao_id = ? AND url = ?",
+                (STATE_CLAIMED, self.worker_id, now + self.lease_seconds, _now_iso(), self.run_id, row[0])
+            )
+            return row[0]
+
+        conn = self._connect()
+        try:
+            url = self._transaction(conn, statements)
+        finally:
+            conn.close()
+        if url:
+            with self._held_lock:
+                self._held.add(url)
+        return url
+
+    def renew_leases(self):
+        """Estende o lease dos canais que este coletor ainda está processando."""
+        with self._held_lock:
+            held = list(self._held)
+        if not held:
+            return
+        conn = self._connect()
+        try:
+            self._transaction(conn, lambda c: c.executemany(
+                "UPDATE fila SET lease_ate = ? WHERE execucao_id = ? AND url = ? AND coletor = ? AND estado = ?",
+                [(time.time() + self.lease_seconds, self.run_id, url, self.worker_id, STATE_CLAIMED) for url in held]
+            ))
+        finally:
+            conn.close()
+
+    def _finish(self, url, state_sql, params):
+        conn = self._connect()
+        try:
+            self._transaction(conn, lambda c: c.execute(state_sql, params))
+        finally:
+            conn.close()
+            with self._held_lock:
+                self._held.discard(url)
+
+    def complete(self, url, result):
+        """Marca o canal como concluído, guardando o resultado (JSON) para a consolidação."""
+        payload = json.dumps(result, ensure_ascii=False) if result is not None else None
+        self._finish(url, (
+            "UPDATE fila SET estado = ?, resultado = ?, erro = NULL, lease_ate = NULL, atualizado_em = ? "
+            "WHERE execucao_id = ? AND url = ?"
+        ), (STATE_DONE, payload, _now_iso(), self.run_id, url))
+
+    def fail(self, url, error):
+        """Devolve o canal à fila (ou o marca como falho, se esgotou as tentativas)."""
+        self._finish(url, (
+            "UPDATE fila SET estado = CASE WHEN tentativas >= ? THEN ? ELSE ? END, "
+            "erro = ?, coletor = NULL, lease_ate = NULL, atualizado_em = ? "
+            "WHERE execucao_id = ? AND url = ? AND estado = ? AND coletor = ?"
+        ), (self.max_attempts, STATE_FAILED, STATE_PENDING, str(error)[:1000], _now_iso(), self.run_id, url,
+            STATE_CLAIMED, self.worker_id))
+
+    def release_claims(self):
+        """Devolve à fila os canais retirados e não finalizados (ex.: coleta cancelada)."""
+        with self._held_lock:
+            held = list(self._held)
+            self._held.clear()
+        if not held:
+            return
+        conn = self._connect()
+        try:
+            self._transaction(conn, lambda c: c.executemany(
+                "UPDATE fila SET estado = ?, coletor = NULL, lease_ate = NULL, tentativas = MAX(tentativas - 1, 0), atualizado_em = ? "
+                "WHERE execucao_id = ? AND url = ? AND coletor = ? AND estado = ?",
+                [(STATE_PENDING, _now_iso(), self.run_id, url, self.worker_id, STATE_CLAIMED) for url in held]
+            ))
+        finally:
+            conn.close()
+        logger.info(f"{len(held)} canal(is) devolvido(s) à fila '{self.run_id}'.")
+
+    def on_result(self, url, result, error):
+        """Callback no formato de collect_channels (on_result). Canal sem resultado conta como falha."""
+        if error is not None:
+            self.fail(url, error)
+        elif not result:
+            self.fail(url, "nenhum resultado retornado")
+        else:
+            self.complete(url, result)
+
+    def counts(self):
+        """Quantidade de canais por estado nesta execução."""
+        conn = self._connect()
+        try:
+            return dict(conn.execute(
+                "SELECT estado, COUNT(*) FROM fila WHERE execucao_id = ? GROUP BY estado", (self.run_id,)
+            ).fetchall())
+        finally:
+            conn.close()
+
+    def iter_claims(self):
+        """
+        Gera os canais retirados por este coletor até a fila da execução se esgotar.
+
+        Enquanto outros coletores ainda tiverem canais em andamento, continua consultando a fila
+        (a cada `poll_seconds`) para assumir os canais cujo lease expirar.
+        """
+        while True:
+            url = self.claim()
+            if url:
+                yield url
+                continue
+            counts = self.counts()
+            if not counts.get(STATE_PENDING) and not counts.get(STATE_CLAIMED):
+                return
+            time.sleep(self.poll_seconds)
+
+    def start_heartbeat(self):
+        """Renova os leases em segundo plano (um terço da validade), enquanto os canais são processados."""
+        def beat():
+            while not self._stop_heartbeat.wait(self.lease_seconds / 3):
+                try:
+                    self.renew_leases()
+                except Exception as e:
+                    logger.warning(f"Falha ao renovar leases da fila: {e}")
+
+        self._stop_heartbeat.clear()
+        self._heartbeat_thread = threading.Thread(target=beat, name="fila-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        self._stop_heartbeat.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join(timeout=5)
+            self._heartbeat_thread = None
+
+    def try_become_consolidator(self):
+        """
+        Com a fila esgotada, apenas um coletor consolida o relatório: o primeiro que chamar esta função.
+
+        Returns:
+            bool: True se este coletor deve consolidar a execução.
+        """
+        counts = self.counts()
+        if counts.get(STATE_PENDING) or counts.get(STATE_CLAIMED):
+            return False
+
+        def statements(conn):
+            cursor = conn.execute(
+                "UPDATE execucoes SET consolidada_por = ?, consolidada_em = ? WHERE id = ? AND consolidada_por IS NULL",
+                (self.worker_id, _now_iso(), self.run_id)
+            )
+            return cursor.rowcount == 1
+
+        conn = self._connect()
+        try:
+            return self._transaction(conn, statements)
+        finally:
+            conn.close()
+
+    def load_results(self):
+        """Resultados de todos os coletores desta execução, na ordem original dos canais."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT resultado FROM fila WHERE execucao_id = ? AND estado = ? AND resultado IS NOT NULL ORDER BY ordem",
+                (self.run_id, STATE_DONE)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [json.loads(row[0]) for row in rows]